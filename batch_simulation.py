@@ -0,0 +1,334 @@
+import numpy as np
+
+
+ROLL_DOWN_PARAMS = ('angle', 'length', 'horizontal_length', 'v0', 'friction_incline', 'friction_horizontal')
+ROLL_UP_PARAMS = ('angle', 'length', 'v0', 'friction_incline', 'friction_horizontal', 'initial_distance')
+PRECISIONS = {'float64': np.float64, 'float32': np.float32}
+END_STATE_FIELDS = ('x_body', 't_global', 'velocity')
+PARAM_BOUNDS = {
+    'angle': (0.0, 90.0),
+    'length': (1e-9, np.inf),
+    'horizontal_length': (1e-9, np.inf),
+    'v0': (0.0, 299792458.0),
+    'friction_incline': (0.0, 1.0),
+    'friction_horizontal': (0.0, 1.0),
+    'initial_distance': (0.0, np.inf),
+}
+
+
+def param_names(scenario_type):
+    if scenario_type == 'roll_down':
+        return ROLL_DOWN_PARAMS
+    if scenario_type == 'roll_up':
+        return ROLL_UP_PARAMS
+    raise ValueError(f"Неизвестный сценарий: {scenario_type}")
+
+
+def precision_dtype(precision):
+    name = np.dtype(precision).name if not isinstance(precision, str) else precision
+    if name not in PRECISIONS:
+        raise ValueError(f"Неподдерживаемая точность: {precision} (допустимо: {', '.join(PRECISIONS)})")
+    return np.dtype(PRECISIONS[name])
+
+
+def _broadcast_params(*params, dtype=np.float64):
+    arrays = np.broadcast_arrays(*[np.asarray(p, dtype=np.float64) for p in params])
+    return [np.array(a, dtype=dtype) for a in arrays]
+
+
+def end_state_deviation(reference, other, lanes=None):
+    lanes = slice(None) if lanes is None else lanes
+    report = {}
+    for name in END_STATE_FIELDS:
+        values = np.asarray(getattr(other, name), dtype=np.float64).ravel()[lanes]
+        report[name] = np.abs(values - np.ravel(getattr(reference, name)))
+    report['stopped_mismatch'] = np.ravel(reference.is_stopped()) != np.ravel(other.is_stopped())[lanes]
+    return report
+
+
+class _BatchRunner:
+    _param_fields = ()
+    _state_fields = ()
+
+    def _subset(self, lanes):
+        sub = object.__new__(type(self))
+        sub.__dict__.update({k: v for k, v in self.__dict__.items() if not isinstance(v, np.ndarray)})
+        for name in self._param_fields + self._state_fields:
+            value = getattr(self, name)
+            setattr(sub, name, value.reshape(-1)[lanes] if np.ndim(value) else value)
+        sub.shape = lanes.shape
+        return sub
+
+    def _scatter(self, sub, lanes):
+        for name in self._state_fields:
+            getattr(self, name).reshape(-1)[lanes] = getattr(sub, name)
+
+    def run(self, dt=None, max_steps=100000, compact_every=32):
+        dt = self.dt if dt is None else dt
+        work, lanes = self, None
+        for i in range(max_steps):
+            stopped = work.is_stopped()
+            if stopped.all():
+                break
+            if i % compact_every == 0 and stopped.size > 1024 and stopped.mean() > 0.5:
+                if lanes is not None:
+                    self._scatter(work, lanes)
+                lanes = np.flatnonzero(~self.is_stopped().reshape(-1))
+                work = self._subset(lanes)
+            work.step(dt)
+        if lanes is not None:
+            self._scatter(work, lanes)
+        return self
+
+
+class BatchSimulation(_BatchRunner):
+    _param_fields = ('angle', 'L', 'horizontal_length', 'v0', 'friction_incline', 'friction_horizontal',
+                     '_sin', '_cos', '_tan', '_base_x', '_end_x', '_a_incline')
+    _state_fields = ('t', 't_global', 'x_body', 'y_body', 'velocity', 'on_inclined_plane',
+                     'v0_horizontal', 'v_at_base', 'stalled', 'finished')
+
+    def __init__(self, angle, length, horizontal_length, v0, friction_incline, friction_horizontal,
+                 dtype=np.float64):
+        self.g = 9.81
+        self.dtype = precision_dtype(dtype)
+        angle, length, horizontal_length, v0, friction_incline, friction_horizontal = _broadcast_params(
+            angle, length, horizontal_length, v0, friction_incline, friction_horizontal
+        )
+        self.angle = np.radians(angle)
+        self.L = length.astype(self.dtype)
+        self.horizontal_length = horizontal_length.astype(self.dtype)
+        self.v0 = v0.astype(self.dtype)
+        self.friction_incline = friction_incline
+        self.friction_horizontal = friction_horizontal.astype(self.dtype)
+        self.c = 299792458
+        self.body_radius = 0.2
+        self.shape = self.angle.shape
+        self.reset()
+
+    def reset(self):
+        self.dt = 0.05
+        sin, cos = np.sin(self.angle), np.cos(self.angle)
+        self._sin = sin.astype(self.dtype)
+        self._cos = cos.astype(self.dtype)
+        self._tan = np.tan(self.angle).astype(self.dtype)
+        self._base_x = self.L * self._cos
+        self._end_x = self._base_x + self.horizontal_length
+        self._a_incline = (self.g * sin - self.friction_incline * self.g * cos).astype(self.dtype)
+
+        self.t = np.zeros(self.shape, dtype=self.dtype)
+        self.t_global = np.zeros(self.shape, dtype=self.dtype)
+        self.x_body = np.zeros(self.shape, dtype=self.dtype)
+        self.y_body = self.L * self._sin + self.body_radius
+        self.velocity = self.v0.copy()
+        self.on_inclined_plane = np.ones(self.shape, dtype=bool)
+        self.v0_horizontal = np.zeros(self.shape, dtype=self.dtype)
+        self.v_at_base = np.zeros(self.shape, dtype=self.dtype)
+        self.stalled = (self.velocity == 0) & (self._a_incline <= 0)
+        self.finished = np.zeros(self.shape, dtype=bool)
+
+    def step(self, dt):
+        active = ~(self.finished | self.stalled)
+        incline = active & self.on_inclined_plane
+        horizontal = active & ~self.on_inclined_plane
+
+        a = np.where((self._a_incline < 0) & (self.velocity == 0), 0.0, self._a_incline)
+        v = np.clip(self.velocity + a * dt, 0, self.c)
+        s = self.velocity * dt + 0.5 * a * dt ** 2
+        x_incline = self.x_body + s * self._cos
+        crossed = incline & (x_incline >= self._base_x)
+        self.x_body = np.where(incline, x_incline, self.x_body)
+        self.y_body = np.where(incline, -self.x_body * self._tan + self.L * self._sin + self.body_radius,
+                               self.y_body)
+        self.v0_horizontal = np.where(crossed, np.clip(v * self._cos, 0, self.c), self.v0_horizontal)
+        self.v_at_base = np.where(crossed, v, self.v_at_base)
+        self.on_inclined_plane = self.on_inclined_plane & ~crossed
+        self.x_body = np.where(crossed, self._base_x, self.x_body)
+        self.y_body = np.where(crossed, self.body_radius, self.y_body)
+        self.velocity = np.where(incline, v, self.velocity)
+
+        a_h = -self.friction_horizontal * self.g
+        v_h = np.clip(self.v0_horizontal + a_h * self.t, 0, self.c)
+        s_h = self.v0_horizontal * self.t + 0.5 * a_h * self.t ** 2
+        self.x_body = np.where(horizontal, self._base_x + s_h, self.x_body)
+        self.y_body = np.where(horizontal, self.body_radius, self.y_body)
+        self.velocity = np.where(horizontal, v_h, self.velocity)
+
+        self.t = np.where(crossed, 0.0, self.t)
+        self.t = np.where(active, self.t + dt, self.t)
+        self.t_global = np.where(active, self.t_global + dt, self.t_global)
+
+        self.finished = ~self.on_inclined_plane & ((self.x_body >= self._end_x) | (self.velocity <= 0))
+        self.stalled = self.stalled | (incline & ~crossed & (self.velocity == 0) & (self._a_incline <= 0))
+
+        return self.t_global, self.velocity, self.x_body, self.y_body
+
+    def is_finished(self):
+        return self.finished
+
+    def is_stopped(self):
+        return self.finished | self.stalled
+
+
+class BatchRollupSimulation(_BatchRunner):
+    _param_fields = ('angle', 'L', 'v0_input', 'friction_incline', 'friction_horizontal', 'init_h_dist',
+                     'peak_x', 'peak_y', '_sin', '_cos', '_a_incline')
+    _state_fields = ('t_global', 'on_approach', 'on_incline', 'x_body', 'y_body', 'velocity', 'finished',
+                     'v_at_base', 'dist_incline', 't_segment')
+
+    def __init__(self, angle_deg, length, v0_val, fric_inc, fric_hor, init_h_dist_param, dtype=np.float64):
+        self.g = 9.81
+        self.dtype = precision_dtype(dtype)
+        angle_deg, length, v0_val, fric_inc, fric_hor, init_h_dist_param = _broadcast_params(
+            angle_deg, length, v0_val, fric_inc, fric_hor, init_h_dist_param
+        )
+        self.angle = np.radians(angle_deg)
+        self.L = length.astype(self.dtype)
+        self.v0_input = np.abs(v0_val).astype(self.dtype)
+        self.friction_incline = fric_inc
+        self.friction_horizontal = fric_hor.astype(self.dtype)
+        self.c = 299792458
+        self.body_radius = 0.2
+        self.init_h_dist = init_h_dist_param.astype(self.dtype)
+        self.shape = self.angle.shape
+
+        self.base_x = 0.0
+        self.base_y = 0.0
+        cos = np.cos(self.angle).astype(self.dtype)
+        self.peak_x = np.where((self.L > 0) & (self.angle < np.pi / 2 - 0.01), -self.L * cos, 0.0)
+        self.peak_y = self.L * np.sin(self.angle).astype(self.dtype)
+
+        self.reset()
+
+    def reset(self):
+        self.dt = 0.05
+        sin, cos = np.sin(self.angle), np.cos(self.angle)
+        self._sin = sin.astype(self.dtype)
+        self._cos = cos.astype(self.dtype)
+        self._a_incline = (-self.g * sin - self.friction_incline * self.g * cos).astype(self.dtype)
+
+        self.t_global = np.zeros(self.shape, dtype=self.dtype)
+        self.on_approach = np.ones(self.shape, dtype=bool)
+        self.on_incline = np.zeros(self.shape, dtype=bool)
+        self.x_body = self.init_h_dist.copy()
+        self.y_body = np.full(self.shape, self.body_radius, dtype=self.dtype)
+        self.velocity = np.where((self.v0_input > 1e-9) & (self.init_h_dist > 1e-9), -self.v0_input, 0.0)
+        self.finished = np.zeros(self.shape, dtype=bool)
+
+        at_base = np.abs(self.init_h_dist) < 1e-9
+        moving = np.abs(self.v0_input) > 1e-9
+        v_incline = self.v0_input * self._cos
+        self.on_approach = ~at_base
+        self.on_incline = at_base
+        self.x_body = np.where(at_base, self.base_x, self.x_body)
+        self.velocity = np.where(at_base, np.where(moving, v_incline, 0.0), self.velocity)
+        self.finished = at_base & (~moving | (v_incline <= 1e-6))
+
+        self.v_at_base = np.zeros(self.shape, dtype=self.dtype)
+        self.dist_incline = np.zeros(self.shape, dtype=self.dtype)
+        self.t_segment = np.zeros(self.shape, dtype=self.dtype)
+
+    def step(self, dt):
+        active = ~self.finished
+        approach = active & self.on_approach
+        incline = active & ~self.on_approach & self.on_incline
+
+        self._step_approach(approach, dt)
+        self._step_incline(incline, dt)
+
+        self.t_global = np.where(active, self.t_global + dt, self.t_global)
+        return self.t_global, self.velocity, self.x_body, self.y_body
+
+    def _step_approach(self, approach, dt):
+        near_base = self.x_body <= self.base_x + 1e-6
+        halted = approach & (np.abs(self.velocity) < 1e-6) & ~near_base
+        at_base = approach & ~halted & (self.velocity == 0) & near_base
+        self.finished = self.finished | halted | at_base
+        self.x_body = np.where(at_base, self.base_x, self.x_body)
+        self.on_approach = self.on_approach & ~at_base
+        self.on_incline = self.on_incline | at_base
+        self.v_at_base = np.where(at_base, 0.0, self.v_at_base)
+        self.velocity = np.where(at_base, 0.0, self.velocity)
+
+        moving = approach & ~self.finished
+        a_h = np.where(self.velocity < -1e-9, self.friction_horizontal * self.g, 0.0)
+        v_i = self.velocity
+        v_f = v_i + a_h * dt
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dt_s = -v_i / a_h
+        stopped = moving & (v_i < -1e-9) & (v_f >= -1e-9) & (a_h > 1e-9) & (dt_s > 0) & (dt_s < dt)
+        dt_s = np.where(stopped, dt_s, 0.0)
+        self.x_body = np.where(stopped, self.x_body + v_i * dt_s + 0.5 * a_h * dt_s ** 2, self.x_body)
+        self.velocity = np.where(stopped, 0.0, self.velocity)
+        self.t_segment = np.where(stopped, self.t_segment + dt_s, self.t_segment)
+        self.finished = self.finished | stopped
+
+        rolling = moving & ~stopped
+        self.x_body = np.where(rolling, self.x_body + v_i * dt + 0.5 * a_h * dt ** 2, self.x_body)
+        self.velocity = np.where(rolling, v_f, self.velocity)
+        self.t_segment = np.where(rolling, self.t_segment + dt, self.t_segment)
+        self.y_body = np.where(moving, self.body_radius, self.y_body)
+
+        turned = moving & (self.velocity >= -1e-9) & (self.x_body > self.base_x + 1e-6)
+        self.finished = self.finished | turned
+        self.velocity = np.where(turned, 0.0, self.velocity)
+
+        reached = moving & (self.x_body <= self.base_x + 1e-6) & ~self.finished
+        self.x_body = np.where(reached, self.base_x, self.x_body)
+        self.on_approach = self.on_approach & ~reached
+        self.on_incline = self.on_incline | reached
+        self.v_at_base = np.where(reached, self.velocity, self.v_at_base)
+        v_incline = np.clip(np.abs(self.v_at_base) * self._cos, 0.0, self.c)
+        too_slow = reached & (v_incline <= 1e-6)
+        self.velocity = np.where(reached, np.where(too_slow, 0.0, v_incline), self.velocity)
+        self.finished = self.finished | too_slow
+        self.dist_incline = np.where(reached, 0.0, self.dist_incline)
+        self.t_segment = np.where(reached, 0.0, self.t_segment)
+
+    def _step_incline(self, incline, dt):
+        halted = incline & (np.abs(self.velocity) < 1e-6) & (self.dist_incline < self.L - 1e-6)
+        self.finished = self.finished | halted
+
+        moving = incline & ~self.finished
+        a_i = self._a_incline
+        v_i = self.velocity
+        v_f = v_i + a_i * dt
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dt_s = -v_i / a_i
+        stopped = (moving & (v_f <= 1e-6) & (v_i > 1e-6) & (np.abs(a_i) > 1e-9)
+                   & (dt_s > 0) & (dt_s < dt))
+        dt_s = np.where(stopped, dt_s, 0.0)
+        self.dist_incline = np.where(stopped, self.dist_incline + v_i * dt_s + 0.5 * a_i * dt_s ** 2,
+                                     self.dist_incline)
+        self.t_segment = np.where(stopped, self.t_segment + dt_s, self.t_segment)
+        self.velocity = np.where(stopped, 0.0, self.velocity)
+        self.finished = self.finished | stopped
+
+        rolling = moving & ~stopped & (v_i > 1e-6)
+        self.dist_incline = np.where(rolling, self.dist_incline + v_i * dt + 0.5 * a_i * dt ** 2,
+                                     self.dist_incline)
+        self.velocity = np.where(rolling, np.clip(v_f, 0.0, self.c), self.velocity)
+        self.t_segment = np.where(rolling, self.t_segment + dt, self.t_segment)
+        at_peak = rolling & (self.dist_incline >= self.L - 1e-6)
+        self.dist_incline = np.where(at_peak, self.L, self.dist_incline)
+        self.finished = self.finished | at_peak | (rolling & ~at_peak & (self.velocity <= 1e-6))
+
+        idle = moving & ~stopped & (v_i <= 1e-6)
+        self.t_segment = np.where(idle, self.t_segment + dt, self.t_segment)
+        self.velocity = np.where(idle, 0.0, self.velocity)
+        self.finished = self.finished | idle
+
+        x = self.base_x - self.dist_incline * self._cos
+        y = self.base_y + self.dist_incline * self._sin + self.body_radius
+        x = np.where(x < self.peak_x - 1e-6, self.peak_x, x)
+        y = np.where(self.dist_incline > self.L + 1e-6, self.peak_y + self.body_radius, y)
+        self.x_body = np.where(incline, x, self.x_body)
+        self.y_body = np.where(incline, y, self.y_body)
+
+    def is_finished(self):
+        return self.finished
+
+    def is_stopped(self):
+        return self.finished
+
+    def reached_peak(self):
+        return self.on_incline & (self.dist_incline >= self.L - 1e-6)
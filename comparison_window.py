@@ -0,0 +1,223 @@
+import math
+
+import numpy as np
+import matplotlib.pyplot as plt
+from PyQt5.QtCore import QTimer, Qt
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QListWidget, QListWidgetItem, QPushButton, QLabel, QMessageBox
+)
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+
+from report import SCENARIO_SHORT, create_simulation, run_label
+from decimation import MinMaxDecimator
+
+
+MAX_RUNS = 6
+SCENE_COLUMNS = 3
+COLORS = ('tab:red', 'tab:blue', 'tab:green', 'tab:orange', 'tab:purple', 'tab:brown')
+
+
+def run_title(run):
+    scenario_type, params, drag = run
+    text = f"{SCENARIO_SHORT[scenario_type]}: {params['angle']:g}°, v0={params['v0']:g}"
+    if drag > 0:
+        text += f", k={drag:g}"
+    return text
+
+
+class ComparisonLane:
+    def __init__(self, run, color):
+        self.run = run
+        self.color = color
+        self.simulation = create_simulation(*run)
+        self.changes = list(run[1].get('changes', ()))
+        self.decimator = MinMaxDecimator(500)
+        self.v_max = abs(self.simulation.velocity_points[0])
+        height = self.simulation.L * np.sin(self.simulation.angle) if run[0] == 'roll_down' else 0.0
+        self.speed_bound = np.sqrt(self.v_max ** 2 + 2 * self.simulation.g * max(0.0, height))
+        self.ax = None
+        self.body = None
+        self.speed_line = None
+
+    def is_done(self):
+        return self.simulation.is_finished() or (self.simulation.is_stalled() and not self.changes)
+
+    def advance(self, clock):
+        moved = False
+        while self.simulation.time_points[-1] < clock - 1e-9:
+            while self.changes and self.changes[0][0] <= len(self.simulation.time_points) - 1:
+                self.simulation.set_params(**self.changes.pop(0)[1])
+            if self.is_done():
+                break
+            self.simulation.step(self.simulation.dt)
+            self.v_max = max(self.v_max, abs(self.simulation.velocity_points[-1]))
+            moved = True
+        if moved:
+            self.body.set_offsets([[self.simulation.x_body, self.simulation.y_body]])
+            self.decimator.update(self.simulation.time_points, self.simulation.velocity_points)
+            self.speed_line.set_data(*self.decimator.points())
+        return moved
+
+
+class ComparisonWindow(QDialog):
+    def __init__(self, parent=None, runs=None, interval=20):
+        super().__init__(parent)
+        self.setWindowTitle("Сравнение расчетов")
+        self.setGeometry(150, 100, 1100, 750)
+
+        self.runs = list(runs or [])
+        self.interval = interval
+        self.lanes = []
+        self.clock = 0.0
+        self.dt = 0.05
+        self.backgrounds = {}
+        self.speed_ax = None
+        self.speed_limits = (5.0, 1.0)
+
+        self.run_list = QListWidget()
+        self.run_list.setMaximumHeight(110)
+        for i, run in enumerate(self.runs):
+            item = QListWidgetItem(run_label(run))
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked if i < MAX_RUNS else Qt.Unchecked)
+            self.run_list.addItem(item)
+
+        self.figure = plt.figure(figsize=(9, 6))
+        self.canvas = FigureCanvas(self.figure)
+        self.canvas.mpl_connect('draw_event', self.onDraw)
+
+        self.start_button = QPushButton("Начать")
+        self.start_button.clicked.connect(self.startComparison)
+        self.pause_button = QPushButton("Стоп")
+        self.pause_button.clicked.connect(self.togglePause)
+        self.pause_button.setEnabled(False)
+        self.clock_label = QLabel("t = 0.00 с")
+        controls = QHBoxLayout()
+        controls.addWidget(self.start_button)
+        controls.addWidget(self.pause_button)
+        controls.addStretch(1)
+        controls.addWidget(self.clock_label)
+
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel(f"Расчеты для сравнения (не более {MAX_RUNS}):"))
+        layout.addWidget(self.run_list)
+        layout.addWidget(self.canvas)
+        layout.addLayout(controls)
+        self.setLayout(layout)
+
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.updateAnimation)
+
+    def startComparison(self):
+        selected = [self.runs[i] for i in range(self.run_list.count())
+                    if self.run_list.item(i).checkState() == Qt.Checked]
+        if not selected:
+            QMessageBox.warning(self, "Сравнение", "Не выбрано ни одного расчета")
+            return
+        if len(selected) > MAX_RUNS:
+            QMessageBox.warning(self, "Сравнение", f"Можно сравнить не более {MAX_RUNS} расчетов")
+            return
+        self.timer.stop()
+        self.lanes = [ComparisonLane(run, COLORS[i]) for i, run in enumerate(selected)]
+        self.dt = min(lane.simulation.dt for lane in self.lanes)
+        self.clock = 0.0
+        self.speed_limits = (5.0, max(1.0, 1.05 * max(lane.speed_bound for lane in self.lanes)))
+        self.drawFigure()
+        self.clock_label.setText("t = 0.00 с")
+        self.pause_button.setText("Стоп")
+        self.pause_button.setEnabled(True)
+        self.timer.start(self.interval)
+
+    def togglePause(self):
+        if self.timer.isActive():
+            self.timer.stop()
+            self.pause_button.setText("Продолжить")
+        elif self.lanes and not all(lane.is_done() for lane in self.lanes):
+            self.timer.start(self.interval)
+            self.pause_button.setText("Стоп")
+
+    def drawFigure(self):
+        self.figure.clear()
+        columns = min(SCENE_COLUMNS, len(self.lanes))
+        rows = math.ceil(len(self.lanes) / columns)
+        grid = self.figure.add_gridspec(rows + 1, columns, height_ratios=[1] * rows + [1.2],
+                                        hspace=0.45, wspace=0.25)
+        for i, lane in enumerate(self.lanes):
+            ax = self.figure.add_subplot(grid[i // columns, i % columns])
+            sim = lane.simulation
+            xs, ys = [sim.x_body], [sim.y_body]
+            for (x, y), color in ((sim.get_plane_coordinates(), 'b'), (sim.get_horizontal_coordinates(), 'g')):
+                x, y = np.asarray(x), np.asarray(y)
+                if x.size > 0:
+                    ax.plot(x, y, color, linewidth=2)
+                    xs += [np.nanmin(x), np.nanmax(x)]
+                    ys += [np.nanmin(y), np.nanmax(y)]
+            padding_x = max(1.0, (max(xs) - min(xs)) * 0.15)
+            padding_y = max(1.0, (max(ys) - min(ys)) * 0.15)
+            ax.set_xlim(min(xs) - padding_x, max(xs) + padding_x)
+            ax.set_ylim(min(ys) - padding_y, max(ys) + padding_y)
+            ax.set_aspect('equal', adjustable='box')
+            ax.set_title(f"{i + 1}. {run_title(lane.run)}", fontsize=9, color=lane.color)
+            ax.tick_params(labelsize=8)
+            ax.grid(True, linestyle='--')
+            lane.ax = ax
+            lane.body = ax.scatter([sim.x_body], [sim.y_body], color=lane.color, s=60, zorder=5, animated=True)
+
+        self.speed_ax = self.figure.add_subplot(grid[rows, :])
+        for i, lane in enumerate(self.lanes):
+            lane.decimator.reset()
+            lane.decimator.update(lane.simulation.time_points, lane.simulation.velocity_points)
+            lane.speed_line, = self.speed_ax.plot(*lane.decimator.points(), color=lane.color,
+                                                  label=f"{i + 1}. {run_title(lane.run)}", animated=True)
+        self.speed_ax.set_xlim(0, self.speed_limits[0])
+        self.speed_ax.set_ylim(0, self.speed_limits[1])
+        self.speed_ax.set_xlabel("Время (с)", fontsize=10)
+        self.speed_ax.set_ylabel("Скорость (м/с)", fontsize=10)
+        self.speed_ax.legend(fontsize=8, loc='upper right')
+        self.speed_ax.grid(True, linestyle='--')
+        self.canvas.draw()
+
+    def onDraw(self, event):
+        if not self.lanes or self.speed_ax is None:
+            return
+        self.backgrounds = {ax: self.canvas.copy_from_bbox(ax.bbox)
+                            for ax in [lane.ax for lane in self.lanes] + [self.speed_ax]}
+        for lane in self.lanes:
+            lane.ax.draw_artist(lane.body)
+            self.speed_ax.draw_artist(lane.speed_line)
+
+    def updateAnimation(self):
+        self.clock += self.dt
+        changed = [lane for lane in self.lanes if lane.advance(self.clock)]
+        self.clock_label.setText(f"t = {self.clock:.2f} с")
+        if all(lane.is_done() for lane in self.lanes):
+            self.timer.stop()
+            self.pause_button.setEnabled(False)
+        if not changed:
+            return
+
+        t_max = max(lane.simulation.time_points[-1] for lane in self.lanes)
+        v_max = max(lane.v_max for lane in self.lanes)
+        t_limit, v_limit = self.speed_limits
+        if t_max > t_limit or v_max > v_limit:
+            self.speed_limits = (2 * t_max if t_max > t_limit else t_limit,
+                                 1.2 * v_max if v_max > v_limit else v_limit)
+            self.speed_ax.set_xlim(0, self.speed_limits[0])
+            self.speed_ax.set_ylim(0, self.speed_limits[1])
+            self.canvas.draw()
+            return
+
+        if not self.backgrounds:
+            return
+        for lane in changed:
+            self.canvas.restore_region(self.backgrounds[lane.ax])
+            lane.ax.draw_artist(lane.body)
+            self.canvas.blit(lane.ax.bbox)
+        self.canvas.restore_region(self.backgrounds[self.speed_ax])
+        for lane in self.lanes:
+            self.speed_ax.draw_artist(lane.speed_line)
+        self.canvas.blit(self.speed_ax.bbox)
+
+    def closeEvent(self, event):
+        self.timer.stop()
+        super().closeEvent(event)
@@ -0,0 +1,105 @@
+import numpy as np
+
+
+def lttb(x, y, n_out):
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = x.size
+    if n_out >= n or n_out < 3:
+        return x, y
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < n_out - 1 else n
+        avg_x = x[end:next_end].mean() if next_end > end else x[-1]
+        avg_y = y[end:next_end].mean() if next_end > end else y[-1]
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return x[selected], y[selected]
+
+
+class MinMaxDecimator:
+    def __init__(self, max_buckets=1000):
+        self.max_buckets = max(1, int(max_buckets))
+        self.reset()
+
+    def reset(self):
+        self._t = np.empty(1024)
+        self._v = np.empty(1024)
+        self._n = 0
+        self._bucket_size = 1
+        self._done = 0
+        self._mins = np.empty(0, dtype=np.int64)
+        self._maxs = np.empty(0, dtype=np.int64)
+
+    def set_max_buckets(self, max_buckets):
+        max_buckets = max(1, int(max_buckets))
+        if max_buckets != self.max_buckets:
+            self.max_buckets = max_buckets
+            self._rebuild()
+
+    def _rebuild(self):
+        n = self._n
+        t, v = self._t[:n].copy(), self._v[:n].copy()
+        self.reset()
+        self._append(t, v)
+
+    def _append(self, time, velocity):
+        n_new = len(time)
+        if self._n + n_new > self._t.size:
+            size = max(self._t.size * 2, self._n + n_new)
+            self._t = np.resize(self._t, size)
+            self._v = np.resize(self._v, size)
+        self._t[self._n:self._n + n_new] = time
+        self._v[self._n:self._n + n_new] = velocity
+        self._n += n_new
+        self._collect_buckets()
+
+    def _collect_buckets(self):
+        bs = self._bucket_size
+        end = self._done + (self._n - self._done) // bs * bs
+        if end > self._done:
+            block = self._v[self._done:end].reshape(-1, bs)
+            offsets = np.arange(self._done, end, bs)
+            self._mins = np.concatenate([self._mins, offsets + block.argmin(axis=1)])
+            self._maxs = np.concatenate([self._maxs, offsets + block.argmax(axis=1)])
+            self._done = end
+
+        while self._mins.size > self.max_buckets:
+            if self._mins.size % 2:
+                self._mins = self._mins[:-1]
+                self._maxs = self._maxs[:-1]
+                self._done -= self._bucket_size
+            m0, m1 = self._mins[0::2], self._mins[1::2]
+            self._mins = np.where(self._v[m0] <= self._v[m1], m0, m1)
+            m0, m1 = self._maxs[0::2], self._maxs[1::2]
+            self._maxs = np.where(self._v[m0] >= self._v[m1], m0, m1)
+            self._bucket_size *= 2
+            self._collect_buckets()
+
+    def update(self, time, velocity):
+        if len(time) < self._n:
+            self.reset()
+        if len(time) > self._n:
+            self._append(np.asarray(time[self._n:], dtype=np.float64),
+                         np.asarray(velocity[self._n:], dtype=np.float64))
+
+    def data(self):
+        return self._t[:self._n], self._v[:self._n]
+
+    def points(self):
+        if self._n == 0:
+            return np.empty(0), np.empty(0)
+        indices = [np.array([0]), self._mins, self._maxs]
+        if self._done < self._n:
+            tail = self._v[self._done:self._n]
+            indices.append(np.array([self._done + int(tail.argmin()), self._done + int(tail.argmax())]))
+        indices.append(np.array([self._n - 1]))
+        idx = np.unique(np.concatenate(indices))
+        return self._t[idx], self._v[idx]
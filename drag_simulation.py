@@ -0,0 +1,387 @@
+import copy
+
+import numpy as np
+
+from simulation import Simulation
+from rollup_simulation import RollupSimulation
+from batch_simulation import _broadcast_params
+
+
+INCLINE_DOWN, HORIZONTAL, APPROACH, INCLINE_UP, DONE = range(5)
+
+_DP_A = (
+    (),
+    (1 / 5,),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+    (35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84),
+)
+_DP_B = _DP_A[6] + (0.0,)
+_DP_E = (71 / 57600, 0.0, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40)
+
+
+def _hermite(y0, dy0, y1, dy1, h, theta):
+    t2 = theta * theta
+    t3 = t2 * theta
+    return ((2 * t3 - 3 * t2 + 1) * y0 + (t3 - 2 * t2 + theta) * h * dy0
+            + (-2 * t3 + 3 * t2) * y1 + (t3 - t2) * h * dy1)
+
+
+def _first_root(y0, dy0, y1, dy1, h, level, iterations=40):
+    low = np.zeros_like(y0)
+    high = np.ones_like(y0)
+    sign0 = np.sign(y0 - level)
+    for _ in range(iterations):
+        mid = 0.5 * (low + high)
+        same = np.sign(_hermite(y0, dy0, y1, dy1, h, mid) - level) == sign0
+        low = np.where(same, mid, low)
+        high = np.where(same, high, mid)
+    return high
+
+
+class _DragLanes:
+    def _init_lanes(self, segment, speed, friction_incline, friction_horizontal, drag, lengths):
+        self.g = 9.81
+        self.shape = segment.shape
+        self._segment = segment.ravel().copy()
+        self._s = np.zeros(self._segment.size)
+        self._v = speed.ravel().copy()
+        self._t = np.zeros(self._segment.size)
+        self._h = np.full(self._segment.size, 1e-2)
+        self._sin = np.sin(self.angle).ravel()
+        self._cos = np.cos(self.angle).ravel()
+        self._mu_i = friction_incline.ravel()
+        self._mu_h = friction_horizontal.ravel()
+        self._k = drag.ravel()
+        self._lengths = [length.ravel() for length in lengths]
+        self._stop_segment = np.full(self._segment.size, -1, dtype=np.int8)
+        self._settle(np.ones(self._segment.size, dtype=bool))
+
+    def set_friction(self, friction_incline, friction_horizontal, t=None):
+        self._mu_i = np.broadcast_to(np.asarray(friction_incline, dtype=np.float64), self.shape).ravel().copy()
+        self._mu_h = np.broadcast_to(np.asarray(friction_horizontal, dtype=np.float64), self.shape).ravel().copy()
+        idx = np.flatnonzero((self._segment == DONE) & (self._stop_segment >= 0))
+        segment = self._stop_segment[idx]
+        resting = self._s[idx] < self._segment_length(segment, idx)
+        idx = idx[resting & (self._force(segment, idx) > 0)]
+        self._segment[idx] = self._stop_segment[idx]
+        self._h[idx] = 1e-2
+        if t is not None:
+            t = np.broadcast_to(np.asarray(t, dtype=np.float64), self.shape).ravel()
+            self._t[idx] = np.maximum(self._t[idx], t[idx])
+
+    def _view(self, a):
+        return a.reshape(self.shape)
+
+    @property
+    def t_global(self):
+        return self._view(self._t)
+
+    @property
+    def distance(self):
+        return self._view(self._s)
+
+    def _current_segment(self):
+        return self._view(np.where(self._segment == DONE, self._stop_segment, self._segment))
+
+    def _force(self, segment, idx):
+        g, sin, cos = self.g, self._sin[idx], self._cos[idx]
+        mu_i, mu_h = self._mu_i[idx], self._mu_h[idx]
+        return np.select(
+            [segment == INCLINE_DOWN, segment == INCLINE_UP],
+            [g * sin - mu_i * g * cos, -g * sin - mu_i * g * cos],
+            -mu_h * g,
+        )
+
+    def _segment_length(self, segment, idx):
+        return np.choose(np.minimum(segment, DONE - 1), [l[idx] for l in self._lengths])
+
+    def _settle(self, mask):
+        idx = np.flatnonzero(mask & (self._segment != DONE))
+        resting = (self._v[idx] <= 1e-12) & (self._force(self._segment[idx], idx) <= 0)
+        self._finish(idx[resting])
+
+    def _finish(self, idx):
+        self._stop_segment[idx] = self._segment[idx]
+        self._segment[idx] = DONE
+        self._v[idx] = 0.0
+
+    def _transition(self, idx):
+        seg = self._segment[idx]
+        entering = (seg == INCLINE_DOWN) | (seg == APPROACH)
+        self._s[idx] = np.where(entering, 0.0, self._s[idx])
+        self._v[idx] = np.where(entering, self._v[idx] * self._cos[idx], self._v[idx])
+        ending = idx[~entering]
+        self._stop_segment[ending] = self._segment[ending]
+        self._segment[ending] = DONE
+        moved = idx[entering]
+        self._segment[moved] = np.where(self._segment[moved] == INCLINE_DOWN, HORIZONTAL, INCLINE_UP)
+        mask = np.zeros(self._segment.shape, dtype=bool)
+        mask[moved] = True
+        self._settle(mask)
+
+    def is_finished(self):
+        return self._view(self._segment == DONE)
+
+    def is_stopped(self):
+        return self.is_finished()
+
+    def advance(self, t_end=None, rtol=1e-6, atol=1e-9, max_iterations=100000):
+        for _ in range(max_iterations):
+            active = self._segment != DONE
+            if t_end is not None:
+                active &= self._t < t_end - 1e-12
+            idx = np.flatnonzero(active)
+            if idx.size == 0:
+                break
+            self._rk_step(idx, t_end, rtol, atol)
+        return self
+
+    def _rk_step(self, idx, t_end, rtol, atol):
+        seg = self._segment[idx]
+        force = self._force(seg, idx)
+        k = self._k[idx]
+        s0, v0 = self._s[idx], self._v[idx]
+        h = self._h[idx]
+        if t_end is not None:
+            h = np.minimum(h, t_end - self._t[idx])
+
+        vs, acc = [], []
+        for a_row in _DP_A:
+            v = v0 + h * sum(a * acc[j] for j, a in enumerate(a_row) if a) if a_row else v0
+            vs.append(v)
+            acc.append(force - k * v * np.abs(v))
+        s1 = s0 + h * sum(b * v for b, v in zip(_DP_B, vs) if b)
+        v1 = vs[6]
+        err_s = h * sum(e * v for e, v in zip(_DP_E, vs) if e)
+        err_v = h * sum(e * a for e, a in zip(_DP_E, acc) if e)
+        err = np.maximum(np.abs(err_s) / (atol + rtol * np.maximum(np.abs(s0), np.abs(s1))),
+                         np.abs(err_v) / (atol + rtol * np.maximum(np.abs(v0), np.abs(v1))))
+        err = np.maximum(err, 1e-10)
+        accepted = err <= 1.0
+        factor = np.clip(0.9 * err ** -0.2, 0.2, 5.0)
+        self._h[idx] = np.where(accepted, np.maximum(self._h[idx], h) * factor, h * factor)
+
+        length = self._segment_length(seg, idx)
+        stop_event = accepted & (v1 <= 0.0) & (v0 > 0.0)
+        end_event = accepted & (s1 >= length)
+        theta_stop = np.full(idx.size, 2.0)
+        theta_end = np.full(idx.size, 2.0)
+        if stop_event.any():
+            e = stop_event
+            theta_stop[e] = _first_root(v0[e], acc[0][e], v1[e], acc[6][e], h[e], 0.0)
+        if end_event.any():
+            e = end_event
+            theta_end[e] = _first_root(s0[e], v0[e], s1[e], v1[e], h[e], length[e])
+        theta = np.minimum(np.minimum(theta_stop, theta_end), 1.0)
+
+        refine = theta < 0.98
+        self._h[idx[refine]] = (theta * h * 1.01)[refine]
+        accepted &= ~refine
+        stop_event &= accepted
+        end_event &= accepted
+
+        s_new = s1.copy()
+        v_new = v1.copy()
+        e = theta < 1.0
+        if e.any():
+            s_new[e] = _hermite(s0[e], v0[e], s1[e], v1[e], h[e], theta[e])
+            v_new[e] = _hermite(v0[e], acc[0][e], v1[e], acc[6][e], h[e], theta[e])
+        stopped = stop_event & (theta_stop <= theta_end)
+        reached = end_event & ~stopped
+        s_new = np.where(reached, length, np.minimum(s_new, length))
+        v_new = np.where(stopped, 0.0, np.maximum(v_new, 0.0))
+
+        a_idx = idx[accepted]
+        self._s[a_idx] = s_new[accepted]
+        self._v[a_idx] = v_new[accepted]
+        self._t[a_idx] += (theta * h)[accepted]
+
+        if stopped.any():
+            self._finish(idx[stopped])
+        if reached.any():
+            self._transition(idx[reached])
+
+
+class BatchDragSimulation(_DragLanes):
+    def __init__(self, angle, length, horizontal_length, v0, friction_incline, friction_horizontal, drag):
+        angle, length, horizontal_length, v0, friction_incline, friction_horizontal, drag = _broadcast_params(
+            angle, length, horizontal_length, v0, friction_incline, friction_horizontal, drag
+        )
+        self.angle = np.radians(angle)
+        self.L = length
+        self.horizontal_length = horizontal_length
+        self.v0 = v0
+        self.friction_incline = friction_incline
+        self.friction_horizontal = friction_horizontal
+        self.drag = drag
+        self.body_radius = 0.2
+        self.reset()
+
+    def reset(self):
+        segment = np.full(self.angle.shape, INCLINE_DOWN, dtype=np.int8)
+        zeros = np.zeros(self.angle.shape)
+        self._init_lanes(segment, self.v0, self.friction_incline, self.friction_horizontal, self.drag,
+                         [self.L, self.horizontal_length, zeros, zeros])
+
+    @property
+    def on_inclined_plane(self):
+        return self._current_segment() == INCLINE_DOWN
+
+    @property
+    def stalled(self):
+        return self.is_finished() & self.on_inclined_plane
+
+    @property
+    def x_body(self):
+        cos = np.cos(self.angle)
+        return np.where(self.on_inclined_plane, self.distance * cos, self.L * cos + self.distance)
+
+    @property
+    def y_body(self):
+        return np.where(self.on_inclined_plane, (self.L - self.distance) * np.sin(self.angle), 0.0) + self.body_radius
+
+    @property
+    def velocity(self):
+        return self._view(self._v)
+
+    def run(self, max_iterations=100000):
+        return self.advance(None, max_iterations=max_iterations)
+
+
+class BatchDragRollupSimulation(_DragLanes):
+    def __init__(self, angle_deg, length, v0_val, fric_inc, fric_hor, init_h_dist_param, drag):
+        angle_deg, length, v0_val, fric_inc, fric_hor, init_h_dist_param, drag = _broadcast_params(
+            angle_deg, length, v0_val, fric_inc, fric_hor, init_h_dist_param, drag
+        )
+        self.angle = np.radians(angle_deg)
+        self.L = length
+        self.v0_input = np.abs(v0_val)
+        self.friction_incline = fric_inc
+        self.friction_horizontal = fric_hor
+        self.init_h_dist = init_h_dist_param
+        self.drag = drag
+        self.body_radius = 0.2
+        self.base_x = 0.0
+        self.base_y = 0.0
+        self.peak_x = np.where((self.L > 0) & (self.angle < np.pi / 2 - 0.01), -self.L * np.cos(self.angle), 0.0)
+        self.peak_y = self.L * np.sin(self.angle)
+        self.reset()
+
+    def reset(self):
+        at_base = np.abs(self.init_h_dist) < 1e-9
+        segment = np.where(at_base, INCLINE_UP, APPROACH).astype(np.int8)
+        speed = np.where(self.v0_input > 1e-9, self.v0_input, 0.0)
+        speed = np.where(at_base, speed * np.cos(self.angle), speed)
+        zeros = np.zeros(self.angle.shape)
+        self._init_lanes(segment, speed, self.friction_incline, self.friction_horizontal, self.drag,
+                         [zeros, zeros, self.init_h_dist, self.L])
+
+    @property
+    def on_approach(self):
+        return self._current_segment() == APPROACH
+
+    @property
+    def on_incline(self):
+        return self._current_segment() == INCLINE_UP
+
+    @property
+    def dist_incline(self):
+        return np.where(self.on_incline, self.distance, 0.0)
+
+    @property
+    def x_body(self):
+        x = np.where(self.on_approach, self.init_h_dist - self.distance,
+                     self.base_x - self.distance * np.cos(self.angle))
+        return np.where(x < self.peak_x - 1e-6, self.peak_x, x)
+
+    @property
+    def y_body(self):
+        y = np.where(self.on_approach, self.base_y, self.base_y + self.distance * np.sin(self.angle))
+        return y + self.body_radius
+
+    @property
+    def velocity(self):
+        v = self._view(self._v)
+        return np.where(self.on_approach, -v, v)
+
+    def reached_peak(self):
+        return self.is_finished() & self.on_incline & (self.distance >= self.L - 1e-6)
+
+    def run(self, max_iterations=100000):
+        return self.advance(None, max_iterations=max_iterations)
+
+
+class DragSimulation(Simulation):
+    def __init__(self, angle, length, horizontal_length, v0, friction_incline, friction_horizontal, drag):
+        self.drag = drag
+        super().__init__(angle, length, horizontal_length, v0, friction_incline, friction_horizontal)
+
+    def reset(self):
+        super().reset()
+        self.lanes = BatchDragSimulation(np.degrees(self.angle), self.L, self.horizontal_length, self.v0,
+                                         self.friction_incline, self.friction_horizontal, self.drag)
+
+    def step(self, dt):
+        self.lanes.advance(self.time_points[-1] + dt)
+        self.x_body = float(self.lanes.x_body)
+        self.y_body = float(self.lanes.y_body)
+        self.velocity = float(self.lanes.velocity)
+        self.on_inclined_plane = bool(self.lanes.on_inclined_plane)
+        self.time_points.append(self.time_points[-1] + dt)
+        self.velocity_points.append(self.velocity)
+        return self.time_points[-1], self.velocity, self.x_body, self.y_body
+
+    def is_finished(self):
+        return bool(self.lanes.is_finished())
+
+    def _snapshot_extra(self):
+        return copy.deepcopy(self.lanes)
+
+    def _restore_extra(self, extra):
+        self.lanes = copy.deepcopy(extra)
+
+    def _params_changed(self):
+        self.lanes.set_friction(self.friction_incline, self.friction_horizontal, self.time_points[-1])
+
+
+class DragRollupSimulation(RollupSimulation):
+    def __init__(self, angle_deg, length, v0_val, fric_inc, fric_hor, init_h_dist_param, drag):
+        self.drag = drag
+        super().__init__(angle_deg, length, v0_val, fric_inc, fric_hor, init_h_dist_param)
+
+    def reset(self):
+        super().reset()
+        self.lanes = BatchDragRollupSimulation(np.degrees(self.angle), self.L, self.v0_input,
+                                               self.friction_incline, self.friction_horizontal,
+                                               self.init_h_dist, self.drag)
+        self._sync()
+
+    def _sync(self):
+        self.x_body = float(self.lanes.x_body)
+        self.y_body = float(self.lanes.y_body)
+        self.velocity = float(self.lanes.velocity)
+        self.on_approach = bool(self.lanes.on_approach)
+        self.on_incline = bool(self.lanes.on_incline)
+        self.dist_incline = float(self.lanes.dist_incline)
+        self._finished = bool(self.lanes.is_finished())
+
+    def step(self, dt_param):
+        self.t_global += dt_param
+        self.lanes.advance(self.t_global)
+        self._sync()
+        self.time_points.append(self.t_global)
+        self.velocity_points.append(abs(self.velocity))
+        return self.time_points[-1], self.velocity, self.x_body, self.y_body
+
+    def _snapshot_extra(self):
+        return copy.deepcopy(self.lanes)
+
+    def _restore_extra(self, extra):
+        self.lanes = copy.deepcopy(extra)
+
+    def _params_changed(self):
+        self.lanes.set_friction(self.friction_incline, self.friction_horizontal, self.t_global)
+        self._sync()
@@ -0,0 +1,356 @@
+import argparse
+import json
+import sys
+from functools import partial
+
+import numpy as np
+
+from simulation import Simulation
+from rollup_simulation import RollupSimulation
+from snapshot import run_to_completion
+from batch_simulation import BatchSimulation, BatchRollupSimulation, param_names
+from jit_kernels import trajectories as kernel_trajectories
+
+
+GOLDEN_VERSION = 1
+SCENARIOS = ('roll_down', 'roll_up')
+FIELDS = ('time', 'velocity', 'x', 'y')
+DEFAULT_ATOL = {'time': 1e-9, 'velocity': 1e-9, 'x': 1e-9, 'y': 1e-9}
+DEFAULT_RTOL = 1e-9
+ENGINE_TOLERANCES = {
+    'batch_float32': {'atol': dict.fromkeys(FIELDS, 1e-4), 'rtol': 2e-4, 'step_slack': 1},
+}
+G = 9.81
+VERTICAL_ANGLE = float(np.degrees(np.pi / 2 - 0.01))
+SPECIAL_ANGLES = (0.0, 90.0, VERTICAL_ANGLE, float(np.nextafter(VERTICAL_ANGLE, 0)))
+
+
+def _edge_cases(scenario_type):
+    stall_angle = float(np.degrees(np.arctan(0.3)))
+    if scenario_type == 'roll_down':
+        return [
+            (30, 10, 10, 5, 0.1, 0.1),
+            (0, 10, 10, 5, 0.1, 0.1),
+            (0, 10, 10, 0, 0.1, 0.1),
+            (90, 10, 10, 0, 0.5, 0.1),
+            (VERTICAL_ANGLE, 10, 10, 2, 0.2, 0.2),
+            (np.nextafter(VERTICAL_ANGLE, 0), 10, 10, 2, 0.2, 0.2),
+            (stall_angle, 10, 10, 0, 0.3, 0.1),
+            (stall_angle, 10, 10, 1, 0.3, 0.1),
+            (10, 10, 10, 0, 0.5, 0.1),
+            (10, 10, 10, 3, 0.5, 0.1),
+            (45, 10, 10, 0, 0.0, 0.0),
+            (30, 10, 1e-3, 5, 0.1, 0.1),
+            (30, 1e-3, 10, 5, 0.1, 0.1),
+            (60, 5, 20, 20, 0.0, 1.0),
+            (0, 0.1, 10, 1, 0.0, 0.1),
+        ]
+
+    def stop_distance(v0, friction):
+        return v0 ** 2 / (2 * friction * G)
+
+    def exact_incline_stop(angle, friction, dt=0.05):
+        a = np.radians(angle)
+        return G * (np.sin(a) + friction * np.cos(a)) * dt / np.cos(a)
+
+    return [
+        (30, 10, 8, 0.1, 0.2, 5),
+        (30, 10, 8, 0.1, 0.2, 0),
+        (30, 10, 0, 0.1, 0.2, 0),
+        (90, 10, 8, 0.1, 0.2, 0),
+        (VERTICAL_ANGLE, 10, 8, 0.1, 0.2, 0),
+        (VERTICAL_ANGLE, 10, 8, 0.1, 0.2, 5),
+        (np.nextafter(VERTICAL_ANGLE, 0), 10, 8, 0.1, 0.2, 5),
+        (30, 10, 8, 0.1, 0.2, 1e-10),
+        (30, 10, 8, 0.1, 0.2, 1e-7),
+        (30, 10, 1e-10, 0.1, 0.2, 5),
+        (30, 10, 1e-8, 0.1, 0.2, 5),
+        (30, 10, 1e-8, 0.1, 0.2, 0),
+        (30, 10, 1e-7, 0.1, 0.2, 0),
+        (30, 10, 1, 0.1, 0.0, 0.1000005),
+        (30, 10, 1, 0.1, 1.0, stop_distance(1, 1.0) + 5e-7),
+        (30, 10, 1, 0.1, 1.0, stop_distance(1, 1.0) + 2e-6),
+        (30, 10, 1, 0.1, 1.0, stop_distance(1, 1.0)),
+        (30, 10, exact_incline_stop(30, 0.1), 0.1, 0.2, 0),
+        (30, 10, 2 * exact_incline_stop(30, 0.1), 0.1, 0.2, 0),
+        (30, 10, 5, 0.1, 0.0, 5),
+        (0, 10, 8, 0.1, 0.2, 5),
+        (45, 1e-3, 20, 0.0, 0.0, 5),
+        (30, 10, 20, 0.0, 0.0, 20),
+    ]
+
+
+def generate_corpus(n_cases=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    corpus = {}
+    for scenario_type in SCENARIOS:
+        angle = rng.uniform(0, 90, n_cases)
+        special = rng.random(n_cases) < 0.05
+        angle[special] = rng.choice(SPECIAL_ANGLES, int(special.sum()))
+        length = rng.uniform(0.5, 20, n_cases)
+        v0 = np.where(rng.random(n_cases) < 0.2, 0.0, rng.uniform(0, 20, n_cases))
+        friction_incline = np.where(rng.random(n_cases) < 0.1, 0.0, rng.uniform(0, 1, n_cases))
+        friction_horizontal = np.where(rng.random(n_cases) < 0.1, 0.0, rng.uniform(0, 1, n_cases))
+        if scenario_type == 'roll_down':
+            columns = [angle, length, rng.uniform(0.5, 20, n_cases), v0, friction_incline, friction_horizontal]
+        else:
+            initial_distance = np.where(rng.random(n_cases) < 0.15, 0.0, rng.uniform(0, 20, n_cases))
+            columns = [angle, length, v0, friction_incline, friction_horizontal, initial_distance]
+        edges = np.array(_edge_cases(scenario_type), dtype=np.float64)
+        corpus[scenario_type] = np.vstack([edges, np.stack(columns, axis=1)])
+    return corpus
+
+
+def scalar_trajectories(scenario_type, params, dt=0.05, max_steps=20000):
+    trajectories = []
+    for row in params:
+        row = [float(value) for value in row]
+        sim = Simulation(*row) if scenario_type == 'roll_down' else RollupSimulation(*row)
+        x_points, y_points = run_to_completion(sim, max_steps, dt)
+        trajectories.append(np.array([sim.time_points, sim.velocity_points, x_points, y_points],
+                                     dtype=np.float64))
+    return trajectories
+
+
+def batch_trajectories(scenario_type, params, dt=0.05, max_steps=20000, dtype=np.float64):
+    params = np.asarray(params, dtype=np.float64)
+    n = params.shape[0]
+    columns = [params[:, i] for i in range(params.shape[1])]
+    if scenario_type == 'roll_down':
+        sim = BatchSimulation(*columns, dtype=dtype)
+        angle = np.radians(columns[0])
+        a_incline = G * np.sin(angle) - columns[4] * G * np.cos(angle)
+    else:
+        sim = BatchRollupSimulation(*columns, dtype=dtype)
+
+    def stopped():
+        done = sim.is_stopped()
+        if scenario_type == 'roll_down':
+            done = done | (sim.on_inclined_plane & (sim.velocity == 0) & (a_incline <= 0))
+        return done
+
+    def velocity():
+        if scenario_type == 'roll_down':
+            return sim.velocity
+        speed = np.abs(sim.velocity)
+        return np.where(sim.finished & (speed < 1e-6), 0.0, speed)
+
+    lanes = [np.arange(n)]
+    values = [np.stack([sim.t_global, np.abs(sim.velocity) if scenario_type == 'roll_up' else sim.velocity,
+                        sim.x_body, sim.y_body]).astype(np.float64)]
+    alive = ~stopped()
+    steps = 0
+    while alive.any() and steps < max_steps:
+        sim.step(dt)
+        steps += 1
+        idx = np.flatnonzero(alive)
+        lanes.append(idx)
+        values.append(np.stack([sim.t_global[idx], velocity()[idx], sim.x_body[idx], sim.y_body[idx]])
+                      .astype(np.float64))
+        alive &= ~stopped()
+
+    lanes = np.concatenate(lanes)
+    order = np.argsort(lanes, kind='stable')
+    data = np.concatenate(values, axis=1)[:, order]
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(lanes, minlength=n))])
+    return [data[:, offsets[i]:offsets[i + 1]] for i in range(n)]
+
+
+ENGINES = {
+    'scalar': scalar_trajectories,
+    'batch': batch_trajectories,
+    'batch_float32': partial(batch_trajectories, dtype=np.float32),
+    'kernels': partial(kernel_trajectories, backend='kernels'),
+}
+
+
+def register_engine(name, trajectories):
+    ENGINES[name] = trajectories
+
+
+def record_golden(path, corpus=None, dt=0.05, max_steps=20000, n_cases=2000, seed=0):
+    corpus = generate_corpus(n_cases, seed) if corpus is None else corpus
+    arrays = {}
+    for scenario_type, params in corpus.items():
+        trajectories = scalar_trajectories(scenario_type, params, dt, max_steps)
+        lengths = [t.shape[1] for t in trajectories]
+        arrays[f'{scenario_type}_params'] = np.asarray(params, dtype=np.float64)
+        arrays[f'{scenario_type}_offsets'] = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        arrays[f'{scenario_type}_data'] = np.concatenate(trajectories, axis=1)
+    meta = {
+        'version': GOLDEN_VERSION,
+        'dt': dt,
+        'max_steps': max_steps,
+        'seed': seed,
+        'scenarios': list(corpus),
+        'fields': list(FIELDS),
+    }
+    with open(path, 'wb') as f:
+        np.savez_compressed(f, meta=np.array(json.dumps(meta)), **arrays)
+    return GoldenSet(path)
+
+
+class GoldenSet:
+    def __init__(self, path):
+        self.path = path
+        with np.load(path) as archive:
+            self.meta = json.loads(str(archive['meta']))
+            if self.meta.get('version') != GOLDEN_VERSION:
+                raise ValueError(f"Неподдерживаемая версия эталонного набора: {self.meta.get('version')}")
+            self.params = {}
+            self.offsets = {}
+            self.data = {}
+            for scenario_type in self.meta['scenarios']:
+                self.params[scenario_type] = archive[f'{scenario_type}_params']
+                self.offsets[scenario_type] = archive[f'{scenario_type}_offsets']
+                self.data[scenario_type] = archive[f'{scenario_type}_data']
+
+    def __len__(self):
+        return sum(len(p) for p in self.params.values())
+
+    def trajectory(self, scenario_type, index):
+        offsets = self.offsets[scenario_type]
+        return self.data[scenario_type][:, offsets[index]:offsets[index + 1]]
+
+    def compare(self, engine='batch', atol=None, rtol=None, top=10, step_slack=None):
+        trajectories = ENGINES[engine] if isinstance(engine, str) else engine
+        tolerance = ENGINE_TOLERANCES.get(engine, {}) if isinstance(engine, str) else {}
+        atol = dict(DEFAULT_ATOL, **tolerance.get('atol', {}), **(atol or {}))
+        rtol = tolerance.get('rtol', DEFAULT_RTOL) if rtol is None else rtol
+        step_slack = tolerance.get('step_slack', 0) if step_slack is None else step_slack
+        report = GoldenReport(engine if isinstance(engine, str) else getattr(engine, '__name__', 'engine'),
+                              atol, rtol, top, step_slack)
+        for scenario_type, params in self.params.items():
+            results = trajectories(scenario_type, params, self.meta['dt'], self.meta['max_steps'])
+            for index, got in enumerate(results):
+                report.add(scenario_type, index, params[index], self.trajectory(scenario_type, index),
+                           np.asarray(got, dtype=np.float64))
+        return report
+
+
+def _error(value, reference):
+    error = np.abs(value - reference)
+    error[np.isnan(reference) & np.isnan(value)] = 0.0
+    error[np.isnan(error)] = np.inf
+    return error
+
+
+def _shifted_error(value, reference, slack):
+    n = value.size
+    error = _error(value, reference[:n])
+    for k in range(1, slack + 1):
+        m = min(n, reference.size - k)
+        if m > 0:
+            error[:m] = np.minimum(error[:m], _error(value[:m], reference[k:k + m]))
+        if n > k:
+            error[k:] = np.minimum(error[k:], _error(value[k:], reference[:n - k]))
+    return error
+
+
+class GoldenReport:
+    def __init__(self, engine, atol, rtol, top=10, step_slack=0):
+        self.engine = engine
+        self.atol = atol
+        self.rtol = rtol
+        self.top = top
+        self.step_slack = step_slack
+        self.cases = 0
+        self.failed = 0
+        self.length_mismatch = 0
+        self.max_error = {name: 0.0 for name in FIELDS}
+        self.worst = []
+
+    def add(self, scenario_type, index, params, reference, got):
+        self.cases += 1
+        n = min(reference.shape[1], got.shape[1])
+        case_failed = abs(reference.shape[1] - got.shape[1]) > self.step_slack
+        worst = None
+        if case_failed:
+            self.length_mismatch += 1
+            worst = (np.inf, 'length', n, reference.shape[1], got.shape[1])
+        for row, name in enumerate(FIELDS):
+            ref, value = reference[row, :n], got[row, :n]
+            error = _shifted_error(value, reference[row], self.step_slack)
+            if error.size == 0:
+                continue
+            self.max_error[name] = max(self.max_error[name], float(error.max()))
+            tolerance = self.atol[name] + self.rtol * np.abs(np.nan_to_num(ref))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratio = np.where(error > 0, error / tolerance, 0.0)
+            step = int(np.argmax(ratio))
+            if ratio[step] > 1:
+                case_failed = True
+                if worst is None or ratio[step] > worst[0]:
+                    worst = (float(ratio[step]), name, step, float(ref[step]), float(value[step]))
+        if case_failed:
+            self.failed += 1
+            self.worst.append((worst[0], scenario_type, index, tuple(float(p) for p in params)) + worst[1:])
+            self.worst.sort(key=lambda item: -item[0])
+            del self.worst[self.top:]
+
+    @property
+    def passed(self):
+        return self.failed == 0
+
+    def summary(self):
+        lines = [f"Движок: {self.engine}, траекторий: {self.cases}, расхождений: {self.failed}, "
+                 f"различная длина: {self.length_mismatch}"]
+        lines.append("Макс. отклонение: " + ", ".join(f"{name}={self.max_error[name]:.3g}" for name in FIELDS))
+        for ratio, scenario_type, index, params, field, step, ref, got in self.worst:
+            values = ", ".join(f"{name}={value:g}" for name, value in zip(param_names(scenario_type), params))
+            if field == 'length':
+                lines.append(f"  {scenario_type}#{index} ({values}): длина {got}, эталон {ref}")
+            else:
+                lines.append(f"  {scenario_type}#{index} ({values}): {field}[{step}] = {got!r}, "
+                             f"эталон {ref!r} (превышение допуска в {ratio:.3g} раз)")
+        return "\n".join(lines)
+
+
+def _tolerances(values):
+    atol = {}
+    for value in values or []:
+        if '=' in value:
+            name, number = value.split('=', 1)
+            if name not in FIELDS:
+                raise ValueError(f"Неизвестное поле: {name} (допустимо: {', '.join(FIELDS)})")
+            atol[name] = float(number)
+        else:
+            atol.update({name: float(value) for name in FIELDS})
+    return atol
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Эталонные траектории для проверки ускоренных движков")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = subparsers.add_parser('record', help="Записать эталонные траектории")
+    record_parser.add_argument('path')
+    record_parser.add_argument('--cases', type=int, default=2000, help="Случайных наборов на сценарий")
+    record_parser.add_argument('--seed', type=int, default=0)
+    record_parser.add_argument('--dt', type=float, default=0.05)
+    record_parser.add_argument('--max-steps', type=int, default=20000)
+
+    check_parser = subparsers.add_parser('check', help="Сравнить движок с эталоном")
+    check_parser.add_argument('path')
+    check_parser.add_argument('--engine', choices=sorted(ENGINES), default='batch')
+    check_parser.add_argument('--atol', nargs='*', help="Допуск для всех полей или поле=допуск")
+    check_parser.add_argument('--rtol', type=float, default=None,
+                              help=f"Относительный допуск (по умолчанию {DEFAULT_RTOL:g} или допуск движка)")
+    check_parser.add_argument('--step-slack', type=int, default=None,
+                              help="Допустимый сдвиг событий и длины траектории в шагах")
+    check_parser.add_argument('--top', type=int, default=10)
+
+    args = parser.parse_args()
+    if args.command == 'record':
+        golden = record_golden(args.path, dt=args.dt, max_steps=args.max_steps, n_cases=args.cases, seed=args.seed)
+        points = sum(data.shape[1] for data in golden.data.values())
+        print(f"Записано траекторий: {len(golden)}, точек: {points}")
+    else:
+        report = GoldenSet(args.path).compare(args.engine, _tolerances(args.atol), args.rtol, args.top,
+                                              args.step_slack)
+        print(report.summary())
+        sys.exit(0 if report.passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import matplotlib.pyplot as plt
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QComboBox, QPushButton, QLabel, QSpinBox
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
+
+from batch_simulation import BatchSimulation, BatchRollupSimulation
+
+
+OUTCOMES = {
+    'roll_down': [('x', "Конечная координата x (м)"), ('time', "Время движения (с)"),
+                  ('stalled', "Застревание на наклоне")],
+    'roll_up': [('x', "Конечная координата x (м)"), ('time', "Время движения (с)"),
+                ('peak', "Достижение вершины")],
+}
+
+
+def compute_outcome(scenario_type, outcome, params, angles, frictions, dt=0.05, max_steps=100000):
+    angle = np.asarray(angles)[None, :]
+    friction = np.asarray(frictions)[:, None]
+    if scenario_type == 'roll_down':
+        sim = BatchSimulation(angle, params['length'], params['horizontal_length'], params['v0'],
+                              friction, params['friction_horizontal']).run(dt, max_steps)
+    else:
+        sim = BatchRollupSimulation(angle, params['length'], params['v0'], friction,
+                                    params['friction_horizontal'], params['initial_distance']).run(dt, max_steps)
+
+    if outcome == 'x':
+        return sim.x_body
+    if outcome == 'time':
+        return sim.t_global
+    if outcome == 'stalled':
+        return sim.stalled.astype(np.float64)
+    if outcome == 'peak':
+        return sim.reached_peak().astype(np.float64)
+    raise ValueError(f"Неизвестная величина: {outcome}")
+
+
+def _compute_tile(args):
+    generation, rows, cols, scenario_type, outcome, params, angles, frictions = args
+    return generation, rows, cols, compute_outcome(scenario_type, outcome, params, angles, frictions)
+
+
+class HeatmapWindow(QDialog):
+    def __init__(self, parent=None, scenario_type='roll_down', params=None):
+        super().__init__(parent)
+        self.setWindowTitle("Карта исходов: угол × коэф. трения (наклон)")
+        self.setGeometry(250, 150, 750, 650)
+
+        self.scenario_type = scenario_type
+        self.params = params or {}
+        self.angle_range = (0.0, 90.0)
+        self.friction_range = (0.0, 1.0)
+        self.coarse_size = 32
+        self.tile_size = 125
+        self.executor = None
+        self.futures = []
+        self.generation = 0
+        self.image = None
+        self.colorbar = None
+        self.values = None
+
+        self.figure = plt.figure(figsize=(6, 5))
+        self.canvas = FigureCanvas(self.figure)
+        self.toolbar = NavigationToolbar(self.canvas, self)
+        self.ax = self.figure.add_subplot(111)
+
+        self.outcome_combo = QComboBox()
+        for _, label in OUTCOMES[self.scenario_type]:
+            self.outcome_combo.addItem(label)
+
+        self.resolution_spin = QSpinBox()
+        self.resolution_spin.setRange(self.coarse_size, 2000)
+        self.resolution_spin.setValue(1000)
+        self.resolution_spin.setSuffix(" точек")
+
+        self.build_button = QPushButton("Построить")
+        self.build_button.clicked.connect(self.startSweep)
+        self.progress_label = QLabel("")
+
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Величина:"))
+        controls.addWidget(self.outcome_combo)
+        controls.addWidget(QLabel("Сетка:"))
+        controls.addWidget(self.resolution_spin)
+        controls.addWidget(self.build_button)
+        controls.addStretch(1)
+        controls.addWidget(self.progress_label)
+
+        layout = QVBoxLayout()
+        layout.addLayout(controls)
+        layout.addWidget(self.toolbar)
+        layout.addWidget(self.canvas)
+        self.setLayout(layout)
+
+        self.poll_timer = QTimer()
+        self.poll_timer.timeout.connect(self.collectTiles)
+
+    def currentOutcome(self):
+        return OUTCOMES[self.scenario_type][self.outcome_combo.currentIndex()][0]
+
+    def _axis(self, value_range, n):
+        return np.linspace(value_range[0], value_range[1], n)
+
+    def startSweep(self):
+        self.cancelSweep()
+        self.generation += 1
+
+        n = self.resolution_spin.value()
+        outcome = self.currentOutcome()
+        self.angles = self._axis(self.angle_range, n)
+        self.frictions = self._axis(self.friction_range, n)
+
+        coarse_angles = self._axis(self.angle_range, self.coarse_size)
+        coarse_frictions = self._axis(self.friction_range, self.coarse_size)
+        coarse = compute_outcome(self.scenario_type, outcome, self.params, coarse_angles, coarse_frictions)
+
+        idx = np.rint(np.linspace(0, self.coarse_size - 1, n)).astype(np.int64)
+        self.values = coarse[np.ix_(idx, idx)].astype(np.float32)
+        self.drawImage(outcome)
+
+        tiles = self._prioritizedTiles(coarse, n)
+        self.tiles_total = len(tiles)
+        self.tiles_done = 0
+        self.updateProgress()
+
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=max(1, (os.cpu_count() or 2) - 1))
+        for rows, cols in tiles:
+            args = (self.generation, rows, cols, self.scenario_type, outcome, self.params,
+                    self.angles[cols[0]:cols[1]], self.frictions[rows[0]:rows[1]])
+            self.futures.append(self.executor.submit(_compute_tile, args))
+        self.poll_timer.start(50)
+
+    def _prioritizedTiles(self, coarse, n):
+        scale = (self.coarse_size - 1) / max(1, n - 1)
+        tiles = []
+        for r0 in range(0, n, self.tile_size):
+            for c0 in range(0, n, self.tile_size):
+                r1, c1 = min(n, r0 + self.tile_size), min(n, c0 + self.tile_size)
+                cr0, cr1 = int(r0 * scale), int(np.ceil((r1 - 1) * scale)) + 1
+                cc0, cc1 = int(c0 * scale), int(np.ceil((c1 - 1) * scale)) + 1
+                block = coarse[cr0:cr1, cc0:cc1]
+                spread = float(np.nanmax(block) - np.nanmin(block)) if block.size else 0.0
+
+                stall = np.tan(np.radians(self.angles[[c0, c1 - 1]]))
+                f_low, f_high = self.frictions[r0], self.frictions[r1 - 1]
+                crosses_stall = stall[0] <= f_high and stall[1] >= f_low
+                tiles.append((crosses_stall, spread, (r0, r1), (c0, c1)))
+        tiles.sort(key=lambda tile: (tile[0], tile[1]), reverse=True)
+        return [(rows, cols) for _, _, rows, cols in tiles]
+
+    def drawImage(self, outcome):
+        self.ax.clear()
+        label = dict(OUTCOMES[self.scenario_type])[outcome]
+        self.image = self.ax.imshow(
+            self.values, origin='lower', aspect='auto', interpolation='nearest', cmap='viridis',
+            extent=(self.angle_range[0], self.angle_range[1], self.friction_range[0], self.friction_range[1]),
+        )
+        stall_angles = np.linspace(self.angle_range[0], min(self.angle_range[1], 89.0), 200)
+        self.ax.plot(stall_angles, np.tan(np.radians(stall_angles)), 'w--', linewidth=1,
+                     label="tg(угла) = коэф. трения")
+        self.ax.set_xlim(*self.angle_range)
+        self.ax.set_ylim(*self.friction_range)
+        self.ax.set_xlabel("Угол наклона (градусы)", fontsize=12)
+        self.ax.set_ylabel("Коэф. трения (наклон)", fontsize=12)
+        self.ax.set_title(label, fontsize=14)
+        self.ax.legend(fontsize=9, loc='upper left')
+        if self.colorbar is None:
+            self.colorbar = self.figure.colorbar(self.image, ax=self.ax)
+        else:
+            self.colorbar.update_normal(self.image)
+        self.canvas.draw()
+
+    def collectTiles(self):
+        pending = []
+        updated = False
+        for future in self.futures:
+            if not future.done():
+                pending.append(future)
+                continue
+            if future.cancelled() or future.exception() is not None:
+                continue
+            generation, rows, cols, tile = future.result()
+            if generation != self.generation:
+                continue
+            self.values[rows[0]:rows[1], cols[0]:cols[1]] = tile
+            self.tiles_done += 1
+            updated = True
+        self.futures = pending
+
+        if updated:
+            self.image.set_data(self.values)
+            self.image.set_clim(np.nanmin(self.values), np.nanmax(self.values))
+            self.updateProgress()
+            self.canvas.draw_idle()
+        if not self.futures:
+            self.poll_timer.stop()
+
+    def updateProgress(self):
+        self.progress_label.setText(f"Готово тайлов: {self.tiles_done}/{self.tiles_total}")
+
+    def cancelSweep(self):
+        self.poll_timer.stop()
+        for future in self.futures:
+            future.cancel()
+        self.futures = []
+
+    def shutdown(self):
+        self.cancelSweep()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def closeEvent(self, event):
+        self.shutdown()
+        super().closeEvent(event)
@@ -0,0 +1,307 @@
+import numpy as np
+
+from simulation import Simulation
+from rollup_simulation import RollupSimulation
+from snapshot import run_to_completion
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda function: function
+
+
+BACKENDS = ('auto', 'kernels', 'python')
+G = 9.81
+C = 299792458.0
+BODY_RADIUS = 0.2
+
+D_SIN, D_COS, D_TAN, D_L, D_HORIZONTAL, D_FRICTION_INCLINE, D_FRICTION_HORIZONTAL = range(7)
+D_T, D_TIME, D_X, D_Y, D_V, D_ON_INCLINE, D_V0_HORIZONTAL = range(7)
+
+U_SIN, U_COS, U_L, U_FRICTION_INCLINE, U_FRICTION_HORIZONTAL, U_PEAK_X, U_PEAK_Y = range(7)
+U_TIME, U_X, U_Y, U_V, U_ON_APPROACH, U_ON_INCLINE, U_FINISHED, U_V_AT_BASE, U_DIST, U_T_SEGMENT = range(10)
+
+
+@njit(cache=True)
+def _clip(v, upper):
+    v = upper if upper < v else v
+    return v if v > 0 else 0.0
+
+
+@njit(cache=True)
+def roll_down_step(p, s, dt):
+    if s[D_ON_INCLINE] != 0.0:
+        a = G * p[D_SIN] - p[D_FRICTION_INCLINE] * G * p[D_COS]
+        if a < 0 and s[D_V] == 0:
+            a = 0.0
+        v = _clip(s[D_V] + a * dt, C)
+        ds = s[D_V] * dt + 0.5 * a * dt ** 2
+        s[D_X] += ds * p[D_COS]
+        s[D_Y] = -s[D_X] * p[D_TAN] + p[D_L] * p[D_SIN] + BODY_RADIUS
+        if s[D_X] >= p[D_L] * p[D_COS]:
+            s[D_ON_INCLINE] = 0.0
+            s[D_V0_HORIZONTAL] = _clip(v * p[D_COS], C)
+            s[D_T] = 0.0
+            s[D_X] = p[D_L] * p[D_COS]
+            s[D_Y] = BODY_RADIUS
+        s[D_V] = v
+    else:
+        a = -p[D_FRICTION_HORIZONTAL] * G
+        v = _clip(s[D_V0_HORIZONTAL] + a * s[D_T], C)
+        ds = s[D_V0_HORIZONTAL] * s[D_T] + 0.5 * a * s[D_T] ** 2
+        s[D_X] = p[D_L] * p[D_COS] + ds
+        s[D_Y] = BODY_RADIUS
+        s[D_V] = v
+    s[D_T] += dt
+    s[D_TIME] += dt
+
+
+@njit(cache=True)
+def roll_down_done(p, s):
+    if s[D_ON_INCLINE] == 0.0:
+        return s[D_X] >= p[D_L] * p[D_COS] + p[D_HORIZONTAL] or s[D_V] <= 0
+    return s[D_V] == 0 and G * p[D_SIN] - p[D_FRICTION_INCLINE] * G * p[D_COS] <= 0
+
+
+@njit(cache=True)
+def roll_up_step(p, s, dt):
+    if s[U_FINISHED] != 0.0:
+        s[U_TIME] += dt
+        return
+    if s[U_ON_APPROACH] != 0.0:
+        if abs(s[U_V]) < 1e-6 and s[U_X] > 1e-6:
+            s[U_FINISHED] = 1.0
+        elif s[U_V] == 0 and s[U_X] <= 1e-6:
+            s[U_FINISHED] = 1.0
+            s[U_X] = 0.0
+            s[U_ON_APPROACH] = 0.0
+            s[U_ON_INCLINE] = 1.0
+            s[U_V_AT_BASE] = 0.0
+            s[U_V] = 0.0
+        if s[U_FINISHED] == 0.0:
+            a_h = 0.0
+            if s[U_V] < -1e-9:
+                a_h = p[U_FRICTION_HORIZONTAL] * G
+            v_i = s[U_V]
+            v_f = v_i + a_h * dt
+            stopped = False
+            if v_i < -1e-9 and v_f >= -1e-9 and a_h > 1e-9:
+                dt_s = -v_i / a_h
+                if 0 < dt_s < dt:
+                    s[U_X] += v_i * dt_s + 0.5 * a_h * dt_s ** 2
+                    s[U_V] = 0.0
+                    s[U_T_SEGMENT] += dt_s
+                    stopped = True
+                    s[U_FINISHED] = 1.0
+            if not stopped:
+                s[U_X] += v_i * dt + 0.5 * a_h * dt ** 2
+                s[U_V] = v_f
+                s[U_T_SEGMENT] += dt
+            s[U_Y] = BODY_RADIUS
+            if s[U_V] >= -1e-9 and s[U_X] > 1e-6:
+                s[U_FINISHED] = 1.0
+                s[U_V] = 0.0
+            if s[U_X] <= 1e-6 and s[U_FINISHED] == 0.0:
+                s[U_X] = 0.0
+                s[U_ON_APPROACH] = 0.0
+                s[U_ON_INCLINE] = 1.0
+                s[U_V_AT_BASE] = s[U_V]
+                s[U_V] = _clip(abs(s[U_V_AT_BASE]) * p[U_COS], C)
+                if s[U_V] <= 1e-6:
+                    s[U_FINISHED] = 1.0
+                    s[U_V] = 0.0
+                s[U_DIST] = 0.0
+                s[U_T_SEGMENT] = 0.0
+    elif s[U_ON_INCLINE] != 0.0:
+        if abs(s[U_V]) < 1e-6 and s[U_DIST] < p[U_L] - 1e-6:
+            s[U_FINISHED] = 1.0
+        if s[U_FINISHED] == 0.0:
+            a_i = -G * p[U_SIN] - p[U_FRICTION_INCLINE] * G * p[U_COS]
+            v_i = s[U_V]
+            v_f = v_i + a_i * dt
+            stopped = False
+            if v_f <= 1e-6 and v_i > 1e-6 and abs(a_i) > 1e-9:
+                dt_s = -v_i / a_i
+                if 0 < dt_s < dt:
+                    s[U_DIST] += v_i * dt_s + 0.5 * a_i * dt_s ** 2
+                    s[U_T_SEGMENT] += dt_s
+                    stopped = True
+                    s[U_V] = 0.0
+                    s[U_FINISHED] = 1.0
+            if not stopped and v_i > 1e-6:
+                s[U_DIST] += v_i * dt + 0.5 * a_i * dt ** 2
+                s[U_V] = _clip(v_f, C)
+                s[U_T_SEGMENT] += dt
+                if s[U_DIST] >= p[U_L] - 1e-6:
+                    s[U_DIST] = p[U_L]
+                    s[U_FINISHED] = 1.0
+                elif s[U_V] <= 1e-6:
+                    s[U_FINISHED] = 1.0
+            elif v_i <= 1e-6:
+                s[U_T_SEGMENT] += dt
+                s[U_V] = 0.0
+                s[U_FINISHED] = 1.0
+        s[U_X] = 0.0 - s[U_DIST] * p[U_COS]
+        s[U_Y] = 0.0 + s[U_DIST] * p[U_SIN] + BODY_RADIUS
+        if s[U_X] < p[U_PEAK_X] - 1e-6:
+            s[U_X] = p[U_PEAK_X]
+        if s[U_DIST] > p[U_L] + 1e-6:
+            s[U_Y] = p[U_PEAK_Y] + BODY_RADIUS
+    s[U_TIME] += dt
+
+
+@njit(cache=True)
+def roll_up_speed(s):
+    speed = abs(s[U_V])
+    if s[U_FINISHED] != 0.0 and speed < 1e-6:
+        return 0.0
+    return speed
+
+
+@njit(cache=True)
+def roll_down_trajectory(p, s, dt, max_steps, out):
+    out[0, 0], out[1, 0], out[2, 0], out[3, 0] = s[D_TIME], s[D_V], s[D_X], s[D_Y]
+    n = 1
+    while n <= max_steps and not roll_down_done(p, s):
+        roll_down_step(p, s, dt)
+        out[0, n], out[1, n], out[2, n], out[3, n] = s[D_TIME], s[D_V], s[D_X], s[D_Y]
+        n += 1
+    return n
+
+
+@njit(cache=True)
+def roll_up_trajectory(p, s, dt, max_steps, out):
+    out[0, 0], out[1, 0], out[2, 0], out[3, 0] = s[U_TIME], abs(s[U_V]), s[U_X], s[U_Y]
+    n = 1
+    while n <= max_steps and s[U_FINISHED] == 0.0:
+        roll_up_step(p, s, dt)
+        out[0, n], out[1, n], out[2, n], out[3, n] = s[U_TIME], roll_up_speed(s), s[U_X], s[U_Y]
+        n += 1
+    return n
+
+
+@njit(cache=True)
+def roll_down_finals(p, s, dt, max_steps, steps):
+    for i in range(p.shape[0]):
+        n = 0
+        while n < max_steps and not roll_down_done(p[i], s[i]):
+            roll_down_step(p[i], s[i], dt)
+            n += 1
+        steps[i] = n
+
+
+@njit(cache=True)
+def roll_up_finals(p, s, dt, max_steps, steps):
+    for i in range(p.shape[0]):
+        n = 0
+        while n < max_steps and s[i, U_FINISHED] == 0.0:
+            roll_up_step(p[i], s[i], dt)
+            n += 1
+        steps[i] = n
+
+
+def prepare_roll_down(angle, length, horizontal_length, v0, friction_incline, friction_horizontal):
+    angle = np.radians(angle)
+    p = np.array([np.sin(angle), np.cos(angle), np.tan(angle), length, horizontal_length,
+                  friction_incline, friction_horizontal], dtype=np.float64)
+    s = np.array([0.0, 0.0, 0.0, length * np.sin(angle) + BODY_RADIUS, v0, 1.0, 0.0], dtype=np.float64)
+    return p, s
+
+
+def prepare_roll_up(angle_deg, length, v0_val, fric_inc, fric_hor, init_h_dist_param):
+    angle = np.radians(angle_deg)
+    v0 = abs(v0_val)
+    init_h_dist = float(init_h_dist_param)
+    peak_x = -length * np.cos(angle) if length > 0 and angle < np.pi / 2 - 0.01 else 0.0
+    p = np.array([np.sin(angle), np.cos(angle), length, fric_inc, fric_hor, peak_x, length * np.sin(angle)],
+                 dtype=np.float64)
+    s = np.zeros(10, dtype=np.float64)
+    s[U_X] = init_h_dist
+    s[U_Y] = BODY_RADIUS
+    s[U_ON_APPROACH] = 1.0
+    s[U_V] = -v0 if v0 > 1e-9 and init_h_dist > 1e-9 else 0.0
+    if abs(init_h_dist) < 1e-9:
+        s[U_ON_APPROACH] = 0.0
+        s[U_ON_INCLINE] = 1.0
+        s[U_X] = 0.0
+        if abs(v0) > 1e-9:
+            s[U_V] = v0 * np.cos(angle)
+            if s[U_V] <= 1e-6:
+                s[U_FINISHED] = 1.0
+        else:
+            s[U_V] = 0.0
+            s[U_FINISHED] = 1.0
+    return p, s
+
+
+def _check_scenario(scenario_type):
+    if scenario_type not in ('roll_down', 'roll_up'):
+        raise ValueError(f"Неизвестный сценарий: {scenario_type}")
+
+
+def _prepare(scenario_type, params):
+    prepare = prepare_roll_down if scenario_type == 'roll_down' else prepare_roll_up
+    prepared = [prepare(*[float(value) for value in row]) for row in params]
+    width_p, width_s = (7, 7) if scenario_type == 'roll_down' else (7, 10)
+    p = np.array([item[0] for item in prepared], dtype=np.float64).reshape(-1, width_p)
+    s = np.array([item[1] for item in prepared], dtype=np.float64).reshape(-1, width_s)
+    return p, s
+
+
+def _backend(backend):
+    if backend not in BACKENDS:
+        raise ValueError(f"Неизвестный вариант расчета: {backend} (допустимо: {', '.join(BACKENDS)})")
+    if backend == 'auto':
+        return 'kernels' if NUMBA_AVAILABLE else 'python'
+    return backend
+
+
+def _python_run(scenario_type, row, dt, max_steps):
+    row = [float(value) for value in row]
+    sim = Simulation(*row) if scenario_type == 'roll_down' else RollupSimulation(*row)
+    x_points, y_points = run_to_completion(sim, max_steps, dt)
+    return np.array([sim.time_points, sim.velocity_points, x_points, y_points], dtype=np.float64)
+
+
+def trajectories(scenario_type, params, dt=0.05, max_steps=20000, backend='auto'):
+    _check_scenario(scenario_type)
+    params = np.atleast_2d(np.asarray(params, dtype=np.float64))
+    if _backend(backend) == 'python':
+        return [_python_run(scenario_type, row, dt, max_steps) for row in params]
+    p, s = _prepare(scenario_type, params)
+    kernel = roll_down_trajectory if scenario_type == 'roll_down' else roll_up_trajectory
+    out = np.empty((4, max_steps + 1), dtype=np.float64)
+    result = []
+    for i in range(p.shape[0]):
+        n = kernel(p[i], s[i], float(dt), int(max_steps), out)
+        result.append(out[:, :n].copy())
+    return result
+
+
+def trajectory(scenario_type, params, dt=0.05, max_steps=20000, backend='auto'):
+    return trajectories(scenario_type, [params], dt, max_steps, backend)[0]
+
+
+def final_states(scenario_type, params, dt=0.05, max_steps=20000, backend='auto'):
+    _check_scenario(scenario_type)
+    params = np.atleast_2d(np.asarray(params, dtype=np.float64))
+    if _backend(backend) == 'python':
+        runs = [_python_run(scenario_type, row, dt, max_steps) for row in params]
+        return (np.array([run[:, -1] for run in runs]).reshape(-1, 4),
+                np.array([run.shape[1] - 1 for run in runs], dtype=np.int64))
+    p, s = _prepare(scenario_type, params)
+    steps = np.zeros(p.shape[0], dtype=np.int64)
+    if scenario_type == 'roll_down':
+        roll_down_finals(p, s, float(dt), int(max_steps), steps)
+        finals = s[:, [D_TIME, D_V, D_X, D_Y]]
+    else:
+        roll_up_finals(p, s, float(dt), int(max_steps), steps)
+        speed = [roll_up_speed(row) if n > 0 else abs(row[U_V]) for row, n in zip(s, steps)]
+        finals = np.stack([s[:, U_TIME], speed, s[:, U_X], s[:, U_Y]], axis=1)
+    return finals, steps
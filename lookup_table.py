@@ -0,0 +1,267 @@
+import argparse
+import bisect
+import json
+import os
+
+import numpy as np
+
+from batch_simulation import BatchSimulation, BatchRollupSimulation, param_names
+
+
+TABLE_VERSION = 1
+OUTPUTS = ('x_final', 't_total', 'v_base')
+ESTIMATES = ('spread', 'center')
+
+DEFAULT_AXES = {
+    'roll_down': {
+        'angle': np.linspace(0, 90, 13),
+        'length': np.linspace(1, 20, 8),
+        'horizontal_length': np.linspace(1, 20, 8),
+        'v0': np.linspace(0, 20, 9),
+        'friction_incline': np.linspace(0, 1, 11),
+        'friction_horizontal': np.linspace(0, 1, 11),
+    },
+    'roll_up': {
+        'angle': np.linspace(0, 90, 13),
+        'length': np.linspace(1, 20, 8),
+        'v0': np.linspace(0, 20, 9),
+        'friction_incline': np.linspace(0, 1, 11),
+        'friction_horizontal': np.linspace(0, 1, 11),
+        'initial_distance': np.linspace(0, 20, 9),
+    },
+}
+
+
+def simulate_end_states(scenario_type, params, dt=0.05, max_steps=20000):
+    if scenario_type == 'roll_down':
+        sim = BatchSimulation(*params).run(dt, max_steps)
+        v_base = sim.v_at_base
+    else:
+        sim = BatchRollupSimulation(*params).run(dt, max_steps)
+        v_base = np.abs(sim.v_at_base)
+    return np.stack([sim.x_body, sim.t_global, v_base], axis=-1), sim.is_stopped()
+
+
+def build_table(scenario_type, path, axes=None, dt=0.05, max_steps=20000, chunk_size=200000,
+                validation_samples=2000, seed=0):
+    names = param_names(scenario_type)
+    axes = axes or DEFAULT_AXES[scenario_type]
+    axes = [np.asarray(axes[name], dtype=np.float64) for name in names]
+    if any(axis.size < 2 or np.any(np.diff(axis) <= 0) for axis in axes):
+        raise ValueError("Каждая ось таблицы должна содержать не менее двух возрастающих узлов")
+
+    os.makedirs(path, exist_ok=True)
+    shape = tuple(axis.size for axis in axes)
+    values = np.lib.format.open_memmap(os.path.join(path, 'values.npy'), mode='w+',
+                                       dtype=np.float32, shape=shape + (len(OUTPUTS),))
+    flat = values.reshape(-1, len(OUTPUTS))
+    total = flat.shape[0]
+    unfinished = 0
+    for start in range(0, total, chunk_size):
+        stop = min(total, start + chunk_size)
+        idx = np.unravel_index(np.arange(start, stop), shape)
+        states, stopped = simulate_end_states(scenario_type, [axis[i] for axis, i in zip(axes, idx)],
+                                              dt, max_steps)
+        flat[start:stop] = states
+        unfinished += int((~stopped).sum())
+    values.flush()
+    del flat, values
+
+    cell_shape = tuple(n - 1 for n in shape)
+    centers = [0.5 * (axis[:-1] + axis[1:]) for axis in axes]
+    cell_errors = np.lib.format.open_memmap(os.path.join(path, 'cell_errors.npy'), mode='w+',
+                                            dtype=np.float32, shape=cell_shape + (len(OUTPUTS),))
+    flat_errors = cell_errors.reshape(-1, len(OUTPUTS))
+    grid = np.load(os.path.join(path, 'values.npy'), mmap_mode='r')
+    for start in range(0, flat_errors.shape[0], chunk_size):
+        stop = min(flat_errors.shape[0], start + chunk_size)
+        idx = np.unravel_index(np.arange(start, stop), cell_shape)
+        exact, _ = simulate_end_states(scenario_type, [c[i] for c, i in zip(centers, idx)], dt, max_steps)
+        approx = np.zeros_like(exact)
+        for corner in range(2 ** len(axes)):
+            approx += grid[tuple(i + ((corner >> d) & 1) for d, i in enumerate(idx))]
+        flat_errors[start:stop] = np.abs(exact - approx / 2 ** len(axes))
+    cell_errors.flush()
+    del grid, flat_errors, cell_errors
+
+    meta = {
+        'version': TABLE_VERSION,
+        'scenario_type': scenario_type,
+        'params': list(names),
+        'axes': [axis.tolist() for axis in axes],
+        'outputs': list(OUTPUTS),
+        'dt': dt,
+        'max_steps': max_steps,
+        'unfinished': unfinished,
+        'validation': None,
+    }
+    meta_path = os.path.join(path, 'meta.json')
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+    if validation_samples:
+        table = LookupTable(path)
+        rng = np.random.default_rng(seed)
+        samples = [rng.uniform(axis[0], axis[-1], validation_samples) for axis in axes]
+        exact, _ = simulate_end_states(scenario_type, samples, dt, max_steps)
+        approx, spread, _ = table.query_batch(*samples, estimate='spread')
+        _, center, _ = table.query_batch(*samples, estimate='center')
+        errors = np.abs(approx - exact)
+        meta['validation'] = {
+            name: {'max': float(errors[:, i].max()), 'p99': float(np.quantile(errors[:, i], 0.99)),
+                   'within_spread': float((errors[:, i] <= spread[:, i] + 1e-6).mean()),
+                   'within_center': float((errors[:, i] <= center[:, i] + 1e-6).mean()),
+                   'samples': validation_samples}
+            for i, name in enumerate(OUTPUTS)
+        }
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+    return LookupTable(path)
+
+
+def _check_estimate(estimate):
+    if estimate not in ESTIMATES:
+        raise ValueError(f"Неизвестная оценка погрешности: {estimate} (допустимо: {', '.join(ESTIMATES)})")
+
+
+class LookupTable:
+    def __init__(self, path):
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta.get('version') != TABLE_VERSION:
+            raise ValueError(f"Неподдерживаемая версия таблицы: {self.meta.get('version')}")
+        self.scenario_type = self.meta['scenario_type']
+        self.params = tuple(self.meta['params'])
+        self.outputs = tuple(self.meta['outputs'])
+        self.axes = [np.asarray(axis) for axis in self.meta['axes']]
+        self._axis_lists = [list(axis) for axis in self.meta['axes']]
+        self.values = np.load(os.path.join(path, 'values.npy'), mmap_mode='r')
+        self.cell_errors = np.load(os.path.join(path, 'cell_errors.npy'), mmap_mode='r')
+        self._values = self.values.view(np.ndarray)
+        self._cell_errors = self.cell_errors.view(np.ndarray)
+
+        shape = self._values.shape[:-1]
+        ndim = len(shape)
+        self._strides = [int(np.prod(shape[d + 1:])) for d in range(ndim)]
+        self._cell_strides = [int(np.prod([n - 1 for n in shape[d + 1:]])) for d in range(ndim)]
+        self._corner_bits = (np.arange(2 ** ndim)[:, None] >> np.arange(ndim)[::-1]) & 1
+        self._corner_offsets = self._corner_bits @ np.array(self._strides)
+        self._flat_values = self._values.reshape(-1, len(self.outputs))
+        self._flat_cell_errors = self._cell_errors.reshape(-1, len(self.outputs))
+
+    def contains(self, *params):
+        return all(axis[0] <= p <= axis[-1] for axis, p in zip(self._axis_lists, params))
+
+    def query(self, *params, estimate='spread'):
+        if len(params) != len(self.params):
+            raise ValueError(f"Ожидается параметров: {len(self.params)}")
+        _check_estimate(estimate)
+        if not self.contains(*params):
+            states, _ = simulate_end_states(self.scenario_type, [np.array([p], dtype=np.float64) for p in params],
+                                            self.meta['dt'], self.meta['max_steps'])
+            return dict(zip(self.outputs, states[0].tolist())), dict.fromkeys(self.outputs, 0.0)
+
+        base = 0
+        cell = 0
+        weights = []
+        for axis, stride, cell_stride, p in zip(self._axis_lists, self._strides, self._cell_strides, params):
+            i = min(max(bisect.bisect_right(axis, p) - 1, 0), len(axis) - 2)
+            base += i * stride
+            cell += i * cell_stride
+            weights.append((p - axis[i]) / (axis[i + 1] - axis[i]))
+        w = np.array(weights)
+        block = self._flat_values[base + self._corner_offsets]
+        values = np.where(self._corner_bits, w, 1.0 - w).prod(axis=1) @ block
+        if estimate == 'spread':
+            errors = block.max(axis=0) - block.min(axis=0)
+        else:
+            errors = self._flat_cell_errors[cell]
+        return dict(zip(self.outputs, values.tolist())), dict(zip(self.outputs, errors.tolist()))
+
+    def _locate(self, params):
+        lower = []
+        weights = []
+        for axis, p in zip(self.axes, params):
+            i = np.clip(np.searchsorted(axis, p, side='right') - 1, 0, axis.size - 2)
+            lower.append(i)
+            weights.append(np.clip((p - axis[i]) / (axis[i + 1] - axis[i]), 0.0, 1.0))
+        return lower, weights
+
+    def interpolate(self, *params):
+        params = np.broadcast_arrays(*[np.asarray(p, dtype=np.float64) for p in params])
+        lower, weights = self._locate(params)
+
+        result = np.zeros(params[0].shape + (len(self.outputs),))
+        for corner in range(2 ** len(lower)):
+            index = []
+            weight = np.ones(params[0].shape)
+            for d, (i, w) in enumerate(zip(lower, weights)):
+                bit = (corner >> d) & 1
+                index.append(i + bit)
+                weight = weight * (w if bit else 1.0 - w)
+            result += weight[..., None] * self._values[tuple(index)]
+        return result
+
+    def _enclosure(self, lower):
+        low = high = None
+        for corner in range(2 ** len(lower)):
+            corner_values = self._values[tuple(i + ((corner >> d) & 1) for d, i in enumerate(lower))]
+            low = corner_values if low is None else np.minimum(low, corner_values)
+            high = corner_values if high is None else np.maximum(high, corner_values)
+        return (high - low).astype(np.float64)
+
+    def query_batch(self, *params, estimate='spread'):
+        _check_estimate(estimate)
+        params = np.broadcast_arrays(*[np.asarray(p, dtype=np.float64) for p in params])
+        inside = np.ones(params[0].shape, dtype=bool)
+        for axis, p in zip(self.axes, params):
+            inside &= (p >= axis[0]) & (p <= axis[-1])
+        result = self.interpolate(*params)
+        lower = self._locate(params)[0]
+        if estimate == 'spread':
+            errors = self._enclosure(lower)
+        else:
+            errors = self._cell_errors[tuple(lower)].astype(np.float64)
+        if not inside.all():
+            outside = ~inside
+            states, _ = simulate_end_states(self.scenario_type, [p[outside] for p in params],
+                                            self.meta['dt'], self.meta['max_steps'])
+            result[outside] = states
+            errors[outside] = 0.0
+        return result, errors, inside
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Таблицы конечных состояний для быстрых запросов")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="Построить таблицу")
+    build_parser.add_argument('--scenario', choices=['roll_down', 'roll_up'], default='roll_down')
+    build_parser.add_argument('--out', required=True)
+    build_parser.add_argument('--dt', type=float, default=0.05)
+    build_parser.add_argument('--max-steps', type=int, default=20000)
+
+    query_parser = subparsers.add_parser('query', help="Запрос к таблице")
+    query_parser.add_argument('path')
+    query_parser.add_argument('params', type=float, nargs='+')
+    query_parser.add_argument('--estimate', choices=ESTIMATES, default='spread',
+                              help="Оценка погрешности: spread - размах значений в узлах ячейки, "
+                                   "center - ошибка интерполяции в центре ячейки (меньше, но чаще занижена)")
+
+    args = parser.parse_args()
+    if args.command == 'build':
+        table = build_table(args.scenario, args.out, dt=args.dt, max_steps=args.max_steps)
+        print(json.dumps(table.meta['validation'], indent=2, ensure_ascii=False))
+    else:
+        table = LookupTable(args.path)
+        values, errors = table.query(*args.params, estimate=args.estimate)
+        validation = table.meta['validation'] or {}
+        method = "по размаху в узлах ячейки" if args.estimate == 'spread' else "по центру ячейки"
+        for name in values:
+            coverage = validation.get(name, {}).get(f'within_{args.estimate}')
+            note = f", покрывает {coverage:.1%} проверочных точек" if coverage is not None else ""
+            print(f"{name}: {values[name]:.6f}, оценка погрешности {errors[name]:.6f} ({method}{note})")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,15 +5,21 @@ import matplotlib.pyplot as plt
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QPushButton, QLabel, QVBoxLayout, QWidget, QDialog,
     QLineEdit, QFormLayout, QGroupBox, QMessageBox, QHBoxLayout, QComboBox,
-    QDialogButtonBox, QTextBrowser
+    QDialogButtonBox, QTextBrowser, QSlider
 )
 
 from PyQt5.QtCore import QTimer, Qt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 
+from batch_simulation import param_names
 from simulation import Simulation
 from rollup_simulation import RollupSimulation
+from drag_simulation import DragSimulation, DragRollupSimulation
 from visualization import SpeedGraphWindow
+from heatmap_window import HeatmapWindow
+from painter_canvas import PainterCanvas
+from report_window import ReportDialog
+from comparison_window import ComparisonWindow, MAX_RUNS
 
 
 class AboutDialog(QDialog):
@@ -73,6 +79,7 @@ class InputDialog(QDialog):
         self.v0_input = QLineEdit("5")
         self.friction_incline_input = QLineEdit("0.1")
         self.friction_horizontal_input = QLineEdit("0.1")
+        self.drag_input = QLineEdit("0")
 
         self.init_dist_label = QLabel("Нач. гориз. расст. справа от наклона (м):")
         self.initial_distance_input = QLineEdit("5")
@@ -88,6 +95,9 @@ class InputDialog(QDialog):
         self.v0_input.setToolTip("Начальная скорость тела в м/с (модуль)")
         self.friction_incline_input.setToolTip("Коэффициент трения на наклонной плоскости (0-1)")
         self.friction_horizontal_input.setToolTip("Коэффициент трения на гориз. плоскости (0-1)")
+        self.drag_input.setToolTip(
+            "Коэффициент квадратичного сопротивления воздуха k (1/м): замедление k·v². 0 - без сопротивления"
+        )
         self.initial_distance_input.setToolTip(
             "Расстояние по горизонтали от основания наклонной плоскости вправо, где стартует тело"
         )
@@ -98,6 +108,7 @@ class InputDialog(QDialog):
         form_layout.addRow("Начальная скорость (м/с):", self.v0_input)
         form_layout.addRow("Коэф. трения (наклон):", self.friction_incline_input)
         form_layout.addRow("Коэф. трения (горизонт):", self.friction_horizontal_input)
+        form_layout.addRow("Сопротивление воздуха k (1/м):", self.drag_input)
         form_layout.addRow(self.init_dist_label, self.initial_distance_input)
 
         self.ok_button = QPushButton("OK")
@@ -141,6 +152,7 @@ class InputDialog(QDialog):
             v0 = abs(float(self.v0_input.text()))
             friction_incline = float(self.friction_incline_input.text())
             friction_horizontal = float(self.friction_horizontal_input.text())
+            drag = float(self.drag_input.text())
 
             read_initial_distance = 0.0
             if self.current_scenario_type == 'roll_up':
@@ -159,17 +171,20 @@ class InputDialog(QDialog):
                 raise ValueError("Коэф. трения (наклон) должен быть между 0 и 1")
             if not (0 <= friction_horizontal <= 1):
                 raise ValueError("Коэф. трения (горизонт) должен быть между 0 и 1")
+            if drag < 0:
+                raise ValueError("Коэф. сопротивления воздуха не может быть отрицательным")
             if v0 > 299792458:
                 raise ValueError("Начальная скорость не может быть больше скорости света")
 
             if self.current_scenario_type == 'roll_up' and v0 == 0 and read_initial_distance > 0:
                 raise ValueError("Для вката с расстояния начальная скорость должна быть > 0.")
 
-            return angle, length, horizontal_length, v0, friction_incline, friction_horizontal, read_initial_distance
+            return (angle, length, horizontal_length, v0, friction_incline, friction_horizontal,
+                    read_initial_distance, drag)
 
         except ValueError as e:
             QMessageBox.critical(self, "Ошибка ввода", str(e))
-            return None, None, None, None, None, None, None
+            return None, None, None, None, None, None, None, None
 
 
 class SimulationApp(QMainWindow):
@@ -183,11 +198,19 @@ class SimulationApp(QMainWindow):
         self.friction_incline = 0.1
         self.friction_horizontal = 0.1
         self.initial_distance_param = 5.0
+        self.drag = 0.0
 
         self.animation_speed = 20
         self.object_color = "red"
         self.scenario_type = 'roll_down'
+        self.renderer = 'matplotlib'
         self.simulation = None
+        self.run_history = []
+        self.recorded_run = None
+        self.param_changes = []
+        self.heatmap_window = None
+        self.plane_line = self.horizontal_line = self.body_artist = None
+        self.background = None
 
         self.speed_window = SpeedGraphWindow(self)
 
@@ -215,6 +238,11 @@ class SimulationApp(QMainWindow):
         self.canvas = FigureCanvas(plt.figure(figsize=(5, 3)))
         self.layout.addWidget(self.canvas)
         self.ax = self.canvas.figure.add_subplot(111)
+        self.canvas.mpl_connect('draw_event', self.onDraw)
+
+        self.painter_canvas = PainterCanvas(self)
+        self.layout.addWidget(self.painter_canvas)
+        self.painter_canvas.hide()
 
         main_control_layout = QHBoxLayout()
 
@@ -240,6 +268,10 @@ class SimulationApp(QMainWindow):
         self.save_button.clicked.connect(self.speed_window.save_graph)
         main_control_layout.addWidget(self.save_button)
 
+        self.report_button = QPushButton("Отчет", self)
+        self.report_button.clicked.connect(self.showReportDialog)
+        main_control_layout.addWidget(self.report_button)
+
         self.layout.addLayout(main_control_layout)
 
         options_layout = QHBoxLayout()
@@ -262,8 +294,27 @@ class SimulationApp(QMainWindow):
         self.color_combo.setCurrentIndex(0)
         options_layout.addWidget(self.color_combo)
 
+        options_layout.addSpacing(20)
+
+        renderer_label = QLabel("Отрисовка:")
+        options_layout.addWidget(renderer_label)
+
+        self.renderer_combo = QComboBox()
+        self.renderer_combo.addItems(["Matplotlib", "QPainter"])
+        self.renderer_combo.setCurrentIndex(0)
+        self.renderer_combo.setToolTip("QPainter - облегченная отрисовка анимации без matplotlib")
+        options_layout.addWidget(self.renderer_combo)
+
         options_layout.addStretch(1)
 
+        self.heatmap_button = QPushButton("Карта исходов", self)
+        self.heatmap_button.clicked.connect(self.showHeatmapWindow)
+        options_layout.addWidget(self.heatmap_button)
+
+        self.comparison_button = QPushButton("Сравнение", self)
+        self.comparison_button.clicked.connect(self.showComparisonWindow)
+        options_layout.addWidget(self.comparison_button)
+
         self.about_button = QPushButton("О программе", self)
         self.about_button.clicked.connect(self.showAboutDialog)
         options_layout.addWidget(self.about_button)
@@ -282,6 +333,7 @@ class SimulationApp(QMainWindow):
         self.v0_label = QLabel()
         self.friction_incline_label = QLabel()
         self.friction_horizontal_label = QLabel()
+        self.drag_label = QLabel()
         self.init_dist_text = QLabel("Нач. гориз. расст. (справа от наклона):")
         self.init_dist_val = QLabel()
 
@@ -291,15 +343,34 @@ class SimulationApp(QMainWindow):
         self.input_layout_form.addRow("Нач. скорость (модуль):", self.v0_label)
         self.input_layout_form.addRow("Коэф. трения (наклон):", self.friction_incline_label)
         self.input_layout_form.addRow("Коэф. трения (горизонт):", self.friction_horizontal_label)
+        self.input_layout_form.addRow("Сопротивление воздуха k:", self.drag_label)
         self.input_layout_form.addRow(self.init_dist_text, self.init_dist_val)
 
         self.layout.addWidget(self.input_group)
 
+        self.tuning_group = QGroupBox("Настройка на лету")
+        self.tuning_layout = QFormLayout()
+        self.tuning_group.setLayout(self.tuning_layout)
+        self.angle_slider, self.angle_slider_label = self.addTuningSlider("Угол:", 90, self.tuneAngle)
+        self.v0_slider, self.v0_slider_label = self.addTuningSlider("Нач. скорость:", 500, self.tuneV0)
+        self.friction_incline_slider, self.friction_incline_slider_label = self.addTuningSlider(
+            "Коэф. трения (наклон):", 100, self.tuneFrictionIncline)
+        self.friction_horizontal_slider, self.friction_horizontal_slider_label = self.addTuningSlider(
+            "Коэф. трения (горизонт):", 100, self.tuneFrictionHorizontal)
+        self.layout.addWidget(self.tuning_group)
+        self.recompute_timer = QTimer()
+        self.recompute_timer.setSingleShot(True)
+        self.recompute_timer.setInterval(150)
+        self.recompute_timer.timeout.connect(self.recomputeTrajectory)
+        for slider in (self.angle_slider, self.v0_slider):
+            slider.sliderReleased.connect(self.flushRecompute)
+
         self.timer = QTimer()
         self.timer.timeout.connect(self.updateAnimation)
 
         self.color_combo.currentIndexChanged.connect(self.updateObjectColor)
         self.scenario_combo.currentIndexChanged.connect(self.changeScenario)
+        self.renderer_combo.currentIndexChanged.connect(self.changeRenderer)
 
         self.setStyleSheet("""
             QMainWindow {
@@ -406,10 +477,175 @@ class SimulationApp(QMainWindow):
         self.setInitialDistRowVisible(False)
         self.setHorizontalLengthDisplayVisible(False)
 
+    def addTuningSlider(self, title, maximum, slot):
+        slider = QSlider(Qt.Horizontal)
+        slider.setRange(0, maximum)
+        value_label = QLabel()
+        value_label.setMinimumWidth(70)
+        row = QHBoxLayout()
+        row.addWidget(slider)
+        row.addWidget(value_label)
+        self.tuning_layout.addRow(title, row)
+        slider.valueChanged.connect(slot)
+        return slider, value_label
+
+    def syncTuningSliders(self):
+        self.v0_slider.setMaximum(max(500, int(round(self.v0 * 10))))
+        for slider, value in ((self.angle_slider, self.angle), (self.v0_slider, self.v0 * 10),
+                              (self.friction_incline_slider, self.friction_incline * 100),
+                              (self.friction_horizontal_slider, self.friction_horizontal * 100)):
+            slider.blockSignals(True)
+            slider.setValue(int(round(value)))
+            slider.blockSignals(False)
+        self.angle_slider_label.setText(f"{self.angle:.0f}°")
+        self.v0_slider_label.setText(f"{self.v0:.1f} м/с")
+        self.friction_incline_slider_label.setText(f"{self.friction_incline:.2f}")
+        self.friction_horizontal_slider_label.setText(f"{self.friction_horizontal:.2f}")
+
+    def tuneAngle(self, value):
+        self.angle = float(value)
+        self.angle_slider_label.setText(f"{self.angle:.0f}°")
+        self.recompute_timer.start()
+
+    def tuneV0(self, value):
+        self.v0 = value / 10.0
+        self.v0_slider_label.setText(f"{self.v0:.1f} м/с")
+        self.recompute_timer.start()
+
+    def tuneFrictionIncline(self, value):
+        self.friction_incline = value / 100.0
+        self.friction_incline_slider_label.setText(f"{self.friction_incline:.2f}")
+        self.applyFriction()
+
+    def tuneFrictionHorizontal(self, value):
+        self.friction_horizontal = value / 100.0
+        self.friction_horizontal_slider_label.setText(f"{self.friction_horizontal:.2f}")
+        self.applyFriction()
+
+    def applyFriction(self):
+        if not self.simulation:
+            return
+        was_finished = self.simulation.is_finished()
+        values = {'friction_incline': self.friction_incline, 'friction_horizontal': self.friction_horizontal}
+        self.simulation.set_params(**values)
+        if self.recorded_run is not None:
+            self.recordChange(len(self.simulation.time_points) - 1, values)
+        self.updateLabels()
+        if was_finished and not self.simulation.is_finished():
+            self.resumeAnimation()
+        elif not self.timer.isActive() and not self.simulation.is_finished():
+            self.resume_button.setEnabled(len(self.simulation.time_points) > 1)
+
+    def recordChange(self, step, values):
+        if step == 0:
+            self.param_changes = []
+            self.updateRecordedRun(dict(self.recorded_run[1], **values))
+            return
+        if self.param_changes and self.param_changes[-1][0] == step:
+            self.param_changes[-1] = (step, values)
+        else:
+            self.param_changes.append((step, values))
+        self.updateRecordedRun(dict(self.recorded_run[1], changes=list(self.param_changes)))
+
+    def flushRecompute(self):
+        if self.recompute_timer.isActive():
+            self.recompute_timer.stop()
+            self.recomputeTrajectory()
+
+    def recomputeTrajectory(self):
+        if not self.simulation:
+            return
+        steps = len(self.simulation.time_points) - 1
+        simulation = self.createSimulation()
+        simulation.dt = self.simulation.dt
+        current = {'friction_incline': self.friction_incline, 'friction_horizontal': self.friction_horizontal}
+        params = self.currentRun()[1]
+        changes = self.param_changes
+        if changes:
+            initial = {name: self.recorded_run[1][name] for name in current}
+            simulation.set_params(**initial)
+            params.update(initial)
+        replayed = []
+        for step in range(steps + 1):
+            for change in changes:
+                if change[0] == step:
+                    simulation.set_params(**change[1])
+                    replayed.append(change)
+            if step == steps or simulation.is_finished():
+                break
+            simulation.step(simulation.dt)
+        self.simulation = simulation
+        self.param_changes = replayed
+        if self.recorded_run is not None:
+            self.updateRecordedRun(dict(params, changes=list(replayed)) if replayed else params)
+            if len(replayed) < len(changes):
+                simulation.set_params(**current)
+                self.recordChange(len(simulation.time_points) - 1, current)
+        self.updateLabels()
+        self.updateScene()
+        if self.speed_window.isVisible():
+            self.speed_window.replaceGraph(simulation.time_points, simulation.velocity_points)
+        if not self.timer.isActive():
+            self.resume_button.setEnabled(steps > 0 and not simulation.is_finished())
+
+    def updateRecordedRun(self, params):
+        run = (self.recorded_run[0], params, self.recorded_run[2])
+        history = [r for r in self.run_history if r != self.recorded_run and r != run]
+        self.run_history = history + [run]
+        self.recorded_run = run
+
     def showAboutDialog(self):
         dialog = AboutDialog(self)
         dialog.exec_()
 
+    def showHeatmapWindow(self):
+        params = {
+            'length': self.length,
+            'horizontal_length': self.horizontal_length,
+            'v0': self.v0,
+            'friction_horizontal': self.friction_horizontal,
+            'initial_distance': self.initial_distance_param,
+        }
+        if self.heatmap_window is not None:
+            self.heatmap_window.close()
+            self.heatmap_window.deleteLater()
+        self.heatmap_window = HeatmapWindow(self, self.scenario_type, params)
+        self.heatmap_window.show()
+        self.heatmap_window.startSweep()
+
+    def currentRun(self):
+        params = {
+            'angle': self.angle,
+            'length': self.length,
+            'v0': self.v0,
+            'friction_incline': self.friction_incline,
+            'friction_horizontal': self.friction_horizontal,
+        }
+        if self.scenario_type == 'roll_down':
+            params['horizontal_length'] = self.horizontal_length
+        else:
+            params['initial_distance'] = self.initial_distance_param
+        return self.scenario_type, params, self.drag
+
+    def showComparisonWindow(self):
+        runs = list(self.run_history)
+        current = self.recorded_run or self.currentRun()
+        if current not in runs:
+            runs.append(current)
+        if len(runs) < 2:
+            scenario_type, params, drag = current
+            other = 'roll_up' if scenario_type == 'roll_down' else 'roll_down'
+            params = dict(params, horizontal_length=self.horizontal_length,
+                          initial_distance=self.initial_distance_param)
+            runs.append((other, {name: params[name] for name in param_names(other)}, drag))
+        self.comparison_window = ComparisonWindow(self, runs[-MAX_RUNS:], self.animation_speed)
+        self.comparison_window.show()
+
+    def showReportDialog(self):
+        runs = self.run_history or [self.currentRun()]
+        self.report_dialog = ReportDialog(self, runs)
+        self.report_dialog.show()
+
     def setHorizontalLengthDisplayVisible(self, visible):
         self.horizontal_length_display_label_widget.setVisible(visible)
         self.horizontal_length_label.setVisible(visible)
@@ -439,6 +675,7 @@ class SimulationApp(QMainWindow):
 
         self.friction_incline_label.setText(f"{self.simulation.friction_incline:.2f}")
         self.friction_horizontal_label.setText(f"{self.simulation.friction_horizontal:.2f}")
+        self.drag_label.setText(f"{getattr(self.simulation, 'drag', 0.0):.3f} 1/м")
 
         if self.scenario_type == 'roll_up':
             dist_attr = getattr(self.simulation, 'init_h_dist', 0.0)
@@ -462,6 +699,7 @@ class SimulationApp(QMainWindow):
         dialog.v0_input.setText(str(self.v0))
         dialog.friction_incline_input.setText(str(self.friction_incline))
         dialog.friction_horizontal_input.setText(str(self.friction_horizontal))
+        dialog.drag_input.setText(str(self.drag))
 
         if self.scenario_type == 'roll_up':
             dialog.initial_distance_input.setText(str(self.initial_distance_param))
@@ -481,6 +719,7 @@ class SimulationApp(QMainWindow):
                 self.friction_horizontal = values[5]
                 if self.scenario_type == 'roll_up':
                     self.initial_distance_param = values[6]
+                self.drag = values[7]
 
                 self.input_group.show()
                 self.changeScenario(self.scenario_combo.currentIndex())
@@ -498,21 +737,16 @@ class SimulationApp(QMainWindow):
         selected_text = self.scenario_combo.itemText(index)
         self.scenario_type = 'roll_down' if selected_text == "Скат с наклонной" else 'roll_up'
 
+        self.simulation = self.createSimulation()
+        self.recorded_run = None
+        self.param_changes = []
         if self.scenario_type == 'roll_down':
-            self.simulation = Simulation(
-                self.angle, self.length, self.horizontal_length, self.v0,
-                self.friction_incline, self.friction_horizontal
-            )
             self.label.setText("Анимация ската тела с наклонной плоскости")
         elif self.scenario_type == 'roll_up':
-            self.simulation = RollupSimulation(
-                self.angle, self.length, self.v0,
-                self.friction_incline, self.friction_horizontal,
-                self.initial_distance_param
-            )
             self.label.setText("Анимация вката тела на наклонную плоскость")
 
         self.updateLabels()
+        self.syncTuningSliders()
 
         if self.simulation:
             self.simulation.reset()
@@ -521,10 +755,44 @@ class SimulationApp(QMainWindow):
         self.speed_window.clearGraph()
         self.speed_window.hide()
 
+    def createSimulation(self):
+        if self.scenario_type == 'roll_down':
+            if self.drag > 0:
+                return DragSimulation(
+                    self.angle, self.length, self.horizontal_length, self.v0,
+                    self.friction_incline, self.friction_horizontal, self.drag
+                )
+            return Simulation(
+                self.angle, self.length, self.horizontal_length, self.v0,
+                self.friction_incline, self.friction_horizontal
+            )
+        if self.drag > 0:
+            return DragRollupSimulation(
+                self.angle, self.length, self.v0,
+                self.friction_incline, self.friction_horizontal,
+                self.initial_distance_param, self.drag
+            )
+        return RollupSimulation(
+            self.angle, self.length, self.v0,
+            self.friction_incline, self.friction_horizontal,
+            self.initial_distance_param
+        )
+
+    def changeRenderer(self, index):
+        self.renderer = 'painter' if self.renderer_combo.itemText(index) == "QPainter" else 'matplotlib'
+        self.canvas.setVisible(self.renderer == 'matplotlib')
+        self.painter_canvas.setVisible(self.renderer == 'painter')
+        if self.simulation:
+            self.drawGraph(self.simulation.x_body, self.simulation.y_body)
+
     def drawGraph(self, x_body=None, y_body=None):
         if not self.simulation:
             return
 
+        if self.renderer == 'painter':
+            self.painter_canvas.setScene(self.simulation, x_body, y_body, self.object_color)
+            return
+
         self.ax.clear()
 
         x_plane, y_plane, x_horizontal, y_horizontal = None, None, None, None
@@ -542,14 +810,17 @@ class SimulationApp(QMainWindow):
             if len(horizontal_coords) == 2:
                 x_horizontal, y_horizontal = horizontal_coords
 
+        self.plane_line = self.horizontal_line = None
         if x_plane is not None and x_plane.size > 0:
-            self.ax.plot(x_plane, y_plane, 'b', label="Наклонная плоскость", linewidth=2)
+            self.plane_line, = self.ax.plot(x_plane, y_plane, 'b', label="Наклонная плоскость", linewidth=2)
         if x_horizontal is not None and x_horizontal.size > 0:
-            self.ax.plot(x_horizontal, y_horizontal, 'g', label="Горизонтальная поверхность", linewidth=2)
+            self.horizontal_line, = self.ax.plot(x_horizontal, y_horizontal, 'g',
+                                                 label="Горизонтальная поверхность", linewidth=2)
 
         current_x = x_body if x_body is not None else self.simulation.x_body
         current_y = y_body if y_body is not None else self.simulation.y_body
-        self.ax.scatter(current_x, current_y, color=self.object_color, label="Тело", zorder=5, s=100)
+        self.body_artist = self.ax.scatter(current_x, current_y, color=self.object_color, label="Тело",
+                                           zorder=5, s=100, animated=True)
 
         self.ax.set_xlabel("x (м)", fontsize=12)
         self.ax.set_ylabel("y (м)", fontsize=12)
@@ -559,6 +830,50 @@ class SimulationApp(QMainWindow):
 
         self.ax.grid(True, linestyle='--')
 
+        self.fitAxesLimits(x_plane, y_plane, x_horizontal, y_horizontal)
+
+        self.ax.set_aspect('equal', adjustable='box')
+        self.canvas.draw()
+
+    def updateScene(self):
+        if self.renderer == 'painter':
+            self.painter_canvas.setScene(self.simulation)
+            return
+        if self.plane_line is None or self.horizontal_line is None or self.body_artist is None:
+            self.drawGraph()
+            return
+        x_plane, y_plane = self.simulation.get_plane_coordinates()
+        x_horizontal, y_horizontal = self.simulation.get_horizontal_coordinates()
+        self.plane_line.set_data(x_plane, y_plane)
+        self.horizontal_line.set_data(x_horizontal, y_horizontal)
+        self.fitAxesLimits(x_plane, y_plane, x_horizontal, y_horizontal)
+        self.body_artist.set_offsets([[self.simulation.x_body, self.simulation.y_body]])
+        self.background = None
+        self.canvas.draw_idle()
+
+    def onDraw(self, event):
+        if self.body_artist is None or self.body_artist.axes is not self.ax:
+            self.background = None
+            return
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.body_artist)
+
+    def moveBody(self, x_body, y_body):
+        if self.renderer == 'painter':
+            self.painter_canvas.moveBody(x_body, y_body)
+            return
+        if self.body_artist is None:
+            self.drawGraph(x_body, y_body)
+            return
+        self.body_artist.set_offsets([[x_body, y_body]])
+        if self.background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.background)
+        self.ax.draw_artist(self.body_artist)
+        self.canvas.blit(self.ax.bbox)
+
+    def fitAxesLimits(self, x_plane, y_plane, x_horizontal, y_horizontal):
         all_xcoords = []
         all_ycoords = []
         try:
@@ -594,11 +909,14 @@ class SimulationApp(QMainWindow):
         except Exception:
             pass
 
-        self.ax.set_aspect('equal', adjustable='box')
-        self.canvas.draw()
-
     def startAnimation(self):
         self.simulation.reset()
+        run = self.currentRun()
+        if run in self.run_history:
+            self.run_history.remove(run)
+        self.run_history.append(run)
+        self.recorded_run = run
+        self.param_changes = []
         self.timer.start(self.animation_speed)
 
         self.speed_window.show()
@@ -652,7 +970,7 @@ class SimulationApp(QMainWindow):
         time, velocity, x_body, y_body = self.simulation.step(self.simulation.dt)
 
         self.speed_window.updateGraph(self.simulation.time_points, self.simulation.velocity_points)
-        self.drawGraph(x_body, y_body)
+        self.moveBody(x_body, y_body)
 
         if self.simulation.is_finished():
             if self.timer.isActive():
@@ -674,7 +992,9 @@ class SimulationApp(QMainWindow):
             "Фиолетовый": "purple"
         }
         self.object_color = color_map.get(self.color_combo.currentText(), "red")
-        if self.simulation:
+        if self.renderer == 'painter':
+            self.painter_canvas.setBodyColor(self.object_color)
+        elif self.simulation:
             self.drawGraph()
 
 
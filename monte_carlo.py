@@ -0,0 +1,386 @@
+import argparse
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from batch_simulation import (BatchSimulation, BatchRollupSimulation, param_names, PARAM_BOUNDS,
+                              END_STATE_FIELDS, precision_dtype, end_state_deviation)
+
+
+class Constant:
+    def __init__(self, value):
+        self.value = float(value)
+
+    def sample(self, rng, n):
+        return np.full(n, self.value)
+
+    def support(self):
+        return self.value, self.value
+
+
+class Uniform:
+    def __init__(self, low, high):
+        if high < low:
+            raise ValueError("Верхняя граница равномерного распределения меньше нижней")
+        self.low = float(low)
+        self.high = float(high)
+
+    def sample(self, rng, n):
+        return rng.uniform(self.low, self.high, n)
+
+    def support(self):
+        return self.low, self.high
+
+
+class Normal:
+    def __init__(self, mean, std, low=None, high=None):
+        if std < 0:
+            raise ValueError("Стандартное отклонение не может быть отрицательным")
+        self.mean = float(mean)
+        self.std = float(std)
+        self.low = low
+        self.high = high
+
+    def sample(self, rng, n):
+        values = rng.normal(self.mean, self.std, n)
+        if self.low is not None or self.high is not None:
+            values = np.clip(values, self.low, self.high)
+        return values
+
+    def support(self):
+        low = self.mean - 6 * self.std if self.low is None else self.low
+        high = self.mean + 6 * self.std if self.high is None else self.high
+        return low, high
+
+
+def parse_distribution(text):
+    parts = text.split(':')
+    kind = parts[0].lower()
+    try:
+        if len(parts) == 1:
+            return Constant(float(parts[0]))
+        values = [float(p) for p in parts[1:]]
+    except ValueError:
+        raise ValueError(f"Не удалось разобрать распределение: {text}")
+    if kind == 'const' and len(values) == 1:
+        return Constant(*values)
+    if kind == 'uniform' and len(values) == 2:
+        return Uniform(*values)
+    if kind == 'normal' and len(values) in (2, 4):
+        return Normal(*values)
+    raise ValueError(f"Не удалось разобрать распределение: {text}")
+
+
+class RunningStats:
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if values.size == 0:
+            return
+        batch = RunningStats()
+        batch.count = values.size
+        batch.mean = float(values.mean())
+        batch.m2 = float(((values - batch.mean) ** 2).sum())
+        batch.min = float(values.min())
+        batch.max = float(values.max())
+        self.merge(batch)
+
+    def merge(self, other):
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class QuantileSketch:
+    def __init__(self, relative_accuracy=0.01, min_value=1e-9):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+        self.positive = {}
+        self.negative = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def _add_keys(self, store, values):
+        keys, counts = np.unique(np.ceil(np.log(values) / self._log_gamma).astype(np.int64), return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            store[key] = store.get(key, 0) + count
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[np.isfinite(values)]
+        pos = values[values > self.min_value]
+        neg = -values[values < -self.min_value]
+        self._add_keys(self.positive, pos)
+        self._add_keys(self.negative, neg)
+        self.zero_count += values.size - pos.size - neg.size
+        self.count += values.size
+        if values.size:
+            self.min = min(self.min, float(values.min()))
+            self.max = max(self.max, float(values.max()))
+
+    def merge(self, other):
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in other_store.items():
+                store[key] = store.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def _value(self, key):
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def _estimate(self, rank):
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.positive))
+
+    def quantile(self, q):
+        if self.count == 0:
+            return float('nan')
+        return min(max(self._estimate(q * (self.count - 1)), self.min), self.max)
+
+
+class Histogram:
+    def __init__(self, low, high, bins=100):
+        if not high > low:
+            high = low + 1.0
+        self.edges = np.linspace(low, high, bins + 1)
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        self.underflow += int((values < self.edges[0]).sum())
+        self.overflow += int((values > self.edges[-1]).sum())
+        self.counts += np.histogram(values, bins=self.edges)[0]
+
+    def merge(self, other):
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+
+
+class MonteCarloResult:
+    def __init__(self, x_range, time_range, bins=100, relative_accuracy=0.01):
+        self.count = 0
+        self.finished = 0
+        self.stalled = 0
+        self.reached_peak = 0
+        self.x_stats = RunningStats()
+        self.time_stats = RunningStats()
+        self.x_quantiles = QuantileSketch(relative_accuracy)
+        self.time_quantiles = QuantileSketch(relative_accuracy)
+        self.x_histogram = Histogram(*x_range, bins=bins)
+        self.time_histogram = Histogram(*time_range, bins=bins)
+        self.precision = 'float64'
+        self.checked = 0
+        self.outcome_mismatch = 0
+        self.deviation = {name: RunningStats() for name in END_STATE_FIELDS}
+        self.deviation_quantiles = {name: QuantileSketch(relative_accuracy) for name in END_STATE_FIELDS}
+
+    def update_deviation(self, reference, other, lanes=None):
+        report = end_state_deviation(reference, other, lanes)
+        self.checked += report['stopped_mismatch'].size
+        self.outcome_mismatch += int(report['stopped_mismatch'].sum())
+        for name in END_STATE_FIELDS:
+            self.deviation[name].update(report[name])
+            self.deviation_quantiles[name].update(report[name])
+
+    def update(self, x_final, travel_time, finished, stalled=None, reached_peak=None):
+        self.count += x_final.size
+        self.finished += int(finished.sum())
+        if stalled is not None:
+            self.stalled += int(stalled.sum())
+        if reached_peak is not None:
+            self.reached_peak += int(reached_peak.sum())
+        self.x_stats.update(x_final)
+        self.time_stats.update(travel_time)
+        self.x_quantiles.update(x_final)
+        self.time_quantiles.update(travel_time)
+        self.x_histogram.update(x_final)
+        self.time_histogram.update(travel_time)
+
+    def merge(self, other):
+        self.count += other.count
+        self.finished += other.finished
+        self.stalled += other.stalled
+        self.reached_peak += other.reached_peak
+        self.x_stats.merge(other.x_stats)
+        self.time_stats.merge(other.time_stats)
+        self.x_quantiles.merge(other.x_quantiles)
+        self.time_quantiles.merge(other.time_quantiles)
+        self.x_histogram.merge(other.x_histogram)
+        self.time_histogram.merge(other.time_histogram)
+        self.precision = other.precision
+        self.checked += other.checked
+        self.outcome_mismatch += other.outcome_mismatch
+        for name in END_STATE_FIELDS:
+            self.deviation[name].merge(other.deviation[name])
+            self.deviation_quantiles[name].merge(other.deviation_quantiles[name])
+
+    def summary(self, quantiles=(0.05, 0.5, 0.95)):
+        lines = [f"Испытаний: {self.count}, завершено: {self.finished}, "
+                 f"застряло на наклоне: {self.stalled}, достигло вершины: {self.reached_peak}"]
+        for name, stats, sketch in (("Конечная x (м)", self.x_stats, self.x_quantiles),
+                                    ("Время движения (с)", self.time_stats, self.time_quantiles)):
+            q_text = ", ".join(f"q{q:g}={sketch.quantile(q):.4f}" for q in quantiles)
+            lines.append(f"{name}: среднее={stats.mean:.4f}, ст. откл.={stats.std:.4f}, "
+                         f"мин={stats.min:.4f}, макс={stats.max:.4f}, {q_text}")
+        if self.checked:
+            lines.append(f"Точность {self.precision}: сверено с float64 испытаний: {self.checked}, "
+                         f"расхождений исхода: {self.outcome_mismatch}")
+            for name, title in zip(END_STATE_FIELDS, ("x", "время", "скорость")):
+                stats = self.deviation[name]
+                lines.append(f"  отклонение ({title}): среднее={stats.mean:.3g}, "
+                             f"q0.99={self.deviation_quantiles[name].quantile(0.99):.3g}, макс={stats.max:.3g}")
+        return "\n".join(lines)
+
+
+def _run_chunk(args):
+    scenario_type, params, n, seed_seq, dt, max_steps, x_range, time_range, bins, precision, check_samples = args
+    rng = np.random.default_rng(seed_seq)
+    names = param_names(scenario_type)
+    samples = []
+    for name in names:
+        values = params[name].sample(rng, n)
+        if name == 'v0':
+            values = np.abs(values)
+        samples.append(np.clip(values, *PARAM_BOUNDS[name]))
+
+    result = MonteCarloResult(x_range, time_range, bins)
+    result.precision = precision
+    engine = BatchSimulation if scenario_type == 'roll_down' else BatchRollupSimulation
+    sim = engine(*samples, dtype=precision).run(dt, max_steps)
+    if scenario_type == 'roll_down':
+        result.update(sim.x_body, sim.t_global, sim.is_finished(), stalled=sim.stalled)
+    else:
+        result.update(sim.x_body, sim.t_global, sim.is_finished(), reached_peak=sim.reached_peak())
+
+    if precision != 'float64' and check_samples:
+        m = min(n, check_samples)
+        reference = engine(*[values[:m] for values in samples]).run(dt, max_steps)
+        result.update_deviation(reference, sim, slice(0, m))
+    return result
+
+
+class MonteCarloSimulation:
+    def __init__(self, scenario_type, params, n_samples, chunk_size=100000, seed=0,
+                 dt=0.05, max_steps=100000, x_range=None, time_range=(0.0, 60.0), bins=100,
+                 precision='float64', check_samples=1000):
+        names = param_names(scenario_type)
+        missing = [name for name in names if name not in params]
+        if missing:
+            raise ValueError(f"Не заданы параметры: {', '.join(missing)}")
+        self.scenario_type = scenario_type
+        self.params = {name: p if hasattr(p, 'sample') else Constant(p) for name, p in params.items()}
+        self.n_samples = int(n_samples)
+        self.chunk_size = int(chunk_size)
+        self.seed = seed
+        self.dt = dt
+        self.max_steps = max_steps
+        self.x_range = x_range if x_range is not None else self._default_x_range()
+        self.time_range = time_range
+        self.bins = bins
+        self.precision = precision_dtype(precision).name
+        self.check_samples = int(check_samples)
+
+    def _default_x_range(self):
+        length_max = self.params['length'].support()[1]
+        if self.scenario_type == 'roll_down':
+            return 0.0, length_max + self.params['horizontal_length'].support()[1]
+        return -length_max, self.params['initial_distance'].support()[1]
+
+    def chunks(self):
+        n_chunks = max(1, math.ceil(self.n_samples / self.chunk_size))
+        seeds = np.random.SeedSequence(self.seed).spawn(n_chunks)
+        for i, seed_seq in enumerate(seeds):
+            n = min(self.chunk_size, self.n_samples - i * self.chunk_size)
+            yield (self.scenario_type, self.params, n, seed_seq, self.dt, self.max_steps,
+                   self.x_range, self.time_range, self.bins, self.precision, self.check_samples)
+
+    def run(self, processes=1):
+        result = MonteCarloResult(self.x_range, self.time_range, self.bins)
+        if processes > 1:
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                for chunk_result in executor.map(_run_chunk, self.chunks()):
+                    result.merge(chunk_result)
+        else:
+            for chunk in self.chunks():
+                result.merge(_run_chunk(chunk))
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Метод Монте-Карло для сценариев ската и вката. "
+                    "Распределения: 0.1, uniform:a:b, normal:mean:std[:low:high]"
+    )
+    parser.add_argument('--scenario', choices=['roll_down', 'roll_up'], default='roll_down')
+    parser.add_argument('--samples', type=int, default=1000000)
+    parser.add_argument('--chunk-size', type=int, default=100000)
+    parser.add_argument('--processes', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--dt', type=float, default=0.05)
+    parser.add_argument('--precision', choices=['float64', 'float32'], default='float64',
+                        help="Точность векторного расчета")
+    parser.add_argument('--check-samples', type=int, default=1000,
+                        help="Число испытаний в каждом блоке для сверки с расчетом во float64")
+    parser.add_argument('--angle', default='30')
+    parser.add_argument('--length', default='10')
+    parser.add_argument('--horizontal-length', default='10')
+    parser.add_argument('--v0', default='5')
+    parser.add_argument('--friction-incline', default='0.1')
+    parser.add_argument('--friction-horizontal', default='0.1')
+    parser.add_argument('--initial-distance', default='5')
+    args = parser.parse_args()
+
+    names = param_names(args.scenario)
+    params = {name: parse_distribution(getattr(args, name)) for name in names}
+    simulation = MonteCarloSimulation(args.scenario, params, args.samples, args.chunk_size, args.seed, args.dt,
+                                      precision=args.precision, check_samples=args.check_samples)
+    print(simulation.run(args.processes).summary())
+
+
+if __name__ == "__main__":
+    main()
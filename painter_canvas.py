@@ -0,0 +1,162 @@
+import numpy as np
+
+from PyQt5.QtWidgets import QWidget, QSizePolicy
+from PyQt5.QtCore import Qt, QPointF, QRect
+from PyQt5.QtGui import QPainter, QPixmap, QPen, QColor, QPolygonF
+
+
+BODY_PIXELS = 6
+
+
+def _grid_step(span):
+    raw = span / 6.0
+    magnitude = 10 ** np.floor(np.log10(raw))
+    for factor in (1, 2, 5, 10):
+        if raw <= factor * magnitude:
+            return factor * magnitude
+    return 10 * magnitude
+
+
+class PainterCanvas(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.setMinimumSize(300, 200)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.tracks = []
+        self.bounds = None
+        self.body = None
+        self.body_color = QColor("red")
+        self.background = None
+        self._scale = 1.0
+        self._dx = 0.0
+        self._dy = 0.0
+
+    def setScene(self, simulation, x_body=None, y_body=None, color=None):
+        self.tracks = []
+        for coords, color_name, title in ((simulation.get_plane_coordinates(), "blue", "Наклонная плоскость"),
+                                          (simulation.get_horizontal_coordinates(), "green",
+                                           "Горизонтальная поверхность")):
+            x, y = (np.asarray(c, dtype=np.float64) for c in coords)
+            if x.size > 0:
+                self.tracks.append((x, y, QColor(color_name), title))
+        self.body = (simulation.x_body if x_body is None else x_body,
+                     simulation.y_body if y_body is None else y_body)
+        if color is not None:
+            self.body_color = QColor(color)
+
+        xs = [v for x, _, _, _ in self.tracks for v in (np.nanmin(x), np.nanmax(x))] + [self.body[0]]
+        ys = [v for _, y, _, _ in self.tracks for v in (np.nanmin(y), np.nanmax(y))] + [self.body[1]]
+        xs = [v for v in xs if np.isfinite(v)]
+        ys = [v for v in ys if np.isfinite(v)]
+        if xs and ys:
+            padding_x = max(1.0, (max(xs) - min(xs)) * 0.15)
+            padding_y = max(1.0, (max(ys) - min(ys)) * 0.15)
+            self.bounds = (min(xs) - padding_x, max(xs) + padding_x, min(ys) - padding_y, max(ys) + padding_y)
+        else:
+            self.bounds = None
+        self.invalidateBackground()
+
+    def setBodyColor(self, color):
+        self.body_color = QColor(color)
+        self.update(self._bodyRect())
+
+    def moveBody(self, x_body, y_body):
+        old_rect = self._bodyRect()
+        self.body = (x_body, y_body)
+        self.update(old_rect.united(self._bodyRect()))
+
+    def invalidateBackground(self):
+        self.background = None
+        self.update()
+
+    def resizeEvent(self, event):
+        self.background = None
+        super().resizeEvent(event)
+
+    def _updateTransform(self):
+        x_min, x_max, y_min, y_max = self.bounds
+        margin = 40
+        width = max(1, self.width() - 2 * margin)
+        height = max(1, self.height() - 2 * margin)
+        self._scale = min(width / (x_max - x_min), height / (y_max - y_min))
+        self._dx = margin + (width - (x_max - x_min) * self._scale) / 2 - x_min * self._scale
+        self._dy = margin + (height + (y_max - y_min) * self._scale) / 2 + y_min * self._scale
+
+    def toScreen(self, x, y):
+        return x * self._scale + self._dx, self._dy - y * self._scale
+
+    def _bodyRect(self):
+        if self.body is None or self.bounds is None or not np.all(np.isfinite(self.body)):
+            return QRect()
+        sx, sy = self.toScreen(*self.body)
+        r = BODY_PIXELS + 2
+        return QRect(int(sx) - r, int(sy) - r, 2 * r + 1, 2 * r + 1)
+
+    def _renderBackground(self):
+        ratio = self.devicePixelRatioF()
+        self.background = QPixmap(int(self.width() * ratio), int(self.height() * ratio))
+        self.background.setDevicePixelRatio(ratio)
+        self.background.fill(Qt.white)
+        if self.bounds is None:
+            return
+        self._updateTransform()
+
+        painter = QPainter(self.background)
+        painter.setRenderHint(QPainter.Antialiasing)
+        x_min, x_max, y_min, y_max = self.bounds
+        left, top = self.toScreen(x_min, y_max)
+        right, bottom = self.toScreen(x_max, y_min)
+        grid_pen = QPen(QColor("#BDBDBD"), 1, Qt.DashLine)
+        text_pen = QPen(QColor("#4E342E"))
+        for axis, (low, high) in enumerate(((x_min, x_max), (y_min, y_max))):
+            step = _grid_step(high - low)
+            for value in np.arange(np.ceil(low / step) * step, high, step):
+                value = 0.0 if abs(value) < step * 1e-9 else value
+                painter.setPen(grid_pen)
+                if axis == 0:
+                    sx, _ = self.toScreen(value, 0.0)
+                    painter.drawLine(QPointF(sx, top), QPointF(sx, bottom))
+                    painter.setPen(text_pen)
+                    painter.drawText(QPointF(sx - 10, bottom + 15), f"{value:g}")
+                else:
+                    _, sy = self.toScreen(0.0, value)
+                    painter.drawLine(QPointF(left, sy), QPointF(right, sy))
+                    painter.setPen(text_pen)
+                    painter.drawText(QPointF(left - 35, sy + 4), f"{value:g}")
+        painter.drawText(QPointF((left + right) / 2 - 15, bottom + 32), "x (м)")
+        painter.drawText(QPointF(4, top - 10), "y (м)")
+
+        for x, y, color, _ in self.tracks:
+            sx, sy = self.toScreen(x, y)
+            painter.setPen(QPen(color, 2))
+            painter.drawPolyline(QPolygonF([QPointF(px, py) for px, py in zip(sx, sy)]))
+
+        metrics = painter.fontMetrics()
+        legend_width = max([metrics.horizontalAdvance(title) for _, _, _, title in self.tracks] or [0]) + 36
+        legend_left = max(left, min(right, self.width() - 8) - legend_width)
+        for i, (_, _, color, title) in enumerate(self.tracks):
+            y = top + 14 + 16 * i
+            painter.setPen(QPen(color, 2))
+            painter.drawLine(QPointF(legend_left + 6, y), QPointF(legend_left + 26, y))
+            painter.setPen(text_pen)
+            painter.drawText(QPointF(legend_left + 32, y + 4), title)
+        painter.end()
+
+    def paintEvent(self, event):
+        if self.background is None or self.background.size() != self.size() * self.devicePixelRatioF():
+            self._renderBackground()
+        painter = QPainter(self)
+        painter.drawPixmap(event.rect(), self.background, self._pixmapRect(event.rect()))
+        body_rect = self._bodyRect()
+        if body_rect.isValid() and body_rect.intersects(event.rect()):
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(self.body_color)
+            painter.drawEllipse(QPointF(*self.toScreen(*self.body)), BODY_PIXELS, BODY_PIXELS)
+        painter.end()
+
+    def _pixmapRect(self, rect):
+        ratio = self.background.devicePixelRatio()
+        return QRect(int(rect.x() * ratio), int(rect.y() * ratio),
+                     int(rect.width() * ratio), int(rect.height() * ratio))
@@ -0,0 +1,231 @@
+import os
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from batch_simulation import param_names
+from simulation import Simulation
+from rollup_simulation import RollupSimulation
+from drag_simulation import DragSimulation, DragRollupSimulation
+from decimation import lttb
+from snapshot import iterate_steps, run_to_completion
+
+
+FORMATS = ('png', 'svg', 'pdf')
+VECTOR_POINTS = 4000
+
+PARAM_TITLES = {
+    'angle': "Угол наклона (градусы)",
+    'length': "Длина наклонной плоскости (м)",
+    'horizontal_length': "Длина гориз. плоскости (м)",
+    'v0': "Начальная скорость (м/с)",
+    'friction_incline': "Коэф. трения (наклон)",
+    'friction_horizontal': "Коэф. трения (горизонт)",
+    'initial_distance': "Нач. гориз. расстояние (м)",
+    'drag': "Сопротивление воздуха k (1/м)",
+}
+
+SCENARIO_TITLES = {
+    'roll_down': "Скат с наклонной плоскости",
+    'roll_up': "Вкат на наклонную плоскость",
+}
+SCENARIO_SHORT = {'roll_down': "Скат", 'roll_up': "Вкат"}
+
+_cancel_event = None
+
+
+class ReportCancelled(Exception):
+    pass
+
+
+def init_worker(cancel_event):
+    global _cancel_event
+    _cancel_event = cancel_event
+
+
+def _check_cancelled():
+    if _cancel_event is not None and _cancel_event.is_set():
+        raise ReportCancelled("Построение отчета отменено")
+
+
+def run_label(run):
+    scenario_type, params, drag = run
+    text = f"{SCENARIO_SHORT[scenario_type]}: " + ", ".join(
+        f"{name}={params[name]:g}" for name in param_names(scenario_type))
+    if drag > 0:
+        text += f", drag={drag:g}"
+    if params.get('changes'):
+        text += f", изменений трения: {len(params['changes'])}"
+    return text
+
+
+def create_simulation(scenario_type, params, drag=0.0):
+    values = [params[name] for name in param_names(scenario_type)]
+    if scenario_type == 'roll_down':
+        return DragSimulation(*values, drag) if drag > 0 else Simulation(*values)
+    return DragRollupSimulation(*values, drag) if drag > 0 else RollupSimulation(*values)
+
+
+def simulate_run(scenario_type, params, drag=0.0, max_steps=100000):
+    sim = create_simulation(scenario_type, params, drag)
+    x_points = [sim.x_body]
+    y_points = [sim.y_body]
+    for step, values in params.get('changes', ()):
+        if step > max_steps:
+            break
+        for _, _, x, y in iterate_steps(sim, step - (len(sim.time_points) - 1), stop_on_stall=False):
+            x_points.append(x)
+            y_points.append(y)
+        if len(sim.time_points) - 1 < step:
+            break
+        sim.set_params(**values)
+    x_rest, y_rest = run_to_completion(sim, max_steps - (len(sim.time_points) - 1))
+    x_points += x_rest[1:]
+    y_points += y_rest[1:]
+
+    if sim.is_stalled():
+        outcome = "Застревание на наклоне"
+    elif scenario_type == 'roll_up' and sim.on_incline and sim.dist_incline >= sim.L - 1e-6:
+        outcome = "Достижение вершины"
+    elif scenario_type == 'roll_down' and sim.x_body >= sim.L * np.cos(sim.angle) + sim.horizontal_length:
+        outcome = "Конец горизонтальной плоскости"
+    elif sim.is_finished():
+        outcome = "Остановка"
+    else:
+        outcome = "Превышено число шагов"
+
+    return {
+        'time': np.array(list(sim.time_points), dtype=np.float64),
+        'velocity': np.array(list(sim.velocity_points), dtype=np.float64),
+        'x': np.array(x_points, dtype=np.float64),
+        'y': np.array(y_points, dtype=np.float64),
+        'plane': tuple(np.asarray(c) for c in sim.get_plane_coordinates()),
+        'horizontal': tuple(np.asarray(c) for c in sim.get_horizontal_coordinates()),
+        'outcome': outcome,
+    }
+
+
+def _new_figure(figsize):
+    figure = Figure(figsize=figsize)
+    FigureCanvasAgg(figure)
+    return figure
+
+
+def _reduce(x, y, fmt):
+    if fmt != 'png' and x.size > VECTOR_POINTS:
+        return lttb(x, y, VECTOR_POINTS)
+    return x, y
+
+
+def _style(ax, xlabel, ylabel, title):
+    ax.set_xlabel(xlabel, fontsize=10)
+    ax.set_ylabel(ylabel, fontsize=10)
+    ax.set_title(title, fontsize=11)
+    ax.grid(True, linestyle='--')
+
+
+def render_speed_graph(path, time, velocity, dpi=300):
+    time = np.asarray(time, dtype=np.float64)
+    velocity = np.asarray(velocity, dtype=np.float64)
+    fmt = os.path.splitext(path)[1].lstrip('.').lower()
+    figure = _new_figure((5, 3))
+    ax = figure.add_subplot(111)
+    ax.plot(*_reduce(time, velocity, fmt), 'r', label="Скорость v(t)")
+    ax.set_xlabel("Время (с)", fontsize=12)
+    ax.set_ylabel("Скорость (м/с)", fontsize=12)
+    ax.set_title("График зависимости скорости от времени", fontsize=14)
+    ax.legend(fontsize=10)
+    ax.grid(True, linestyle='--')
+    figure.savefig(path, dpi=dpi)
+    return path
+
+
+def render_run_report(path, scenario_type, params, drag=0.0, dpi=150, max_steps=100000):
+    _check_cancelled()
+    fmt = os.path.splitext(path)[1].lstrip('.').lower()
+    run = simulate_run(scenario_type, params, drag, max_steps)
+    _check_cancelled()
+    time, velocity, x, y = run['time'], run['velocity'], run['x'], run['y']
+    summary = {
+        'x_final': float(x[-1]),
+        't_total': float(time[-1]),
+        'v_max': float(velocity.max()),
+        'outcome': run['outcome'],
+    }
+
+    figure = _new_figure((11, 8.5))
+    grid = figure.add_gridspec(3, 2, height_ratios=[1, 1, 0.55], hspace=0.45, wspace=0.25)
+    figure.suptitle(SCENARIO_TITLES[scenario_type], fontsize=14)
+
+    ax = figure.add_subplot(grid[0, 0])
+    ax.plot(*_reduce(time, velocity, fmt), 'r')
+    _style(ax, "Время (с)", "Скорость (м/с)", "Скорость v(t)")
+
+    ax = figure.add_subplot(grid[0, 1])
+    ax.plot(*_reduce(time, x, fmt), 'b', label="x(t)")
+    ax.plot(*_reduce(time, y, fmt), 'g', label="y(t)")
+    ax.legend(fontsize=9)
+    _style(ax, "Время (с)", "Координата (м)", "Положение")
+
+    ax = figure.add_subplot(grid[1, 0])
+    if run['plane'][0].size > 0:
+        ax.plot(*run['plane'], 'b', linewidth=2, label="Наклонная плоскость")
+    if run['horizontal'][0].size > 0:
+        ax.plot(*run['horizontal'], 'g', linewidth=2, label="Горизонтальная поверхность")
+    ax.plot(*_reduce(x, y, fmt), 'r--', linewidth=1, label="Траектория")
+    ax.scatter([x[-1]], [y[-1]], color='red', zorder=5, s=40)
+    ax.set_aspect('equal', adjustable='datalim')
+    ax.legend(fontsize=8)
+    _style(ax, "x (м)", "y (м)", "Траектория")
+
+    ax = figure.add_subplot(grid[1, 1])
+    ax.plot(*_reduce(x, velocity, fmt), 'm')
+    _style(ax, "x (м)", "Скорость (м/с)", "Фазовый портрет v(x)")
+
+    ax = figure.add_subplot(grid[2, :])
+    ax.axis('off')
+    rows = [[PARAM_TITLES[name], f"{params[name]:g}"] for name in param_names(scenario_type)]
+    rows.append([PARAM_TITLES['drag'], f"{drag:g}"])
+    if params.get('changes'):
+        rows.append(["Изменений трения по ходу", str(len(params['changes']))])
+    rows += [["Конечная координата x (м)", f"{summary['x_final']:.3f}"],
+             ["Время движения (с)", f"{summary['t_total']:.3f}"],
+             ["Максимальная скорость (м/с)", f"{summary['v_max']:.3f}"],
+             ["Исход", summary['outcome']]]
+    half = (len(rows) + 1) // 2
+    left, right = rows[:half], rows[half:] + [["", ""]] * (2 * half - len(rows))
+    table = ax.table(cellText=[l + r for l, r in zip(left, right)], loc='center', cellLoc='left',
+                     colWidths=[0.27, 0.1, 0.27, 0.27])
+    table.auto_set_font_size(False)
+    table.set_fontsize(9)
+
+    _check_cancelled()
+    figure.savefig(path, dpi=dpi)
+    return path, summary
+
+
+def render_summary(path, runs, dpi=150):
+    _check_cancelled()
+    figure = _new_figure((11, 1.0 + 0.3 * (len(runs) + 1)))
+    ax = figure.add_subplot(111)
+    ax.axis('off')
+    ax.set_title("Сводка расчетов", fontsize=14)
+    header = ["№", "Сценарий", "Параметры", "x конечн. (м)", "Время (с)", "v max (м/с)", "Исход"]
+    rows = []
+    for i, (scenario_type, params, drag, summary) in enumerate(runs, 1):
+        values = ", ".join(f"{params[name]:g}" for name in param_names(scenario_type))
+        if drag > 0:
+            values += f", k={drag:g}"
+        rows.append([str(i), SCENARIO_SHORT[scenario_type], values, f"{summary['x_final']:.3f}",
+                     f"{summary['t_total']:.3f}", f"{summary['v_max']:.3f}", summary['outcome']])
+    table = ax.table(cellText=rows, colLabels=header, loc='upper center', cellLoc='left',
+                     colWidths=[0.04, 0.07, 0.3, 0.11, 0.09, 0.1, 0.29])
+    table.auto_set_font_size(False)
+    table.set_fontsize(8)
+    figure.savefig(path, dpi=dpi, bbox_inches='tight')
+    return path
+
+
+def report_path(directory, index, scenario_type, fmt):
+    return os.path.join(directory, f"run_{index:03d}_{scenario_type}.{fmt}")
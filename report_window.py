@@ -0,0 +1,179 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from PyQt5.QtCore import QTimer, Qt
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QListWidget, QListWidgetItem, QComboBox, QSpinBox,
+    QPushButton, QLabel, QLineEdit, QProgressBar, QFileDialog, QMessageBox
+)
+
+from report import FORMATS, init_worker, render_run_report, render_summary, report_path, run_label
+
+
+class ReportDialog(QDialog):
+    def __init__(self, parent=None, runs=None):
+        super().__init__(parent)
+        self.setWindowTitle("Отчет по расчетам")
+        self.setGeometry(300, 250, 560, 460)
+
+        self.runs = list(runs or [])
+        self.executor = None
+        self.cancel_event = None
+        self.futures = {}
+        self.results = {}
+        self.selected = []
+        self.summary_future = None
+
+        self.run_list = QListWidget()
+        for run in self.runs:
+            item = QListWidgetItem(run_label(run))
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked)
+            self.run_list.addItem(item)
+
+        self.format_combo = QComboBox()
+        self.format_combo.addItems([fmt.upper() for fmt in FORMATS])
+
+        self.dpi_spin = QSpinBox()
+        self.dpi_spin.setRange(50, 600)
+        self.dpi_spin.setValue(150)
+
+        self.dir_input = QLineEdit(os.path.join(os.getcwd(), "reports"))
+        self.browse_button = QPushButton("Обзор...")
+        self.browse_button.clicked.connect(self.chooseDirectory)
+        dir_layout = QHBoxLayout()
+        dir_layout.addWidget(self.dir_input)
+        dir_layout.addWidget(self.browse_button)
+
+        form = QFormLayout()
+        form.addRow("Формат:", self.format_combo)
+        form.addRow("Разрешение (dpi):", self.dpi_spin)
+        form.addRow("Папка:", dir_layout)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setValue(0)
+        self.progress_label = QLabel("")
+
+        self.start_button = QPushButton("Создать отчет")
+        self.start_button.clicked.connect(self.startExport)
+        self.cancel_button = QPushButton("Отмена")
+        self.cancel_button.clicked.connect(self.cancelExport)
+        self.cancel_button.setEnabled(False)
+        buttons = QHBoxLayout()
+        buttons.addStretch(1)
+        buttons.addWidget(self.start_button)
+        buttons.addWidget(self.cancel_button)
+
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel("Расчеты для отчета:"))
+        layout.addWidget(self.run_list)
+        layout.addLayout(form)
+        layout.addWidget(self.progress_bar)
+        layout.addWidget(self.progress_label)
+        layout.addLayout(buttons)
+        self.setLayout(layout)
+
+        self.poll_timer = QTimer()
+        self.poll_timer.timeout.connect(self.collectResults)
+
+    def chooseDirectory(self):
+        directory = QFileDialog.getExistingDirectory(self, "Папка для отчета", self.dir_input.text())
+        if directory:
+            self.dir_input.setText(directory)
+
+    def startExport(self):
+        self.selected = [i for i in range(self.run_list.count())
+                         if self.run_list.item(i).checkState() == Qt.Checked]
+        if not self.selected:
+            QMessageBox.warning(self, "Отчет", "Не выбрано ни одного расчета")
+            return
+        directory = self.dir_input.text().strip()
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError as e:
+            QMessageBox.critical(self, "Отчет", f"Не удалось создать папку:\n{e}")
+            return
+
+        self.directory = directory
+        self.fmt = FORMATS[self.format_combo.currentIndex()]
+        self.dpi = self.dpi_spin.value()
+        self.results = {}
+        self.futures = {}
+        self.summary_future = None
+        if self.executor is None:
+            self.cancel_event = multiprocessing.Event()
+            self.executor = ProcessPoolExecutor(max_workers=max(1, (os.cpu_count() or 2) - 1),
+                                                initializer=init_worker, initargs=(self.cancel_event,))
+        for number, i in enumerate(self.selected, 1):
+            scenario_type, params, drag = self.runs[i]
+            path = report_path(directory, number, scenario_type, self.fmt)
+            future = self.executor.submit(render_run_report, path, scenario_type, params, drag, self.dpi)
+            self.futures[future] = i
+
+        self.progress_bar.setRange(0, len(self.selected) + 1)
+        self.progress_bar.setValue(0)
+        self.progress_label.setText("Построение отчета...")
+        self.start_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+        self.poll_timer.start(100)
+
+    def collectResults(self):
+        errors = []
+        for future in [f for f in self.futures if f.done()]:
+            i = self.futures.pop(future)
+            if future.cancelled():
+                continue
+            if future.exception() is not None:
+                errors.append(str(future.exception()))
+                continue
+            self.results[i] = future.result()[1]
+        if errors:
+            self.finishExport(f"Ошибка построения отчета:\n{errors[0]}", failed=True)
+            return
+
+        done = len(self.results)
+        if not self.futures and self.summary_future is None:
+            runs = [self.runs[i] + (self.results[i],) for i in self.selected]
+            self.summary_future = self.executor.submit(
+                render_summary, os.path.join(self.directory, f"summary.{self.fmt}"), runs, self.dpi)
+        if self.summary_future is not None and self.summary_future.done():
+            error = self.summary_future.exception()
+            if error is not None:
+                self.finishExport(f"Ошибка построения сводки:\n{error}", failed=True)
+                return
+            done += 1
+            self.progress_bar.setValue(done)
+            self.finishExport(f"Отчет сохранен в {self.directory}")
+            return
+        self.progress_bar.setValue(done)
+        self.progress_label.setText(f"Готово: {done}/{len(self.selected) + 1}")
+
+    def finishExport(self, message, failed=False):
+        self.poll_timer.stop()
+        for future in self.futures:
+            future.cancel()
+        self.futures = {}
+        self.progress_label.setText(message)
+        self.start_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        if failed:
+            QMessageBox.critical(self, "Отчет", message)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.cancel_event.set()
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def cancelExport(self):
+        self.shutdown()
+        self.finishExport(f"Отменено, готово расчетов: {len(self.results)}/{len(self.selected)}. "
+                          "Уже начатые графики прерываются перед сохранением файла")
+
+    def closeEvent(self, event):
+        if self.poll_timer.isActive():
+            self.cancelExport()
+        else:
+            self.shutdown()
+        super().closeEvent(event)
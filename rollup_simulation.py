@@ -1,7 +1,12 @@
 import numpy as np
 
+from snapshot import SnapshotMixin
+
+
+class RollupSimulation(SnapshotMixin):
+    _snapshot_fields = ('t_global', 'dt', 'on_approach', 'on_incline', 'x_body', 'y_body', 'velocity', '_finished',
+                        'v_at_base', 'dist_incline', 't_segment', 'friction_incline', 'friction_horizontal')
 
-class RollupSimulation:
     def __init__(self, angle_deg, length, v0_val,
                  fric_inc, fric_hor, init_h_dist_param):
 
@@ -225,6 +230,9 @@ class RollupSimulation:
     def is_finished(self):
         return self._finished
 
+    def is_stalled(self):
+        return False
+
     def get_plane_coordinates(self):
         return self.x_plane, self.y_plane
 
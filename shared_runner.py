@@ -0,0 +1,226 @@
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from simulation import Simulation
+from rollup_simulation import RollupSimulation
+from batch_simulation import precision_dtype
+from snapshot import iterate_steps
+
+
+FIELDS = ('time', 'velocity', 'x', 'y')
+
+_worker_shm = None
+_worker_data = None
+
+
+class SlabPool:
+    def __init__(self, n_slabs, slab_size=1024, dtype=np.float64):
+        self.slab_size = slab_size
+        self.n_slabs = n_slabs
+        self.capacity = n_slabs * slab_size
+        self.dtype = precision_dtype(dtype)
+        self.shm = shared_memory.SharedMemory(create=True, size=len(FIELDS) * self.capacity * self.dtype.itemsize)
+        self.data = np.frombuffer(self.shm.buf, dtype=self.dtype,
+                                  count=len(FIELDS) * self.capacity).reshape(len(FIELDS), self.capacity)
+        self._free = list(range(n_slabs))
+        self._trajectories = weakref.WeakSet()
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def slabs_for(self, length):
+        return max(1, -(-length // self.slab_size))
+
+    def allocate(self, length):
+        count = self.slabs_for(length)
+        if count > len(self._free):
+            return None
+        free = np.asarray(self._free)
+        runs = np.flatnonzero(free[count - 1:] - free[:free.size - count + 1] == count - 1)
+        start = int(runs[0]) if runs.size else 0
+        slabs = self._free[start:start + count]
+        del self._free[start:start + count]
+        return slabs
+
+    def free(self, slabs):
+        self._free.extend(slabs)
+        self._free.sort()
+
+    def shrink(self, slabs, used):
+        keep = self.slabs_for(used)
+        self.free(slabs[keep:])
+        return slabs[:keep]
+
+    def position(self, slabs, n):
+        return slabs[n // self.slab_size] * self.slab_size + n % self.slab_size
+
+    def contiguous(self, slabs):
+        return all(b == a + 1 for a, b in zip(slabs, slabs[1:]))
+
+    def segments(self, field, slabs, length):
+        row = self.data[field]
+        if self.contiguous(slabs):
+            start = slabs[0] * self.slab_size
+            return [row[start:start + length]]
+        return [row[slab * self.slab_size:slab * self.slab_size + min(self.slab_size, length - i * self.slab_size)]
+                for i, slab in enumerate(slabs)]
+
+    def gather(self, field, slabs, length):
+        parts = self.segments(field, slabs, length)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def free_slabs(self):
+        return len(self._free)
+
+    def track(self, trajectory):
+        self._trajectories.add(trajectory)
+
+    def close(self):
+        if self.shm is None:
+            return
+        for trajectory in list(self._trajectories):
+            trajectory.detach()
+        self.data = None
+        try:
+            self.shm.close()
+        except BufferError:
+            raise ValueError("Разделяемая память еще используется: удалите массивы, "
+                             "полученные из траекторий, до закрытия пула") from None
+        self.shm.unlink()
+        self.shm = None
+
+
+class Trajectory:
+    def __init__(self, pool, slabs, length, finished, params):
+        self.pool = pool
+        self.slabs = slabs
+        self.length = length
+        self.finished = finished
+        self.params = params
+        self._fields = {}
+        pool.track(self)
+
+    def _field(self, name):
+        if name not in self._fields:
+            if self.pool is None:
+                raise ValueError("Траектория уже освобождена")
+            self._fields[name] = self.pool.gather(FIELDS.index(name), self.slabs, self.length)
+        return self._fields[name]
+
+    def segments(self, name):
+        if self.pool is None:
+            return [self._field(name)]
+        return self.pool.segments(FIELDS.index(name), self.slabs, self.length)
+
+    @property
+    def time_points(self):
+        return self._field('time')
+
+    @property
+    def velocity_points(self):
+        return self._field('velocity')
+
+    @property
+    def x_points(self):
+        return self._field('x')
+
+    @property
+    def y_points(self):
+        return self._field('y')
+
+    def detach(self):
+        if self.pool is not None:
+            self._fields = {name: np.array(self._field(name)) for name in FIELDS}
+            self.pool.free(self.slabs)
+            self.pool = None
+
+    def release(self):
+        if self.pool is not None:
+            self.pool.free(self.slabs)
+            self.pool = None
+        self._fields = {}
+
+
+def _attach(name, capacity, dtype):
+    global _worker_shm, _worker_data
+    _worker_shm = shared_memory.SharedMemory(name=name)
+    _worker_data = np.ndarray((len(FIELDS), capacity), dtype=dtype, buffer=_worker_shm.buf)
+
+
+def _run_task(task):
+    index, scenario_type, params, dt, slabs, slab_size, capacity = task
+    sim = Simulation(*params) if scenario_type == 'roll_down' else RollupSimulation(*params)
+    time_out, velocity_out, x_out, y_out = _worker_data
+    i = slabs[0] * slab_size
+    time_out[i] = sim.time_points[0]
+    velocity_out[i] = sim.velocity_points[0]
+    x_out[i] = sim.x_body
+    y_out[i] = sim.y_body
+    n = 1
+    for t, v, x, y in iterate_steps(sim, capacity - 1, dt, keep_history=False):
+        i = slabs[n // slab_size] * slab_size + n % slab_size
+        time_out[i] = t
+        velocity_out[i] = v
+        x_out[i] = x
+        y_out[i] = y
+        n += 1
+    exact = (sim.time_points[-1], sim.velocity_points[-1], sim.x_body, sim.y_body)
+    return index, n, sim.is_finished() or sim.is_stalled(), exact
+
+
+class SharedMemoryRunner:
+    def __init__(self, processes=None, max_steps=10000, n_slabs=4096, slab_size=1024, dt=0.05,
+                 precision='float64'):
+        self.max_steps = max_steps
+        self.dt = dt
+        self.pool = SlabPool(n_slabs, slab_size, precision)
+        self.deviation = dict.fromkeys(FIELDS, 0.0)
+        if self.pool.slabs_for(max_steps + 1) > n_slabs:
+            self.pool.close()
+            raise ValueError("Пул разделяемой памяти меньше одной траектории")
+        self.executor = ProcessPoolExecutor(max_workers=processes or os.cpu_count(),
+                                            initializer=_attach, initargs=(self.pool.name, self.pool.capacity, self.pool.dtype.str))
+
+    def run(self, scenario_type, param_sets):
+        if scenario_type not in ('roll_down', 'roll_up'):
+            raise ValueError(f"Неизвестный сценарий: {scenario_type}")
+        capacity = self.max_steps + 1
+        results = [None] * len(param_sets)
+        pending = {}
+        next_task = 0
+        while next_task < len(param_sets) or pending:
+            while next_task < len(param_sets):
+                slabs = self.pool.allocate(capacity)
+                if slabs is None:
+                    break
+                task = (next_task, scenario_type, tuple(param_sets[next_task]), self.dt, slabs,
+                        self.pool.slab_size, capacity)
+                pending[self.executor.submit(_run_task, task)] = task
+                next_task += 1
+            if not pending:
+                raise MemoryError("Недостаточно разделяемой памяти: освободите полученные траектории")
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = pending.pop(future)
+                index, length, finished, exact = future.result()
+                slabs = self.pool.shrink(task[4], length)
+                stored = self.pool.data[:, self.pool.position(slabs, length - 1)]
+                for name, value, reference in zip(FIELDS, stored.tolist(), exact):
+                    self.deviation[name] = max(self.deviation[name], abs(value - float(reference)))
+                results[index] = Trajectory(self.pool, slabs, length, finished, task[2])
+        return results
+
+    def close(self):
+        self.executor.shutdown()
+        self.pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,6 +1,12 @@
 import numpy as np
 
-class Simulation:
+from snapshot import SnapshotMixin
+
+
+class Simulation(SnapshotMixin):
+    _snapshot_fields = ('t', 'dt', 'x_body', 'y_body', 'velocity', 'on_inclined_plane', 'v0_horizontal',
+                        'x_horizontal_start', 'friction_incline', 'friction_horizontal')
+
     def __init__(self, angle, length, horizontal_length, v0, friction_incline, friction_horizontal):
         self.g = 9.81
         self.angle = np.radians(angle)
@@ -26,6 +32,7 @@ class Simulation:
         self.velocity = self.v0
         self.on_inclined_plane = True
         self.v0_horizontal = 0
+        self.x_horizontal_start = self.L * np.cos(self.angle)
         self.time_points = [0]
         self.velocity_points = [self.v0]
 
@@ -54,7 +61,7 @@ class Simulation:
             v = self.v0_horizontal + a * self.t
             v = max(0, min(v, self.c))
             s = self.v0_horizontal * self.t + 0.5 * a * self.t ** 2
-            self.x_body = self.L * np.cos(self.angle) + s
+            self.x_body = self.x_horizontal_start + s
             self.y_body = self.body_radius
             if self.x_body >= self.L * np.cos(self.angle) + self.horizontal_length or v <= 0:
                 if v < 0 : v = 0
@@ -71,14 +78,27 @@ class Simulation:
 
         return self.time_points[-1], self.velocity, self.x_body, self.y_body
 
+    def _rebase(self, params):
+        if self.on_inclined_plane or not {'friction_horizontal', 'dt'} & set(params):
+            return
+        if self.x_body != self.x_horizontal_start:
+            self.v0_horizontal = self.velocity
+            self.x_horizontal_start = self.x_body
+        self.t = params.get('dt', self.dt)
+
     def is_finished(self):
         if not self.on_inclined_plane:
             if self.x_body >= self.L * np.cos(self.angle) + self.horizontal_length or self.velocity <=0:
                 return True
         return False
 
+    def is_stalled(self):
+        if not self.on_inclined_plane or self.velocity != 0:
+            return False
+        return self.g * np.sin(self.angle) - self.friction_incline * self.g * np.cos(self.angle) <= 0
+
     def get_plane_coordinates(self):
         return self.x_plane, self.y_plane
 
     def get_horizontal_coordinates(self):
-        return self.x_horizontal, self.y_horizontal
\ No newline at end of file
+        return self.x_horizontal, self.y_horizontal
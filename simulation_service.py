@@ -0,0 +1,297 @@
+import argparse
+import asyncio
+import ipaddress
+import json
+import time
+from collections import deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from batch_simulation import BatchSimulation, BatchRollupSimulation, PARAM_BOUNDS, param_names
+from simulation import Simulation
+from rollup_simulation import RollupSimulation
+from snapshot import iterate_steps
+
+
+class StreamAborted(Exception):
+    pass
+
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+
+def _number(value, name):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Параметр {name} должен быть числом")
+    if not np.isfinite(number):
+        raise ValueError(f"Параметр {name} должен быть конечным числом")
+    return number
+
+
+def _parse_request(payload):
+    if not isinstance(payload, dict):
+        raise ValueError("Тело запроса должно быть JSON-объектом")
+    scenario_type = payload.get('scenario', 'roll_down')
+    names = param_names(scenario_type)
+    params = payload.get('params') or {}
+    if not isinstance(params, dict):
+        raise ValueError("Поле params должно быть JSON-объектом")
+    missing = [name for name in names if name not in params]
+    if missing:
+        raise ValueError(f"Не заданы параметры: {', '.join(missing)}")
+    values = []
+    for name in names:
+        value = _number(params[name], name)
+        low, high = PARAM_BOUNDS[name]
+        if not low <= value <= high:
+            raise ValueError(f"Недопустимое значение {name}={value:g} (допустимо от {low:g} до {high:g})")
+        values.append(value)
+    dt = _number(payload.get('dt', 0.05), 'dt')
+    if dt <= 0:
+        raise ValueError("Шаг по времени должен быть > 0")
+    return scenario_type, tuple(values), dt
+
+
+def run_batch(scenario_type, dt, rows, max_steps=100000):
+    columns = np.array(rows, dtype=np.float64).T
+    if scenario_type == 'roll_down':
+        sim = BatchSimulation(*columns).run(dt, max_steps)
+        flags = {'stalled': sim.stalled}
+        v_base = sim.v_at_base
+    else:
+        sim = BatchRollupSimulation(*columns).run(dt, max_steps)
+        flags = {'reached_peak': sim.reached_peak()}
+        v_base = np.abs(sim.v_at_base)
+    finished = sim.is_finished()
+    results = []
+    for i in range(len(rows)):
+        result = {
+            'x_final': float(sim.x_body[i]),
+            'y_final': float(sim.y_body[i]),
+            't_total': float(sim.t_global[i]),
+            'v_final': float(sim.velocity[i]),
+            'v_base': float(v_base[i]),
+            'finished': bool(finished[i]),
+        }
+        result.update({name: bool(flag[i]) for name, flag in flags.items()})
+        results.append(result)
+    return results
+
+
+class RequestBatcher:
+    def __init__(self, executor, window=0.003, max_batch=4096):
+        self.executor = executor
+        self.window = window
+        self.max_batch = max_batch
+        self.queue_depth = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self._queues = {}
+        self._timers = {}
+
+    async def submit(self, scenario_type, params, dt):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = (scenario_type, dt)
+        queue = self._queues.setdefault(key, [])
+        queue.append((params, future))
+        self.queue_depth += 1
+        if len(queue) >= self.max_batch:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.window, self._flush, key)
+        try:
+            return await future
+        finally:
+            self.queue_depth -= 1
+
+    def _flush(self, key):
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        items = self._queues.pop(key, [])
+        if not items:
+            return
+        self.batches += 1
+        self.batched_requests += len(items)
+        loop = asyncio.get_running_loop()
+        task = loop.run_in_executor(self.executor, run_batch, key[0], key[1], [params for params, _ in items])
+
+        def deliver(done):
+            error = done.exception()
+            results = None if error else done.result()
+            for i, (_, future) in enumerate(items):
+                if future.done():
+                    continue
+                if error:
+                    future.set_exception(error)
+                else:
+                    future.set_result(results[i])
+
+        task.add_done_callback(deliver)
+
+
+class SimulationService:
+    def __init__(self, window=0.003, max_batch=4096, workers=2, stream_chunk=500, max_steps=100000):
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.batcher = RequestBatcher(self.executor, window, max_batch)
+        self.stream_chunk = stream_chunk
+        self.max_steps = max_steps
+        self.latencies = deque(maxlen=10000)
+        self.requests = 0
+        self.active_streams = 0
+        self.server = None
+
+    async def start(self, host='127.0.0.1', port=8765, unix_path=None):
+        if unix_path:
+            self.server = await asyncio.start_unix_server(self.handle_connection, path=unix_path)
+        else:
+            if host != 'localhost' and not ipaddress.ip_address(host).is_loopback:
+                raise ValueError("Сервис принимает подключения только с локального адреса")
+            self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        self.executor.shutdown(wait=False)
+
+    def stats(self):
+        latencies = np.array(self.latencies) * 1000.0 if self.latencies else np.zeros(1)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        return {
+            'requests': self.requests,
+            'queue_depth': self.batcher.queue_depth,
+            'active_streams': self.active_streams,
+            'batches': self.batcher.batches,
+            'mean_batch_size': self.batcher.batched_requests / max(1, self.batcher.batches),
+            'latency_ms': {'p50': float(p50), 'p95': float(p95), 'p99': float(p99)},
+        }
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except ValueError as e:
+                    await self._send_json(writer, 400, {'error': str(e)})
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                started = time.perf_counter()
+                await self._dispatch(method, path, body, writer)
+                self.latencies.append(time.perf_counter() - started)
+                self.requests += 1
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, StreamAborted):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        parts = line.decode('latin-1').split()
+        if len(parts) != 3 or not parts[2].startswith('HTTP/'):
+            raise ValueError("Некорректная строка запроса")
+        method, path, _ = parts
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        length = headers.get('content-length', '0')
+        if not length.isdigit():
+            raise ValueError("Некорректный заголовок Content-Length")
+        length = int(length)
+        body = await reader.readexactly(length) if length else b''
+        return method, path, headers, body
+
+    async def _dispatch(self, method, path, body, writer):
+        try:
+            if path == '/stats' and method == 'GET':
+                await self._send_json(writer, 200, self.stats())
+            elif path == '/simulate' and method == 'POST':
+                scenario_type, params, dt = _parse_request(json.loads(body or b'{}'))
+                result = await self.batcher.submit(scenario_type, params, dt)
+                await self._send_json(writer, 200, result)
+            elif path == '/trajectory' and method == 'POST':
+                scenario_type, params, dt = _parse_request(json.loads(body or b'{}'))
+                await self._stream_trajectory(writer, scenario_type, params, dt)
+            elif path in ('/stats', '/simulate', '/trajectory'):
+                await self._send_json(writer, 405, {'error': "Метод не поддерживается"})
+            else:
+                await self._send_json(writer, 404, {'error': "Неизвестный адрес"})
+        except (ConnectionError, StreamAborted):
+            raise
+        except ValueError as e:
+            await self._send_json(writer, 400, {'error': str(e)})
+        except Exception as e:
+            await self._send_json(writer, 500, {'error': f"Ошибка расчета: {e}"})
+
+    async def _send_json(self, writer, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json; charset=utf-8\r\n"
+                     f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body)
+        await writer.drain()
+
+    async def _stream_trajectory(self, writer, scenario_type, params, dt):
+        sim = Simulation(*params) if scenario_type == 'roll_down' else RollupSimulation(*params)
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nTransfer-Encoding: chunked\r\n\r\n")
+        loop = asyncio.get_running_loop()
+        self.active_streams += 1
+        try:
+            rows = [[sim.time_points[0], sim.velocity_points[0], sim.x_body, sim.y_body]]
+            steps = iterate_steps(sim, self.max_steps, dt, keep_history=False)
+            while rows:
+                chunk = ''.join(json.dumps(row) + '\n' for row in rows).encode('utf-8')
+                writer.write(f"{len(chunk):x}\r\n".encode('latin-1') + chunk + b"\r\n")
+                await writer.drain()
+                rows = await loop.run_in_executor(self.executor, self._step_chunk, steps)
+        except ConnectionError:
+            raise
+        except Exception as e:
+            chunk = (json.dumps({'error': f"Ошибка расчета: {e}"}, ensure_ascii=False) + '\n').encode('utf-8')
+            writer.write(f"{len(chunk):x}\r\n".encode('latin-1') + chunk + b"\r\n")
+            await writer.drain()
+            raise StreamAborted() from e
+        finally:
+            self.active_streams -= 1
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    def _step_chunk(self, steps):
+        return [list(row) for row in islice(steps, self.stream_chunk)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальный сервис расчета движения тела (HTTP/JSON)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', default=None, help="Путь к Unix-сокету вместо TCP")
+    parser.add_argument('--window-ms', type=float, default=3.0)
+    parser.add_argument('--workers', type=int, default=2)
+    args = parser.parse_args()
+
+    async def serve():
+        service = SimulationService(window=args.window_ms / 1000.0, workers=args.workers)
+        server = await service.start(args.host, args.port, args.unix)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
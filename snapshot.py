@@ -0,0 +1,137 @@
+import copy
+from itertools import islice
+
+
+SNAPSHOT_VERSION = 1
+FORKABLE_PARAMS = ('friction_incline', 'friction_horizontal', 'dt')
+
+
+class PrefixList:
+    __slots__ = ('_base', '_base_len', '_tail')
+
+    def __init__(self, base, base_len):
+        self._base = base
+        self._base_len = base_len
+        self._tail = []
+
+    def __len__(self):
+        return self._base_len + len(self._tail)
+
+    def append(self, value):
+        self._tail.append(value)
+
+    def __iter__(self):
+        yield from islice(iter(self._base), self._base_len)
+        yield from self._tail
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            head = list(self._base[start:min(stop, self._base_len)]) if start < self._base_len else []
+            return head + self._tail[max(0, start - self._base_len):max(0, stop - self._base_len)]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("list index out of range")
+        if index < self._base_len:
+            return self._base[index]
+        return self._tail[index - self._base_len]
+
+    def __delitem__(self, index):
+        items = list(self)
+        del items[index]
+        self._base, self._base_len, self._tail = [], 0, items
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class SimulationSnapshot:
+    __slots__ = ('version', 'kind', 'state', 'time_points', 'velocity_points', 'length', 'extra')
+
+    def __init__(self, kind, state, time_points, velocity_points, length, extra=None):
+        self.version = SNAPSHOT_VERSION
+        self.kind = kind
+        self.state = state
+        self.time_points = time_points
+        self.velocity_points = velocity_points
+        self.length = length
+        self.extra = extra
+
+
+class SnapshotMixin:
+    _snapshot_fields = ()
+
+    def snapshot(self):
+        state = tuple(getattr(self, name) for name in self._snapshot_fields)
+        return SimulationSnapshot(type(self).__name__, state, self.time_points, self.velocity_points,
+                                  len(self.time_points), self._snapshot_extra())
+
+    def restore(self, snapshot):
+        if snapshot.version != SNAPSHOT_VERSION:
+            raise ValueError(f"Неподдерживаемая версия снимка: {snapshot.version}")
+        if snapshot.kind != type(self).__name__:
+            raise ValueError(f"Снимок {snapshot.kind} нельзя восстановить в {type(self).__name__}")
+        for name, value in zip(self._snapshot_fields, snapshot.state):
+            setattr(self, name, value)
+        self.time_points = PrefixList(snapshot.time_points, snapshot.length)
+        self.velocity_points = PrefixList(snapshot.velocity_points, snapshot.length)
+        self._restore_extra(snapshot.extra)
+        self._params_changed()
+
+    def fork(self, snapshot, variations):
+        if isinstance(variations, int):
+            variations = [{}] * variations
+        forks = []
+        for overrides in variations:
+            fork = copy.copy(self)
+            fork.restore(snapshot)
+            fork.set_params(**overrides)
+            forks.append(fork)
+        return forks
+
+    def set_params(self, **params):
+        unknown = set(params) - set(FORKABLE_PARAMS)
+        if unknown:
+            raise ValueError(f"Нельзя изменить во время движения: {', '.join(sorted(unknown))}")
+        self._rebase(params)
+        for name, value in params.items():
+            setattr(self, name, value)
+        self._params_changed()
+
+    def _snapshot_extra(self):
+        return None
+
+    def _restore_extra(self, extra):
+        pass
+
+    def _rebase(self, params):
+        pass
+
+    def _params_changed(self):
+        pass
+
+
+def iterate_steps(sim, max_steps, dt=None, stop_on_stall=True, keep_history=True):
+    dt = sim.dt if dt is None else dt
+    for _ in range(max_steps):
+        if sim.is_finished() or (stop_on_stall and sim.is_stalled()):
+            return
+        t, _, x, y = sim.step(dt)
+        yield t, sim.velocity_points[-1], x, y
+        if not keep_history:
+            del sim.time_points[:-1], sim.velocity_points[:-1]
+
+
+def run_to_completion(sim, max_steps, dt=None):
+    x_points = [sim.x_body]
+    y_points = [sim.y_body]
+    for _, _, x, y in iterate_steps(sim, max_steps, dt):
+        x_points.append(x)
+        y_points.append(y)
+    return x_points, y_points
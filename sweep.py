@@ -0,0 +1,347 @@
+import argparse
+import hashlib
+import json
+import math
+import os
+import socket
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from batch_simulation import BatchSimulation, BatchRollupSimulation, param_names, precision_dtype
+
+
+SWEEP_VERSION = 1
+MANIFEST = 'manifest.sqlite'
+OUTPUTS = {
+    'roll_down': ('x_body', 'y_body', 't_global', 'velocity', 'v_at_base', 'finished', 'stalled'),
+    'roll_up': ('x_body', 'y_body', 't_global', 'velocity', 'v_at_base', 'finished', 'reached_peak'),
+}
+DEFAULT_OUTPUTS = ('x_body', 't_global', 'velocity', 'finished')
+
+
+def _axis(name, value):
+    if isinstance(value, dict):
+        if 'values' in value:
+            value = value['values']
+        elif {'start', 'stop', 'num'} <= set(value):
+            return np.linspace(float(value['start']), float(value['stop']), int(value['num'])).tolist()
+        else:
+            raise ValueError(f"Параметр {name}: ожидается values или start/stop/num")
+    values = [float(v) for v in (value if isinstance(value, list) else [value])]
+    if not values:
+        raise ValueError(f"Параметр {name}: пустой список значений")
+    return values
+
+
+def normalize_spec(spec):
+    scenario_type = spec.get('scenario')
+    names = param_names(scenario_type)
+    params = spec.get('params', {})
+    missing = [name for name in names if name not in params]
+    if missing:
+        raise ValueError(f"Не заданы параметры: {', '.join(missing)}")
+    unknown = [name for name in params if name not in names]
+    if unknown:
+        raise ValueError(f"Неизвестные параметры: {', '.join(unknown)}")
+    outputs = list(spec.get('outputs', DEFAULT_OUTPUTS))
+    wrong = [name for name in outputs if name not in OUTPUTS[scenario_type]]
+    if wrong:
+        raise ValueError(f"Неизвестные величины: {', '.join(wrong)} "
+                         f"(допустимо: {', '.join(OUTPUTS[scenario_type])})")
+    shard_size = int(spec.get('shard_size', 50000))
+    if shard_size < 1:
+        raise ValueError("Размер шарда должен быть положительным")
+    return {
+        'scenario': scenario_type,
+        'axes': {name: _axis(name, params[name]) for name in names},
+        'dt': float(spec.get('dt', 0.05)),
+        'max_steps': int(spec.get('max_steps', 20000)),
+        'outputs': outputs,
+        'precision': precision_dtype(spec.get('precision', 'float64')).name,
+        'shard_size': shard_size,
+    }
+
+
+def load_spec(path):
+    if path.lower().endswith('.toml'):
+        try:
+            import tomllib
+        except ImportError:
+            raise ValueError("Для файлов TOML нужен Python 3.11 или новее, задайте задание в JSON") from None
+        with open(path, 'rb') as f:
+            spec = tomllib.load(f)
+    else:
+        with open(path, encoding='utf-8') as f:
+            spec = json.load(f)
+    return spec
+
+
+def spec_hash(spec):
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()
+
+
+def _worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _is_alive(worker):
+    host, _, pid = (worker or '').rpartition(':')
+    if host != socket.gethostname() or not pid.isdigit():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _compute_shard(spec, start, stop):
+    names = param_names(spec['scenario'])
+    axes = [np.asarray(spec['axes'][name], dtype=np.float64) for name in names]
+    idx = np.unravel_index(np.arange(start, stop), tuple(axis.size for axis in axes))
+    params = [axis[i] for axis, i in zip(axes, idx)]
+    engine = BatchSimulation if spec['scenario'] == 'roll_down' else BatchRollupSimulation
+    sim = engine(*params, dtype=spec['precision']).run(spec['dt'], spec['max_steps'])
+    results = {}
+    for name in spec['outputs']:
+        value = getattr(sim, name)
+        results[name] = np.asarray(value() if callable(value) else value)
+    results['stopped'] = np.asarray(sim.is_stopped())
+    return results
+
+
+class SweepJob:
+    def __init__(self, directory, spec=None, lease=3600.0, max_attempts=3):
+        self.directory = directory
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.path = os.path.join(directory, MANIFEST)
+        if spec is None:
+            if not os.path.exists(self.path):
+                raise ValueError(f"В папке {directory} нет задания")
+            self.spec = json.loads(self._meta('spec'))
+            return
+
+        self.spec = normalize_spec(spec)
+        os.makedirs(os.path.join(directory, 'shards'), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute("CREATE TABLE IF NOT EXISTS shards (id INTEGER PRIMARY KEY, start INTEGER, stop INTEGER, "
+                         "status TEXT, worker TEXT, lease_until REAL, attempts INTEGER, elapsed REAL, error TEXT)")
+            row = conn.execute("SELECT value FROM meta WHERE key = 'hash'").fetchone()
+            if row is None:
+                conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+                    ('version', str(SWEEP_VERSION)),
+                    ('spec', json.dumps(self.spec)),
+                    ('hash', spec_hash(self.spec)),
+                ])
+                conn.executemany(
+                    "INSERT INTO shards VALUES (?, ?, ?, 'pending', NULL, 0, 0, 0, NULL)",
+                    [(i, start, min(start + self.spec['shard_size'], self.size))
+                     for i, start in enumerate(range(0, self.size, self.spec['shard_size']))])
+            elif row[0] != spec_hash(self.spec):
+                raise ValueError(f"Задание в папке {directory} создано для другой спецификации")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _meta(self, key):
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()[0]
+        finally:
+            conn.close()
+
+    @property
+    def names(self):
+        return param_names(self.spec['scenario'])
+
+    @property
+    def shape(self):
+        return tuple(len(self.spec['axes'][name]) for name in self.names)
+
+    @property
+    def size(self):
+        return math.prod(self.shape)
+
+    def shard_path(self, shard_id):
+        return os.path.join(self.directory, 'shards', f"shard_{shard_id:06d}.npz")
+
+    def claim(self, worker=None):
+        worker = worker or _worker_id()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            for shard_id, owner, lease_until in conn.execute(
+                    "SELECT id, worker, lease_until FROM shards WHERE status = 'running'").fetchall():
+                if lease_until < now or not _is_alive(owner):
+                    conn.execute("UPDATE shards SET status = 'pending', worker = NULL WHERE id = ?", (shard_id,))
+            row = conn.execute("SELECT id, start, stop FROM shards WHERE status = 'pending' "
+                               "ORDER BY id LIMIT 1").fetchone()
+            if row is not None:
+                conn.execute("UPDATE shards SET status = 'running', worker = ?, lease_until = ?, "
+                             "attempts = attempts + 1 WHERE id = ?", (worker, now + self.lease, row[0]))
+            conn.execute("COMMIT")
+            return row
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def complete(self, shard_id, results, elapsed):
+        path = self.shard_path(shard_id)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **results)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        conn = self._connect()
+        try:
+            conn.execute("UPDATE shards SET status = 'done', elapsed = ?, error = NULL WHERE id = ?",
+                         (elapsed, shard_id))
+        finally:
+            conn.close()
+
+    def fail(self, shard_id, error):
+        conn = self._connect()
+        try:
+            conn.execute("UPDATE shards SET status = CASE WHEN attempts < ? THEN 'pending' ELSE 'failed' END, "
+                         "worker = NULL, error = ? WHERE id = ?", (self.max_attempts, error, shard_id))
+        finally:
+            conn.close()
+
+    def work(self, worker=None):
+        done = 0
+        while True:
+            row = self.claim(worker)
+            if row is None:
+                return done
+            shard_id, start, stop = row
+            started = time.perf_counter()
+            try:
+                results = _compute_shard(self.spec, start, stop)
+            except Exception as e:
+                self.fail(shard_id, f"{type(e).__name__}: {e}")
+                continue
+            self.complete(shard_id, results, time.perf_counter() - started)
+            done += 1
+
+    def run(self, workers=1):
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(_work, self.directory, self.lease, self.max_attempts)
+                           for _ in range(workers)]
+                for future in futures:
+                    future.result()
+        else:
+            self.work()
+        return self.status()
+
+    def status(self):
+        conn = self._connect()
+        try:
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM shards GROUP BY status").fetchall())
+            elapsed = conn.execute("SELECT SUM(elapsed) FROM shards WHERE status = 'done'").fetchone()[0]
+            errors = [row[0] for row in conn.execute(
+                "SELECT error FROM shards WHERE status = 'failed' ORDER BY id LIMIT 5").fetchall()]
+        finally:
+            conn.close()
+        counts = {status: counts.get(status, 0) for status in ('pending', 'running', 'done', 'failed')}
+        return dict(counts, total=sum(counts.values()), elapsed=elapsed or 0.0, errors=errors)
+
+    def reset_failed(self):
+        conn = self._connect()
+        try:
+            conn.execute("UPDATE shards SET status = 'pending', attempts = 0, error = NULL WHERE status = 'failed'")
+        finally:
+            conn.close()
+
+    def load_results(self):
+        status = self.status()
+        if status['done'] != status['total']:
+            raise ValueError(f"Задание не завершено: готово {status['done']} из {status['total']} шардов")
+        conn = self._connect()
+        try:
+            shards = conn.execute("SELECT id, start, stop FROM shards ORDER BY id").fetchall()
+        finally:
+            conn.close()
+        results = {}
+        for shard_id, start, stop in shards:
+            with np.load(self.shard_path(shard_id)) as data:
+                for name in data.files:
+                    if name not in results:
+                        results[name] = np.empty(self.size, dtype=data[name].dtype)
+                    results[name][start:stop] = data[name]
+        return {name: values.reshape(self.shape) for name, values in results.items()}
+
+    def export(self, path):
+        results = self.load_results()
+        axes = {f"axis_{name}": np.asarray(self.spec['axes'][name]) for name in self.names}
+        with open(path, 'wb') as f:
+            np.savez_compressed(f, spec=np.array(json.dumps(self.spec)), **axes, **results)
+        return path
+
+
+def _work(directory, lease, max_attempts):
+    return SweepJob(directory, lease=lease, max_attempts=max_attempts).work()
+
+
+def _print_status(status):
+    print(f"Шардов: {status['total']}, готово: {status['done']}, в очереди: {status['pending']}, "
+          f"выполняется: {status['running']}, с ошибкой: {status['failed']}, "
+          f"время расчета: {status['elapsed']:.1f} с")
+    for error in status['errors']:
+        print(f"  {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Возобновляемые расчеты по сетке параметров")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="Запустить или продолжить задание")
+    run_parser.add_argument('spec', help="Файл задания (JSON или TOML)")
+    run_parser.add_argument('--dir', required=True)
+    run_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    run_parser.add_argument('--lease', type=float, default=3600.0,
+                            help="Через сколько секунд шард без результата выдается другому процессу")
+    run_parser.add_argument('--retry-failed', action='store_true')
+
+    status_parser = subparsers.add_parser('status', help="Состояние задания")
+    status_parser.add_argument('--dir', required=True)
+
+    export_parser = subparsers.add_parser('export', help="Собрать результаты в один файл")
+    export_parser.add_argument('--dir', required=True)
+    export_parser.add_argument('--out', required=True)
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        job = SweepJob(args.dir, load_spec(args.spec), lease=args.lease)
+        if args.retry_failed:
+            job.reset_failed()
+        _print_status(job.run(args.workers))
+    elif args.command == 'status':
+        _print_status(SweepJob(args.dir).status())
+    else:
+        print(SweepJob(args.dir).export(args.out))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from batch_simulation import (BatchSimulation, BatchRollupSimulation, END_STATE_FIELDS, param_names,
+                              precision_dtype)
+from simulation import Simulation
+from rollup_simulation import RollupSimulation
+from snapshot import run_to_completion
+
+
+@pytest.mark.parametrize('angle', [90.0, 89.9, 45.0])
+def test_float32_keeps_trigonometry_exact(angle):
+    single = BatchSimulation(angle, 10, 10, 0, 0.5, 0.1, dtype='float32')
+    double = BatchSimulation(angle, 10, 10, 0, 0.5, 0.1)
+    assert single._cos >= 0
+    assert single._cos == np.float32(double._cos)
+    single.run(0.05)
+    double.run(0.05)
+    assert single.x_body.dtype == np.float32
+    assert single.x_body == pytest.approx(double.x_body, rel=1e-4, abs=1e-4)
+    assert single.t_global == pytest.approx(double.t_global, rel=1e-4)
+
+
+def test_float32_rollup_at_vertical_angle():
+    single = BatchRollupSimulation(90.0, 10, 8, 0.1, 0.2, 5, dtype='float32').run(0.05)
+    double = BatchRollupSimulation(90.0, 10, 8, 0.1, 0.2, 5).run(0.05)
+    assert single.velocity.dtype == np.float32
+    assert single.x_body == pytest.approx(double.x_body, abs=1e-4)
+    assert single.y_body == pytest.approx(double.y_body, abs=1e-4)
+
+
+def random_params(scenario_type, n, seed=0):
+    rng = np.random.default_rng(seed)
+    angle = rng.uniform(0, 90, n)
+    length = rng.uniform(0.5, 20, n)
+    v0 = rng.uniform(0, 20, n)
+    friction_incline = rng.uniform(0, 1, n)
+    friction_horizontal = rng.uniform(0, 1, n)
+    if scenario_type == 'roll_down':
+        return [angle, length, rng.uniform(0.5, 20, n), v0, friction_incline, friction_horizontal]
+    return [angle, length, v0, friction_incline, friction_horizontal, rng.uniform(0, 20, n)]
+
+
+def scalar_end_state(scenario_type, row, dt=0.05, max_steps=20000):
+    sim = Simulation(*row) if scenario_type == 'roll_down' else RollupSimulation(*row)
+    run_to_completion(sim, max_steps, dt)
+    return sim.x_body, sim.time_points[-1]
+
+
+@pytest.mark.parametrize('scenario_type', ['roll_down', 'roll_up'])
+def test_batch_matches_scalar_engine(scenario_type):
+    params = random_params(scenario_type, 200)
+    engine = BatchSimulation if scenario_type == 'roll_down' else BatchRollupSimulation
+    batch = engine(*params).run(0.05, 20000)
+    for i in range(200):
+        x, t = scalar_end_state(scenario_type, [float(p[i]) for p in params])
+        assert batch.x_body[i] == pytest.approx(x, abs=1e-9)
+        assert batch.t_global[i] == pytest.approx(t, abs=1e-9)
+
+
+@pytest.mark.parametrize('scenario_type', ['roll_down', 'roll_up'])
+def test_lane_compaction_does_not_change_results(scenario_type):
+    params = random_params(scenario_type, 3000, seed=1)
+    engine = BatchSimulation if scenario_type == 'roll_down' else BatchRollupSimulation
+    compacted = engine(*params).run(0.05, 20000)
+    plain = engine(*params).run(0.05, 20000, compact_every=10 ** 9)
+    for name in END_STATE_FIELDS:
+        np.testing.assert_array_equal(getattr(compacted, name), getattr(plain, name))
+    np.testing.assert_array_equal(compacted.is_finished(), plain.is_finished())
+
+
+def test_parameters_broadcast():
+    sim = BatchSimulation([20, 30, 40], 10, 10, 5, 0.1, 0.1).run(0.05)
+    assert sim.x_body.shape == (3,)
+    assert sim.is_finished().all()
+
+
+def test_names_and_precisions():
+    assert param_names('roll_up')[-1] == 'initial_distance'
+    assert precision_dtype('float32') == np.float32
+    assert precision_dtype(np.float64) == np.float64
+    with pytest.raises(ValueError):
+        param_names('roll_sideways')
+    with pytest.raises(ValueError):
+        precision_dtype('float16')
+
+
+def test_lane_stalled_from_start_does_not_step():
+    sim = BatchSimulation([10.0, 45.0], 10, 20, 0, 0.6, 0.3)
+    assert list(sim.stalled) == [True, False]
+    sim.run(0.05)
+    assert sim.t_global[0] == 0
+    assert sim.x_body[0] == 0
+    x, t = scalar_end_state('roll_down', [10.0, 10, 20, 0, 0.6, 0.3])
+    assert (x, t) == (0, 0)
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from decimation import MinMaxDecimator, lttb
+
+
+def signal(n, seed=0):
+    t = np.linspace(0, 100, n)
+    v = np.sin(t) * 5 + np.random.default_rng(seed).normal(0, 0.5, n)
+    return t, v
+
+
+def test_lttb_keeps_endpoints_and_order():
+    t, v = signal(10000)
+    x, y = lttb(t, v, 500)
+    assert x.size == y.size == 500
+    assert (x[0], x[-1]) == (t[0], t[-1])
+    assert np.all(np.diff(x) > 0)
+    assert np.isin(x, t).all()
+    np.testing.assert_array_equal(y, v[np.searchsorted(t, x)])
+
+
+def test_lttb_passes_short_input_through():
+    t, v = signal(100)
+    x, y = lttb(t, v, 200)
+    assert np.array_equal(x, t) and np.array_equal(y, v)
+
+
+@pytest.mark.parametrize('chunk', [1, 7, 1000])
+def test_min_max_decimator_keeps_extremes(chunk):
+    t, v = signal(20000, seed=1)
+    decimator = MinMaxDecimator(max_buckets=200)
+    for end in range(chunk, t.size + chunk, chunk):
+        decimator.update(t[:end], v[:end])
+    x, y = decimator.points()
+    assert x.size <= 2 * 200 + 4
+    assert (x[0], x[-1]) == (t[0], t[-1])
+    assert y.max() == v.max() and y.min() == v.min()
+    assert np.all(np.diff(x) > 0)
+    np.testing.assert_array_equal(decimator.data()[1], v)
+
+
+def test_min_max_decimator_bucket_extremes():
+    t, v = signal(4096, seed=2)
+    decimator = MinMaxDecimator(max_buckets=64)
+    decimator.update(t, v)
+    _, y = decimator.points()
+    blocks = v.reshape(64, -1)
+    assert np.isin(blocks.max(axis=1), y).all()
+    assert np.isin(blocks.min(axis=1), y).all()
+
+
+def test_min_max_decimator_resets_on_shorter_history():
+    t, v = signal(1000)
+    decimator = MinMaxDecimator(max_buckets=50)
+    decimator.update(t, v)
+    decimator.update(t[:10], v[:10])
+    np.testing.assert_array_equal(decimator.points()[0], t[:10])
+    decimator.set_max_buckets(5)
+    decimator.update(t, v)
+    assert decimator.points()[0].size <= 2 * 5 + 4
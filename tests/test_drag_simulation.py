@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from drag_simulation import (BatchDragSimulation, BatchDragRollupSimulation, DragSimulation,
+                             DragRollupSimulation)
+from snapshot import run_to_completion
+
+G = 9.81
+
+
+def roll_down_distance(angle, length, v0, friction_incline, friction_horizontal):
+    a = np.radians(angle)
+    v1 = np.sqrt(v0 ** 2 + 2 * G * (np.sin(a) - friction_incline * np.cos(a)) * length)
+    return length * np.cos(a) + (v1 * np.cos(a)) ** 2 / (2 * friction_horizontal * G)
+
+
+def test_without_drag_matches_analytic_roll_down():
+    angle = np.array([30.0, 45.0, 60.0])
+    v0 = np.array([0.0, 2.0, 5.0])
+    sim = BatchDragSimulation(angle, 10, 20, v0, 0.2, 0.3, 0.0).run()
+    assert sim.is_finished().all()
+    assert not sim.stalled.any()
+    expected = roll_down_distance(angle, 10, v0, 0.2, 0.3)
+    np.testing.assert_allclose(sim.x_body, expected, rtol=1e-9)
+
+
+def test_without_drag_matches_analytic_rollup():
+    sim = BatchDragRollupSimulation([30.0, 45.0], 10, [8.0, 20.0], 0.1, 0.2, [5.0, 0.0], 0.0).run()
+    a = np.radians(30.0)
+    v_base = np.sqrt(8.0 ** 2 - 2 * 0.2 * G * 5.0) * np.cos(a)
+    climb = v_base ** 2 / (2 * G * (np.sin(a) + 0.1 * np.cos(a)))
+    assert sim.x_body[0] == pytest.approx(-climb * np.cos(a), rel=1e-9)
+    assert list(sim.reached_peak()) == [False, True]
+    assert sim.x_body[1] == pytest.approx(-10 * np.cos(np.radians(45.0)))
+
+
+def test_drag_shortens_distance():
+    angle, v0 = [30.0, 45.0, 60.0], [0.0, 2.0, 5.0]
+    free = BatchDragSimulation(angle, 10, 20, v0, 0.2, 0.3, 0.0).run()
+    dragged = BatchDragSimulation(angle, 10, 20, v0, 0.2, 0.3, [0.01, 0.05, 0.2]).run()
+    assert (dragged.x_body < free.x_body).all()
+    assert (dragged.t_global < free.t_global).all()
+
+
+def test_scalar_engines_match_batch():
+    sim = DragSimulation(45, 10, 20, 2, 0.2, 0.3, 0.05)
+    run_to_completion(sim, 100000)
+    batch = BatchDragSimulation([30.0, 45.0], 10, 20, 2, 0.2, 0.3, 0.05).run()
+    assert sim.is_finished()
+    assert sim.x_body == pytest.approx(batch.x_body[1], rel=1e-6)
+
+    sim = DragRollupSimulation(30, 10, 8, 0.1, 0.2, 5, 0.05)
+    run_to_completion(sim, 100000)
+    batch = BatchDragRollupSimulation(30, 10, 8, 0.1, 0.2, 5, 0.05).run()
+    assert sim.x_body == pytest.approx(float(batch.x_body), rel=1e-6)
+
+
+def test_set_friction_revives_stalled_lane():
+    sim = BatchDragSimulation([20.0, 45.0], 10, 20, 0, 0.6, 0.3, 0.01).run()
+    assert list(sim.stalled) == [True, False]
+    x_before = sim.x_body.copy()
+    sim.set_friction([0.1, 0.6], 0.3, sim.t_global)
+    assert list(sim.is_finished()) == [False, True]
+    sim.run()
+    assert not sim.stalled.any()
+    assert sim.x_body[0] > 10 * np.cos(np.radians(20.0))
+    assert sim.x_body[1] == x_before[1]
+
+
+def test_scalar_set_params_revives_stalled_simulation():
+    sim = DragSimulation(20, 10, 20, 0, 0.6, 0.3, 0.01)
+    run_to_completion(sim, 1000)
+    assert sim.is_finished() and sim.on_inclined_plane
+    sim.set_params(friction_incline=0.1)
+    assert not sim.is_finished()
+    run_to_completion(sim, 100000)
+    assert not sim.on_inclined_plane
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+import jit_kernels
+from jit_kernels import final_states, trajectories, trajectory
+
+
+def random_rows(scenario_type, n, seed=0):
+    rng = np.random.default_rng(seed)
+    columns = [rng.uniform(0, 90, n), rng.uniform(0.5, 20, n)]
+    if scenario_type == 'roll_down':
+        columns.append(rng.uniform(0.5, 20, n))
+    columns += [rng.uniform(0, 20, n), rng.uniform(0, 1, n), rng.uniform(0, 1, n)]
+    if scenario_type == 'roll_up':
+        columns.append(rng.uniform(0, 20, n))
+    return np.stack(columns, axis=1)
+
+
+@pytest.mark.parametrize('scenario_type', ['roll_down', 'roll_up'])
+def test_kernels_match_python_backend(scenario_type):
+    rows = random_rows(scenario_type, 40)
+    expected = trajectories(scenario_type, rows, backend='python')
+    for backend in ('kernels', 'auto'):
+        for got, want in zip(trajectories(scenario_type, rows, backend=backend), expected):
+            np.testing.assert_array_equal(got, want)
+
+
+@pytest.mark.parametrize('scenario_type', ['roll_down', 'roll_up'])
+def test_final_states_match_trajectories(scenario_type):
+    rows = random_rows(scenario_type, 40, seed=1)
+    runs = trajectories(scenario_type, rows, backend='python')
+    for backend in ('python', 'kernels'):
+        finals, steps = final_states(scenario_type, rows, backend=backend)
+        np.testing.assert_array_equal(steps, [run.shape[1] - 1 for run in runs])
+        np.testing.assert_array_equal(finals, [run[:, -1] for run in runs])
+
+
+def test_max_steps_truncates_run():
+    params = (30, 10, 20, 2, 0.0, 0.0)
+    for backend in ('python', 'kernels'):
+        run = trajectory('roll_down', params, max_steps=5, backend=backend)
+        assert run.shape == (4, 6)
+        assert run[0, -1] == pytest.approx(0.25)
+        finals, steps = final_states('roll_down', params, max_steps=5, backend=backend)
+        assert steps[0] == 5
+        np.testing.assert_array_equal(finals[0], run[:, -1])
+
+
+def test_backend_choice_and_errors():
+    assert jit_kernels._backend('auto') == ('kernels' if jit_kernels.NUMBA_AVAILABLE else 'python')
+    with pytest.raises(ValueError):
+        trajectories('roll_down', random_rows('roll_down', 1), backend='gpu')
+    with pytest.raises(ValueError):
+        final_states('roll_sideways', random_rows('roll_down', 1))
@@ -0,0 +1,76 @@
+import os
+
+import numpy as np
+import pytest
+
+from lookup_table import LookupTable, build_table, simulate_end_states
+
+
+AXES = {
+    'angle': [20, 40],
+    'length': [5, 10],
+    'horizontal_length': [5, 10],
+    'v0': [0, 4],
+    'friction_incline': [0.1, 0.2, 0.3],
+    'friction_horizontal': [0.1, 0.3],
+}
+NAMES = tuple(AXES)
+
+
+@pytest.fixture(scope='module')
+def table(tmp_path_factory):
+    return build_table('roll_down', str(tmp_path_factory.mktemp('table')), axes=AXES, validation_samples=200)
+
+
+def test_nodes_are_exact(table):
+    params = (20, 10, 5, 4, 0.2, 0.3)
+    values, _ = table.query(*params)
+    exact, _ = simulate_end_states('roll_down', [np.array([p], dtype=np.float64) for p in params])
+    np.testing.assert_allclose(list(values.values()), exact[0], rtol=1e-6)
+
+
+def test_cell_center_is_mean_of_corners(table):
+    center = [0.5 * (axis[0] + axis[1]) for axis in AXES.values()]
+    result = table.interpolate(*center)
+    corners = table.values[:2, :2, :2, :2, :2, :2].reshape(-1, 3)
+    np.testing.assert_allclose(result, corners.mean(axis=0), rtol=1e-6)
+
+
+def test_scalar_and_batch_queries_agree(table):
+    rng = np.random.default_rng(0)
+    samples = [rng.uniform(axis[0], axis[-1], 50) for axis in AXES.values()]
+    for estimate in ('spread', 'center'):
+        values, errors, inside = table.query_batch(*samples, estimate=estimate)
+        assert inside.all()
+        for i in range(5):
+            single, single_errors = table.query(*(s[i] for s in samples), estimate=estimate)
+            np.testing.assert_allclose(list(single.values()), values[i], rtol=1e-9)
+            np.testing.assert_allclose(list(single_errors.values()), errors[i], rtol=1e-6)
+
+
+def test_estimates(table):
+    params = (30, 7, 7, 2, 0.15, 0.2)
+    _, spread = table.query(*params)
+    _, center = table.query(*params, estimate='center')
+    corners = table.values[:2, :2, :2, :2, :2, :2].reshape(-1, 3)
+    np.testing.assert_allclose(list(spread.values()), corners.max(axis=0) - corners.min(axis=0), rtol=1e-6)
+    np.testing.assert_allclose(list(center.values()), table.cell_errors[0, 0, 0, 0, 0, 0], rtol=1e-6)
+    with pytest.raises(ValueError):
+        table.query(*params, estimate='bound')
+    for name in table.outputs:
+        assert 0.0 <= table.meta['validation'][name]['within_spread'] <= 1.0
+        assert 0.0 <= table.meta['validation'][name]['within_center'] <= 1.0
+
+
+def test_table_reopens_from_disk(table):
+    reopened = LookupTable(os.path.dirname(table.values.filename))
+    assert reopened.params == NAMES
+    np.testing.assert_array_equal(reopened.values, table.values)
+
+
+def test_outside_table_is_computed_directly(table):
+    params = (60, 7, 7, 2, 0.15, 0.2)
+    values, errors = table.query(*params)
+    exact, _ = simulate_end_states('roll_down', [np.array([p], dtype=np.float64) for p in params])
+    assert list(values.values()) == exact[0].tolist()
+    assert set(errors.values()) == {0.0}
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from monte_carlo import (Constant, Normal, Uniform, MonteCarloSimulation, QuantileSketch, RunningStats,
+                         parse_distribution)
+
+
+def test_running_stats_merge_matches_single_pass():
+    values = np.random.default_rng(0).normal(3, 2, 10000)
+    merged = RunningStats()
+    for part in np.array_split(values, 7):
+        stats = RunningStats()
+        stats.update(part)
+        merged.merge(stats)
+    assert merged.count == values.size
+    assert merged.mean == pytest.approx(values.mean(), rel=1e-12)
+    assert merged.std == pytest.approx(values.std(ddof=1), rel=1e-12)
+    assert (merged.min, merged.max) == (values.min(), values.max())
+
+
+def test_quantile_sketch_relative_accuracy():
+    values = np.random.default_rng(1).lognormal(0, 1, 20000)
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    sketch.update(values)
+    for q in (0.05, 0.5, 0.95, 0.99):
+        assert sketch.quantile(q) == pytest.approx(np.quantile(values, q, method='lower'), rel=0.011)
+    assert values.min() <= sketch.quantile(0.0) <= values.min() * 1.02
+    assert values.max() / 1.02 <= sketch.quantile(1.0) <= values.max()
+
+
+def test_quantile_sketch_merge_is_exact():
+    values = np.random.default_rng(2).normal(0, 5, 5000)
+    whole = QuantileSketch()
+    whole.update(values)
+    merged = QuantileSketch()
+    for part in np.array_split(values, 3):
+        sketch = QuantileSketch()
+        sketch.update(part)
+        merged.merge(sketch)
+    for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+        assert merged.quantile(q) == whole.quantile(q)
+
+
+def test_quantile_stays_in_observed_range():
+    sketch = QuantileSketch()
+    sketch.update([18.8397] * 100)
+    assert sketch.quantile(0.05) == sketch.quantile(0.95) == 18.8397
+    assert np.isnan(QuantileSketch().quantile(0.5))
+
+
+def test_parse_distribution():
+    assert isinstance(parse_distribution('0.1'), Constant)
+    uniform = parse_distribution('uniform:1:2')
+    assert isinstance(uniform, Uniform) and uniform.support() == (1.0, 2.0)
+    normal = parse_distribution('normal:0.1:0.02:0:1')
+    assert isinstance(normal, Normal) and normal.support() == (0.0, 1.0)
+    for text in ('uniform:1', 'normal:a:b', 'beta:1:2', 'uniform:2:1'):
+        with pytest.raises(ValueError):
+            parse_distribution(text)
+
+
+PARAMS = {'angle': Uniform(20, 40), 'length': 10, 'horizontal_length': 10, 'v0': Normal(5, 1),
+          'friction_incline': Uniform(0.1, 0.5), 'friction_horizontal': 0.1}
+
+
+def test_result_does_not_depend_on_process_count():
+    simulation = MonteCarloSimulation('roll_down', PARAMS, 3000, chunk_size=1000, seed=3)
+    single = simulation.run(processes=1)
+    parallel = simulation.run(processes=2)
+    assert single.count == parallel.count == 3000
+    assert (single.finished, single.stalled) == (parallel.finished, parallel.stalled)
+    assert single.x_stats.mean == parallel.x_stats.mean
+    assert single.x_quantiles.quantile(0.5) == parallel.x_quantiles.quantile(0.5)
+
+
+def test_missing_parameters_are_rejected():
+    with pytest.raises(ValueError):
+        MonteCarloSimulation('roll_up', PARAMS, 10)
@@ -0,0 +1,37 @@
+import numpy as np
+
+from report import simulate_run
+from simulation import Simulation
+
+
+PARAMS = {'angle': 30, 'length': 10, 'horizontal_length': 10, 'v0': 5,
+          'friction_incline': 0.1, 'friction_horizontal': 0.1}
+
+
+def test_changes_are_replayed_at_their_steps():
+    plain = simulate_run('roll_down', PARAMS)
+    changed = simulate_run('roll_down', dict(PARAMS, changes=[(30, {'friction_incline': 0.1,
+                                                                   'friction_horizontal': 0.5})]))
+    np.testing.assert_array_equal(changed['x'][:31], plain['x'][:31])
+    assert changed['x'][-1] < plain['x'][-1]
+
+
+def test_changes_after_the_end_are_not_applied(monkeypatch):
+    calls = []
+    original = Simulation.set_params
+
+    def set_params(sim, **values):
+        calls.append(values)
+        original(sim, **values)
+
+    monkeypatch.setattr(Simulation, 'set_params', set_params)
+    change = {'friction_incline': 0.1, 'friction_horizontal': 0.9}
+
+    late = simulate_run('roll_down', dict(PARAMS, changes=[(5000, change)]))
+    assert calls == []
+    np.testing.assert_array_equal(late['x'], simulate_run('roll_down', PARAMS)['x'])
+
+    truncated = simulate_run('roll_down', dict(PARAMS, changes=[(20, change)]), max_steps=10)
+    assert calls == []
+    assert truncated['time'].size == 11
+    assert truncated['outcome'] == "Превышено число шагов"
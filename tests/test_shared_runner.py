@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from shared_runner import SharedMemoryRunner
+from simulation import Simulation
+
+
+PARAMS = (30, 10, 10, 5, 0.1, 0.1)
+SHORT_PARAMS = (30, 2, 1, 1, 0.1, 0.1)
+
+
+def reference(params, dt=0.05):
+    sim = Simulation(*params)
+    x, y = [sim.x_body], [sim.y_body]
+    while not sim.is_finished() and not sim.is_stalled():
+        _, _, x_body, y_body = sim.step(dt)
+        x.append(x_body)
+        y.append(y_body)
+    return np.array(sim.time_points), np.array(sim.velocity_points), np.array(x), np.array(y)
+
+
+def fields(r):
+    return r.time_points, r.velocity_points, r.x_points, r.y_points
+
+
+def assert_trajectory(r, expected, pool=None):
+    for field, values in zip(fields(r), expected):
+        if pool is not None:
+            assert np.shares_memory(field, pool.data)
+        np.testing.assert_array_equal(field, values)
+
+
+def test_many_runs_do_not_fragment_pool():
+    # A run reserves 16 slabs but keeps one, so contiguous blocks would run out after ~25 runs.
+    with SharedMemoryRunner(processes=1, max_steps=1000, n_slabs=400, slab_size=64) as runner:
+        results = runner.run('roll_down', [PARAMS] * 300)
+        assert all(r is not None and r.finished for r in results)
+        assert runner.pool.free_slabs() == 400 - 300
+        for r in results:
+            r.release()
+        assert runner.pool.free_slabs() == 400
+
+
+def test_contiguous_trajectory_is_a_cached_view():
+    expected = reference(PARAMS)
+    with SharedMemoryRunner(processes=1, max_steps=1000, n_slabs=400, slab_size=8) as runner:
+        results = runner.run('roll_down', [SHORT_PARAMS, PARAMS, PARAMS])
+        for r in results[1:]:
+            assert r.slabs == list(range(r.slabs[0], r.slabs[0] + len(r.slabs)))
+            assert_trajectory(r, expected, runner.pool)
+            assert r.time_points is r.time_points
+            r.release()
+        results[0].release()
+
+
+def test_trajectory_spanning_scattered_slabs():
+    # 140 slabs hold one 126-slab reservation; after releasing the short runs the only free
+    # space is split into three runs of slabs, so the next trajectory is scattered.
+    expected = reference(PARAMS)
+    with SharedMemoryRunner(processes=1, max_steps=1000, n_slabs=140, slab_size=8) as runner:
+        first = runner.run('roll_down', [SHORT_PARAMS, PARAMS, SHORT_PARAMS, PARAMS])
+        first[0].release()
+        first[2].release()
+        r = runner.run('roll_down', [PARAMS])[0]
+        assert r.slabs != list(range(r.slabs[0], r.slabs[0] + len(r.slabs)))
+        for name, values in zip(('time', 'velocity', 'x', 'y'), expected):
+            assert len(r.segments(name)) == len(r.slabs)
+            assert all(np.shares_memory(segment, runner.pool.data) for segment in r.segments(name))
+            np.testing.assert_array_equal(np.concatenate(r.segments(name)), values)
+        assert_trajectory(r, expected)
+        assert r.x_points is r.x_points
+        for t in first[1::2]:
+            assert_trajectory(t, expected, runner.pool)
+        assert max(runner.deviation.values()) == 0.0
+
+
+def test_trajectories_survive_close():
+    expected = reference(PARAMS)
+    with SharedMemoryRunner(processes=1, max_steps=1000, n_slabs=64, slab_size=64) as runner:
+        results = runner.run('roll_down', [PARAMS, PARAMS])
+        results[1].release()
+    assert results[0].pool is None
+    assert_trajectory(results[0], expected)
+    with pytest.raises(ValueError):
+        results[1].time_points
+
+
+def test_close_refuses_while_views_are_alive():
+    runner = SharedMemoryRunner(processes=1, max_steps=1000, n_slabs=64, slab_size=64)
+    r = runner.run('roll_down', [PARAMS])[0]
+    view = r.time_points
+    with pytest.raises(ValueError):
+        runner.close()
+    assert view.sum() == reference(PARAMS)[0].sum()
+    assert r.pool is None
+    del view
+    runner.close()
+    np.testing.assert_array_equal(r.time_points, reference(PARAMS)[0])
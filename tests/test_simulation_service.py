@@ -0,0 +1,99 @@
+import asyncio
+import json
+
+import pytest
+
+from simulation import Simulation
+from rollup_simulation import RollupSimulation
+from simulation_service import SimulationService, _parse_request, run_batch
+from snapshot import run_to_completion
+
+ROLL_DOWN = {'angle': 30, 'length': 10, 'horizontal_length': 20, 'v0': 2,
+             'friction_incline': 0.2, 'friction_horizontal': 0.3}
+ROLL_UP = {'angle': 30, 'length': 10, 'v0': 8, 'friction_incline': 0.1,
+           'friction_horizontal': 0.2, 'initial_distance': 5}
+
+
+def test_parse_request_orders_parameters():
+    scenario_type, values, dt = _parse_request({'scenario': 'roll_up', 'params': ROLL_UP, 'dt': 0.01})
+    assert scenario_type == 'roll_up'
+    assert values == (30.0, 10.0, 8.0, 0.1, 0.2, 5.0)
+    assert dt == 0.01
+    assert _parse_request({'params': ROLL_DOWN})[0] == 'roll_down'
+    assert _parse_request({'params': ROLL_DOWN})[2] == 0.05
+
+
+@pytest.mark.parametrize('payload', [
+    [ROLL_DOWN],
+    {'params': [1, 2, 3]},
+    {'params': {'angle': 30}},
+    {'params': dict(ROLL_DOWN, angle=95)},
+    {'params': dict(ROLL_DOWN, friction_incline=-0.1)},
+    {'params': dict(ROLL_DOWN, v0='быстро')},
+    {'params': dict(ROLL_DOWN, length=float('nan'))},
+    {'params': ROLL_DOWN, 'dt': 0},
+    {'params': ROLL_DOWN, 'dt': None},
+    {'scenario': 'roll_sideways', 'params': ROLL_DOWN},
+])
+def test_parse_request_rejects_bad_payload(payload):
+    with pytest.raises(ValueError):
+        _parse_request(payload)
+
+
+def scalar_result(scenario_type, row, dt):
+    sim = Simulation(*row) if scenario_type == 'roll_down' else RollupSimulation(*row)
+    run_to_completion(sim, 100000, dt)
+    return sim
+
+
+def test_run_batch_matches_scalar_engines():
+    rows = [(30, 10, 20, 2, 0.2, 0.3), (10, 10, 20, 0, 0.6, 0.3)]
+    results = run_batch('roll_down', 0.05, rows)
+    for row, result in zip(rows, results):
+        sim = scalar_result('roll_down', row, 0.05)
+        assert result['x_final'] == pytest.approx(sim.x_body, abs=1e-9)
+        assert result['t_total'] == pytest.approx(sim.time_points[-1], abs=1e-9)
+        assert result['stalled'] == sim.is_stalled()
+    assert [r['stalled'] for r in results] == [False, True]
+
+    rows = [(30, 10, 8, 0.1, 0.2, 5), (45, 10, 20, 0.1, 0.2, 0)]
+    results = run_batch('roll_up', 0.05, rows)
+    for row, result in zip(rows, results):
+        sim = scalar_result('roll_up', row, 0.05)
+        assert result['x_final'] == pytest.approx(sim.x_body, abs=1e-9)
+        assert result['finished']
+    assert [r['reached_peak'] for r in results] == [False, True]
+
+
+async def post(port, path, payload):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    body = json.dumps(payload).encode('utf-8')
+    writer.write(f"POST {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode('latin-1')
+                 + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), body
+
+
+def test_concurrent_requests_share_a_batch():
+    async def scenario():
+        service = SimulationService(window=0.05)
+        server = await service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            payloads = [{'params': dict(ROLL_DOWN, v0=v0)} for v0 in range(5)]
+            responses = await asyncio.gather(*(post(port, '/simulate', p) for p in payloads))
+            bad = await post(port, '/simulate', {'params': {'angle': 30}})
+        finally:
+            await service.close()
+        return service, responses, bad
+
+    service, responses, bad = asyncio.run(scenario())
+    assert [status for status, _ in responses] == [200] * 5
+    assert service.batcher.batches == 1
+    x_final = [json.loads(body)['x_final'] for _, body in responses]
+    assert x_final == sorted(x_final)
+    assert bad[0] == 400
+    assert 'Не заданы параметры' in json.loads(bad[1])['error']
@@ -0,0 +1,82 @@
+import pytest
+
+from simulation import Simulation
+from rollup_simulation import RollupSimulation
+from drag_simulation import DragSimulation
+from snapshot import iterate_steps, run_to_completion
+
+
+PARAMS = (30, 10, 10, 5, 0.1, 0.1)
+
+
+def horizontal_simulation(steps=20):
+    sim = Simulation(*PARAMS)
+    while sim.on_inclined_plane:
+        sim.step(sim.dt)
+    for _ in range(steps):
+        sim.step(sim.dt)
+    return sim
+
+
+@pytest.mark.parametrize('steps', [0, 1, 20])
+@pytest.mark.parametrize('overrides', [{'friction_horizontal': 0.5}, {'friction_horizontal': 0.0},
+                                       {'dt': 0.01}, {'friction_horizontal': 0.3, 'dt': 0.1}])
+def test_fork_on_horizontal_is_continuous(steps, overrides):
+    sim = horizontal_simulation(steps)
+    x, v = sim.x_body, sim.velocity
+    if steps == 0:
+        v = sim.v0_horizontal
+    fork, = sim.fork(sim.snapshot(), [overrides])
+    fork.step(fork.dt)
+    a = -fork.friction_horizontal * fork.g
+    assert fork.x_body == pytest.approx(x + v * fork.dt + 0.5 * a * fork.dt ** 2)
+    assert fork.velocity == pytest.approx(max(0.0, v + a * fork.dt))
+
+
+def test_fork_without_changes_matches_original():
+    sim = horizontal_simulation()
+    fork, = sim.fork(sim.snapshot(), 1)
+    for _ in range(30):
+        assert sim.step(sim.dt) == fork.step(fork.dt)
+
+
+def test_set_params_keeps_position_monotonic():
+    sim = horizontal_simulation()
+    sim.set_params(friction_horizontal=0.5)
+    previous = sim.x_body
+    while not sim.is_finished():
+        sim.step(sim.dt)
+        assert sim.x_body >= previous
+        previous = sim.x_body
+
+
+def test_rollup_fork_is_continuous():
+    sim = RollupSimulation(30, 10, 8, 0.1, 0.1, 5)
+    for _ in range(10):
+        sim.step(sim.dt)
+    x = sim.x_body
+    fork, = sim.fork(sim.snapshot(), [{'friction_horizontal': 0.5}])
+    fork.step(fork.dt)
+    assert abs(fork.x_body - x) <= abs(sim.velocity) * fork.dt + 1e-9
+
+
+def test_stalled_drag_lane_restarts_when_friction_drops():
+    sim = DragSimulation(20, 10, 10, 0.5, 0.5, 0.1, 0.01)
+    while not sim.is_finished():
+        sim.step(sim.dt)
+    x, t = sim.x_body, sim.time_points[-1]
+    sim.set_params(friction_incline=0.1)
+    assert not sim.is_finished()
+    sim.step(sim.dt)
+    assert x < sim.x_body < x + sim.dt
+    assert sim.time_points[-1] == pytest.approx(t + sim.dt)
+
+
+def test_iterate_steps_without_history_keeps_last_point():
+    sim = Simulation(*PARAMS)
+    reference = Simulation(*PARAMS)
+    x_points, _ = run_to_completion(reference, 10000)
+    rows = list(iterate_steps(sim, 10000, keep_history=False))
+    assert len(rows) == len(x_points) - 1
+    assert [row[2] for row in rows] == x_points[1:]
+    assert list(sim.time_points) == [reference.time_points[-1]]
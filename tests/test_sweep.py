@@ -0,0 +1,95 @@
+import importlib
+import json
+import socket
+import sqlite3
+import sys
+
+import numpy as np
+import pytest
+
+import sweep
+from batch_simulation import BatchSimulation
+
+
+SPEC = {
+    'scenario': 'roll_down',
+    'params': {'angle': [20, 40], 'length': 10, 'horizontal_length': 10, 'v0': 5,
+               'friction_incline': 0.1, 'friction_horizontal': {'start': 0.1, 'stop': 0.3, 'num': 3}},
+    'shard_size': 2,
+}
+
+
+def test_load_spec_json(tmp_path):
+    path = tmp_path / 'job.json'
+    path.write_text(json.dumps(SPEC), encoding='utf-8')
+    assert sweep.load_spec(str(path)) == SPEC
+
+
+def test_load_spec_toml(tmp_path):
+    pytest.importorskip('tomllib')
+    path = tmp_path / 'job.toml'
+    path.write_text('scenario = "roll_down"\nshard_size = 2\n[params]\nangle = [20, 40]\n', encoding='utf-8')
+    assert sweep.load_spec(str(path)) == {'scenario': 'roll_down', 'shard_size': 2, 'params': {'angle': [20, 40]}}
+
+
+def test_json_specs_work_without_tomllib(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, 'tomllib', None)
+    module = importlib.reload(sweep)
+    try:
+        path = tmp_path / 'job.json'
+        path.write_text(json.dumps(SPEC), encoding='utf-8')
+        assert module.load_spec(str(path)) == SPEC
+        toml_path = tmp_path / 'job.toml'
+        toml_path.write_text('scenario = "roll_down"\n', encoding='utf-8')
+        with pytest.raises(ValueError):
+            module.load_spec(str(toml_path))
+    finally:
+        monkeypatch.undo()
+        importlib.reload(sweep)
+
+
+def expected_results():
+    angle, friction_horizontal = np.meshgrid([20.0, 40.0], [0.1, 0.2, 0.3], indexing='ij')
+    return BatchSimulation(angle, 10, 10, 5, 0.1, friction_horizontal).run(0.05)
+
+
+def test_resume_after_interrupted_worker(tmp_path):
+    directory = str(tmp_path / 'job')
+    job = sweep.SweepJob(directory, SPEC)
+    assert job.status()['total'] == 3
+    shard_id, start, stop = job.claim()
+    job.complete(shard_id, sweep._compute_shard(job.spec, start, stop), 0.0)
+    job.claim('other-host:1')
+    job.claim(f"{socket.gethostname()}:99999999")
+    assert job.status()['running'] == 2
+    with pytest.raises(ValueError):
+        job.load_results()
+
+    resumed = sweep.SweepJob(directory, SPEC)
+    status = resumed.run()
+    assert (status['done'], status['running']) == (2, 1)
+
+    resumed = sweep.SweepJob(directory, lease=0.0)
+    with sqlite3.connect(resumed.path) as conn:
+        conn.execute("UPDATE shards SET lease_until = 0 WHERE status = 'running'")
+    assert resumed.run()['done'] == 3
+
+    results = resumed.load_results()
+    expected = expected_results()
+    assert results['x_body'].shape == (2, 1, 1, 1, 1, 3)
+    np.testing.assert_array_equal(results['x_body'].squeeze(), expected.x_body)
+    np.testing.assert_array_equal(results['t_global'].squeeze(), expected.t_global)
+
+    path = resumed.export(str(tmp_path / 'out.npz'))
+    with np.load(path) as data:
+        np.testing.assert_array_equal(data['axis_friction_horizontal'], [0.1, 0.2, 0.3])
+        np.testing.assert_array_equal(data['x_body'].squeeze(), expected.x_body)
+
+
+def test_resume_rejects_other_spec(tmp_path):
+    directory = str(tmp_path / 'job')
+    sweep.SweepJob(directory, SPEC)
+    with pytest.raises(ValueError):
+        sweep.SweepJob(directory, dict(SPEC, shard_size=3))
+    with pytest.raises(ValueError):
+        sweep.SweepJob(str(tmp_path / 'missing'))
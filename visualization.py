@@ -1,6 +1,15 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import matplotlib.pyplot as plt
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QDialog, QVBoxLayout, QFileDialog, QMessageBox
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
+
+from decimation import MinMaxDecimator, lttb
+from report import render_speed_graph
+
 
 class SpeedGraphWindow(QDialog):
     def __init__(self, parent=None):
@@ -9,22 +18,74 @@ class SpeedGraphWindow(QDialog):
         self.setGeometry(200, 200, 600, 400)
         self.figure = plt.figure(figsize=(5, 3))
         self.canvas = FigureCanvas(self.figure)
+        self.toolbar = NavigationToolbar(self.canvas, self)
         layout = QVBoxLayout()
+        layout.addWidget(self.toolbar)
         layout.addWidget(self.canvas)
         self.setLayout(layout)
         self.ax = self.figure.add_subplot(111)
+        self.decimator = MinMaxDecimator()
+        self.line = None
+        self.executor = None
+        self.save_futures = {}
+        self.save_timer = QTimer()
+        self.save_timer.timeout.connect(self.collectSaved)
+
+    def _plotWidth(self):
+        width = self.ax.get_window_extent().width
+        return max(100, int(width)) if np.isfinite(width) else 1000
 
     def updateGraph(self, time, velocity):
+        self.decimator.set_max_buckets(self._plotWidth())
+        self.decimator.update(time, velocity)
+        t_points, v_points = self.decimator.points()
+
+        if self.line is not None:
+            if self._followsData():
+                self.line.set_data(t_points, v_points)
+                self.ax.relim()
+                self.ax.autoscale_view()
+            else:
+                self.onXlimChanged(self.ax)
+            self.canvas.draw_idle()
+            return
+
         self.ax.clear()
-        self.ax.plot(time, velocity, 'r', label="Скорость v(t)")
+        self.line, = self.ax.plot(t_points, v_points, 'r', label="Скорость v(t)")
         self.ax.set_xlabel("Время (с)", fontsize=12)
         self.ax.set_ylabel("Скорость (м/с)", fontsize=12)
         self.ax.set_title("График зависимости скорости от времени", fontsize=14)
         self.ax.legend(fontsize=10)
         self.ax.grid(True, linestyle='--')
+        self.ax.callbacks.connect('xlim_changed', self.onXlimChanged)
         self.canvas.draw()
 
+    def _followsData(self):
+        views = self.toolbar._nav_stack
+        return not self.toolbar.mode and (views() is None or views() is views[0])
+
+    def onXlimChanged(self, ax):
+        if self.line is None:
+            return
+        t_data, v_data = self.decimator.data()
+        if t_data.size == 0:
+            return
+        x_min, x_max = ax.get_xlim()
+        if x_min <= t_data[0] and x_max >= t_data[-1]:
+            self.line.set_data(*self.decimator.points())
+            return
+        start = max(0, int(np.searchsorted(t_data, x_min)) - 1)
+        end = min(t_data.size, int(np.searchsorted(t_data, x_max)) + 1)
+        self.line.set_data(*lttb(t_data[start:end], v_data[start:end], 2 * self._plotWidth()))
+
+    def replaceGraph(self, time, velocity):
+        self.decimator.reset()
+        self.updateGraph(time, velocity)
+
     def clearGraph(self):
+        self.decimator.reset()
+        self.line = None
+        self.toolbar.update()
         self.ax.clear()
         self.ax.set_xlabel("Время (с)", fontsize=12)
         self.ax.set_ylabel("Скорость (м/с)", fontsize=12)
@@ -38,14 +99,28 @@ class SpeedGraphWindow(QDialog):
             self,
             "Сохранить график скорости",
             "speed_graph",
-            "PNG Files (*.png);;JPEG Files (*.jpg);;All Files (*)",
+            "PNG Files (*.png);;JPEG Files (*.jpg);;SVG Files (*.svg);;PDF Files (*.pdf);;All Files (*)",
             options=options,
         )
         if file_path:
-            try:
-                if not file_path.lower().endswith((".png", ".jpg", ".jpeg")):
-                    file_path += ".png"
-                self.figure.savefig(file_path, dpi=300)
+            if not file_path.lower().endswith((".png", ".jpg", ".jpeg", ".svg", ".pdf")):
+                file_path += ".png"
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=1)
+            time, velocity = self.decimator.data()
+            future = self.executor.submit(render_speed_graph, file_path, time.copy(), velocity.copy())
+            self.save_futures[future] = file_path
+            self.save_timer.start(100)
+
+    def collectSaved(self):
+        for future in [f for f in self.save_futures if f.done()]:
+            file_path = self.save_futures.pop(future)
+            if future.cancelled():
+                continue
+            if future.exception() is not None:
+                QMessageBox.critical(self, "Ошибка сохранения",
+                                     f"Не удалось сохранить график:\n{future.exception()}")
+            else:
                 QMessageBox.information(self, "Сохранение графика", f"График успешно сохранен в\n{file_path}")
-            except Exception as e:
-                 QMessageBox.critical(self, "Ошибка сохранения", f"Не удалось сохранить график:\n{e}")
\ No newline at end of file
+        if not self.save_futures:
+            self.save_timer.stop()